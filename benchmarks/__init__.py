@@ -0,0 +1 @@
+"""Benchmarks for d8s_python (run them with `python -m benchmarks.<benchmark_name>`)."""
@@ -0,0 +1,71 @@
+"""Compare python_ast_traverse with the recursive d8s_algorithms.depth_first_traverse on deep and wide trees.
+
+Deep trees are long chains of additions (each addition is nested in the next one) and wide trees are dict...
+literals with many items. depth_first_traverse is only run where it does not hit the recursion limit (if...
+d8s_algorithms is installed).
+"""
+
+import ast
+import sys
+
+from d8s_python import python_ast_parse, python_ast_traverse
+
+from .utils import best_time
+
+DEPTHS = (100, 500, 900, 2_000, 4_000)
+WIDTHS = (1_000, 10_000, 100_000)
+
+
+def deep_code(depth: int) -> str:
+    """Generate an expression whose tree is (about) depth nodes deep."""
+    return ' + '.join(['1'] * depth)
+
+
+def wide_code(width: int) -> str:
+    """Generate a dict literal with width items."""
+    return '{' + ', '.join(f'{i}: {i}' for i in range(width)) + '}'
+
+
+def recursive_time(parsed_code: ast.AST) -> str:
+    """Return the time (in ms) to traverse the parsed_code with depth_first_traverse (or why it could not be timed)."""
+    try:
+        from d8s_algorithms import depth_first_traverse
+    except ImportError:
+        return 'n/a'
+
+    try:
+        time = best_time(lambda: list(depth_first_traverse(parsed_code, ast.iter_child_nodes)), repeat=3)
+    except RecursionError:
+        return 'RecursionError'
+    return f'{time * 1000:.1f}'
+
+
+def run(label: str, sizes, generate) -> None:
+    print(f'{label:>8} {"nodes":>8} {"walk (ms)":>10} {"pre (ms)":>10} {"post (ms)":>10} {"recursive (ms)":>15}')
+    for size in sizes:
+        code_text = generate(size)
+        try:
+            parsed_code = python_ast_parse(code_text)
+        except RecursionError:
+            print(f'{size:>8} (too deep for ast.parse)')
+            continue
+
+        node_count = sum(1 for _ in ast.walk(parsed_code))
+        walk_time = best_time(lambda: list(ast.walk(parsed_code)), repeat=3)
+        pre_time = best_time(lambda: list(python_ast_traverse(parsed_code)), repeat=3)
+        post_time = best_time(lambda: list(python_ast_traverse(parsed_code, post_order=True)), repeat=3)
+        print(
+            f'{size:>8} {node_count:>8} {walk_time * 1000:>10.1f} {pre_time * 1000:>10.1f} '
+            f'{post_time * 1000:>10.1f} {recursive_time(parsed_code):>15}'
+        )
+
+
+def main():
+    print(f'recursion limit: {sys.getrecursionlimit()}')
+    run('depth', DEPTHS, deep_code)
+    print()
+    run('width', WIDTHS, wide_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""Time python_bytecode on many modules the first time (compiling and disassembling) and once it is cached.
+
+Aggregate queries (an opcode histogram and instruction counts) are timed over the cached instructions.
+"""
+
+import itertools
+
+from d8s_python import python_bytecode, python_instruction_counts, python_opcode_histogram
+
+from .utils import best_time, synthetic_module
+
+MODULE_COUNT = 200
+FUNCTIONS_PER_MODULE = 20
+
+
+def main():
+    code_texts = [synthetic_module(FUNCTIONS_PER_MODULE, seed=seed) for seed in range(MODULE_COUNT)]
+    # the modules differ in more than their seed so that every module has its own cache entry
+    code_texts = [f'{code_text}\nMODULE_INDEX = {index}\n' for index, code_text in enumerate(code_texts)]
+
+    first_time = best_time(lambda: [python_bytecode(code_text) for code_text in code_texts], repeat=1)
+    cached_time = best_time(lambda: [python_bytecode(code_text) for code_text in code_texts], repeat=5)
+    code_instructions = list(itertools.chain.from_iterable(python_bytecode(code_text) for code_text in code_texts))
+    histogram_time = best_time(lambda: python_opcode_histogram(code_instructions), repeat=5)
+    counts_time = best_time(lambda: python_instruction_counts(code_instructions), repeat=5)
+
+    instruction_count = sum(len(instructions.opcodes) for instructions in code_instructions)
+    print(f'{MODULE_COUNT} modules, {len(code_instructions)} code objects, {instruction_count} instructions')
+    print(f'{"first python_bytecode (ms)":>30} {first_time * 1000:>8.1f}')
+    print(f'{"cached python_bytecode (ms)":>30} {cached_time * 1000:>8.1f}')
+    print(f'{"python_opcode_histogram (ms)":>30} {histogram_time * 1000:>8.1f}')
+    print(f'{"python_instruction_counts (ms)":>30} {counts_time * 1000:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
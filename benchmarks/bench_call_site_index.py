@@ -0,0 +1,74 @@
+"""Measure building, updating, and querying a CallSiteIndex of a large tree (and compare a query to a substring scan).
+
+Each generated module calls CALLS_PER_MODULE functions (bare and dotted) from a pool of FUNCTION_COUNT names.
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from d8s_python import CallSiteIndex, python_files_using_functions
+
+from .utils import best_time
+
+MODULE_COUNTS = (5_000, 50_000)
+DIRECTORY_SIZE = 100
+CALLS_PER_MODULE = 20
+FUNCTION_COUNT = 2_000
+
+
+def write_tree(directory_path: str, module_count: int, *, seed: int = 0) -> None:
+    """Write module_count modules (in directories of DIRECTORY_SIZE modules) to the directory_path."""
+    generator = random.Random(seed)
+    for module_index in range(module_count):
+        package_path = os.path.join(directory_path, f'package_{module_index // DIRECTORY_SIZE}')
+        os.makedirs(package_path, exist_ok=True)
+        lines = ['import helpers', '', 'def main(value):']
+        for _ in range(CALLS_PER_MODULE):
+            function_name = f'function_{generator.randrange(FUNCTION_COUNT)}'
+            if generator.random() < 0.5:
+                lines.append(f'    value = {function_name}(value)')
+            else:
+                lines.append(f'    value = helpers.{function_name}(value, "{function_name}(")')
+        lines.append('    return value')
+        with open(os.path.join(package_path, f'module_{module_index}.py'), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+def main():
+    print(
+        f'{"modules":>8} {"build (s)":>10} {"no-op update (s)":>17} {"update 1 file (ms)":>19} '
+        f'{"lookup (ms)":>12} {"substring scan (s)":>19}'
+    )
+    for module_count in MODULE_COUNTS:
+        with tempfile.TemporaryDirectory() as directory_path:
+            source_path = os.path.join(directory_path, 'source')
+            write_tree(source_path, module_count)
+
+            with CallSiteIndex(os.path.join(directory_path, 'index.sqlite')) as index:
+                start = time.perf_counter()
+                index.update(source_path)
+                build_time = time.perf_counter() - start
+
+                noop_update_time = best_time(lambda: index.update(source_path), repeat=1)
+                file_path = os.path.join(source_path, 'package_0', 'module_0.py')
+
+                def update_file():
+                    os.utime(file_path)
+                    index.update_file(file_path)
+
+                update_file_time = best_time(update_file, repeat=5)
+                lookup_time = best_time(lambda: index.lookup('function_0'), repeat=5)
+                scan_time = best_time(
+                    lambda: python_files_using_functions(['function_0'], source_path, recursive=True), repeat=1
+                )
+
+            print(
+                f'{module_count:>8} {build_time:>10.1f} {noop_update_time:>17.2f} {update_file_time * 1000:>19.1f} '
+                f'{lookup_time * 1000:>12.2f} {scan_time:>19.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""Compare python_copy_deep's tree copies with copy.deepcopy on parsed modules (and with parsing the module again)."""
+
+import ast
+import copy
+
+from d8s_python import python_copy_deep
+
+from .utils import best_time, synthetic_module
+
+FUNCTION_COUNTS = (15, 150, 600)
+
+
+def main():
+    print(f'{"nodes":>8} {"deepcopy (ms)":>14} {"tree (ms)":>10} {"speedup":>8} {"ast.parse (ms)":>15}')
+    for function_count in FUNCTION_COUNTS:
+        code_text = synthetic_module(function_count)
+        parsed_code = ast.parse(code_text)
+        node_count = len(list(ast.walk(parsed_code)))
+
+        deepcopy_time = best_time(lambda: copy.deepcopy(parsed_code), repeat=3)
+        tree_time = best_time(lambda: python_copy_deep(parsed_code, tree=True), repeat=5)
+        parse_time = best_time(lambda: ast.parse(code_text), repeat=5)
+        print(
+            f'{node_count:>8} {deepcopy_time * 1000:>14.1f} {tree_time * 1000:>10.1f} '
+            f'{deepcopy_time / tree_time:>7.1f}x {parse_time * 1000:>15.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Compare python_fstrings with the pyparsing grammar it used to be based on (and with a plain ast.parse).
+
+The generated modules have an f-string in every function (see the line_length option of synthetic_module).
+"""
+
+import ast
+
+from d8s_python import python_fstrings
+
+from .utils import best_time, synthetic_module_with_lines
+
+LINE_COUNTS = (1_000, 2_000, 4_000, 8_000)
+PREVIOUS_IMPLEMENTATION_MAX_LINE_COUNT = 4_000
+
+
+def previous_python_fstrings(code_text: str, *, include_braces: bool = False):
+    """The implementation of python_fstrings which searched the text with a pyparsing grammar."""
+    from d8s_grammars import python_formatted_string_literal
+    from d8s_lists import flatten
+
+    python_f_strings = flatten(python_formatted_string_literal.searchString(code_text).asList())
+
+    if not include_braces:
+        python_f_strings = (f_string.strip('{').strip('}') for f_string in python_f_strings)
+
+    return python_f_strings
+
+
+def main():
+    # the grammar is slow the first time it is used
+    list(previous_python_fstrings("f'{a}'"))
+    print(f'{"lines":>8} {"ast.parse (ms)":>15} {"fstrings (ms)":>15} {"previous (ms)":>15}')
+    for line_count in LINE_COUNTS:
+        code_text = synthetic_module_with_lines(line_count, line_length=60)
+        parse_time = best_time(lambda: ast.parse(code_text), repeat=3)
+        fstrings_time = best_time(lambda: list(python_fstrings(code_text)), repeat=3)
+
+        previous_time = ''
+        if line_count <= PREVIOUS_IMPLEMENTATION_MAX_LINE_COUNT:
+            previous_time = best_time(lambda: list(previous_python_fstrings(code_text)), repeat=1)
+            previous_time = f'{previous_time * 1000:.1f}'
+
+        print(f'{line_count:>8} {parse_time * 1000:>15.1f} {fstrings_time * 1000:>15.1f} {previous_time:>15}')
+
+
+if __name__ == '__main__':
+    main()
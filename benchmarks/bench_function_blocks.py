@@ -0,0 +1,65 @@
+"""Show how python_function_blocks scales on generated modules with 1k to 100k functions.
+
+The implementation which python_function_blocks used before it was based on node end positions is included for...
+comparison (it is only run on the smaller modules because it is so much slower). The previous implementation...
+parses the code itself, so the time to parse the module is shown as well.
+"""
+
+import sys
+
+from d8s_python import ParsedSource, python_ast_function_defs, python_ast_object_line_numbers, python_function_blocks
+
+from .utils import best_time, synthetic_module
+
+FUNCTION_COUNTS = (1_000, 3_000, 10_000, 30_000, 100_000)
+PREVIOUS_IMPLEMENTATION_MAX_FUNCTION_COUNT = 10_000
+
+
+def previous_python_function_blocks(code_text: str):
+    """The implementation of python_function_blocks which traversed every function's subtree for line numbers."""
+    from d8s_lists import has_index
+    from d8s_strings import string_chars_at_start_len
+
+    function_block_strings = []
+    code_text_as_lines = code_text.splitlines()
+    ast_function_defs = python_ast_function_defs(code_text)
+    function_block_line_numbers = [(f.name, python_ast_object_line_numbers(f)) for f in ast_function_defs]
+
+    for _, (start, end) in function_block_line_numbers:
+        function_block_lines = code_text_as_lines[start - 1 : end]  # noqa=E203
+        function_block_string = '\n'.join(function_block_lines)
+        if has_index(code_text_as_lines, end):
+            function_indentation = string_chars_at_start_len(function_block_lines[0], ' ')
+            next_line_is_indented = (
+                code_text_as_lines[end].startswith(' ')
+                and string_chars_at_start_len(code_text_as_lines[end], ' ') > function_indentation
+            )
+            next_line_has_only_parenthesis = code_text_as_lines[end].strip(' ') == ')'
+            if next_line_is_indented and next_line_has_only_parenthesis:
+                function_block_string += f'\n{code_text_as_lines[end]}'
+        function_block_strings.append(function_block_string)
+    return function_block_strings
+
+
+def main(nesting_depth: int = 0):
+    print(f'python_function_blocks (nesting depth: {nesting_depth})')
+    print(f'{"functions":>10} {"parse (ms)":>12} {"blocks (ms)":>12} {"us/function":>12} {"previous (ms)":>14}')
+    for function_count in FUNCTION_COUNTS:
+        code_text = synthetic_module(function_count // (nesting_depth + 1), nesting_depth=nesting_depth)
+        parse_time = best_time(lambda: ParsedSource(code_text), repeat=1)
+        parsed_source = ParsedSource(code_text)
+        blocks_time = best_time(lambda: python_function_blocks(parsed_source), repeat=3)
+
+        previous_time = ''
+        if function_count <= PREVIOUS_IMPLEMENTATION_MAX_FUNCTION_COUNT:
+            previous_time = best_time(lambda: previous_python_function_blocks(code_text), repeat=1) * 1000
+            previous_time = f'{previous_time:.1f}'
+
+        print(
+            f'{function_count:>10} {parse_time * 1000:>12.1f} {blocks_time * 1000:>12.1f} '
+            f'{blocks_time / function_count * 1e6:>12.2f} {previous_time:>14}'
+        )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
@@ -0,0 +1,40 @@
+"""Compare python_function_lengths with the implementation which counted the lines of every function's block.
+
+Deeply nested functions are where the previous implementation was slowest: the code of a nested function was...
+copied (and split into lines) once for every function it is nested in. python_function_length_metrics also...
+tokenizes the module (for the logical lines), so it is shown as well.
+"""
+
+from d8s_python import ParsedSource, python_function_blocks, python_function_length_metrics, python_function_lengths
+from d8s_python.python_data import python_line_count
+
+from .utils import best_time, synthetic_module
+
+FUNCTION_COUNT = 10_000
+NESTING_DEPTHS = (0, 3, 9)
+
+
+def previous_python_function_lengths(code_text):
+    """The implementation of python_function_lengths which counted the lines of each function's block."""
+    return [python_line_count(function_block) for function_block in python_function_blocks(code_text)]
+
+
+def main():
+    print(f'{"nesting depth":>14} {"previous (ms)":>14} {"lengths (ms)":>13} {"length metrics (ms)":>20}')
+    for nesting_depth in NESTING_DEPTHS:
+        parsed_source = ParsedSource(
+            synthetic_module(FUNCTION_COUNT // (nesting_depth + 1), nesting_depth=nesting_depth)
+        )
+        assert python_function_lengths(parsed_source) == previous_python_function_lengths(parsed_source)
+
+        previous_time = best_time(lambda: previous_python_function_lengths(parsed_source), repeat=3)
+        lengths_time = best_time(lambda: python_function_lengths(parsed_source), repeat=3)
+        metrics_time = best_time(lambda: python_function_length_metrics(parsed_source), repeat=3)
+        print(
+            f'{nesting_depth:>14} {previous_time * 1000:>14.1f} {lengths_time * 1000:>13.1f} '
+            f'{metrics_time * 1000:>20.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Show that python_functions_signatures stays flat per function as the number of functions grows.
+
+The regex-based implementation which python_functions_signatures used before is included for comparison (it is...
+only run on the smaller modules because it scans the whole code_text for every function).
+"""
+
+import re
+
+from d8s_python import ParsedSource, python_function_names, python_functions_signatures
+
+from .utils import best_time, synthetic_module
+
+FUNCTION_COUNTS = (100, 300, 1_000, 3_000, 10_000)
+PREVIOUS_IMPLEMENTATION_MAX_FUNCTION_COUNT = 3_000
+
+
+def previous_python_functions_signatures(code_text: str):
+    """The implementation of python_functions_signatures which ran a regex over the code_text for every function."""
+    signatures = []
+    for name in python_function_names(code_text):
+        sig = re.findall(fr'(def {name}\((?:.|\s)*?\).*?):', code_text)
+        signatures.append(sig[0][len(f'def {name}') :] if sig else None)  # noqa=E203
+    return signatures
+
+
+def main():
+    print('python_functions_signatures')
+    print(f'{"functions":>10} {"signatures (ms)":>16} {"us/function":>12} {"previous (ms)":>14}')
+    for function_count in FUNCTION_COUNTS:
+        code_text = synthetic_module(function_count)
+        parsed_source = ParsedSource(code_text)
+        signatures_time = best_time(lambda: python_functions_signatures(parsed_source), repeat=3)
+
+        previous_time = ''
+        if function_count <= PREVIOUS_IMPLEMENTATION_MAX_FUNCTION_COUNT:
+            assert previous_python_functions_signatures(code_text) == python_functions_signatures(parsed_source)
+            previous_time = best_time(lambda: previous_python_functions_signatures(code_text), repeat=1) * 1000
+            previous_time = f'{previous_time:.1f}'
+
+        print(
+            f'{function_count:>10} {signatures_time * 1000:>16.1f} '
+            f'{signatures_time / function_count * 1e6:>12.2f} {previous_time:>14}'
+        )
+
+
+if __name__ == '__main__':
+    main()
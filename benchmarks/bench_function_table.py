@@ -0,0 +1,72 @@
+"""Compare the memory and query time of a FunctionTable with keeping the ast nodes of the functions it describes."""
+
+import ast
+import os
+import tempfile
+import tracemalloc
+
+from d8s_python import FunctionTable, python_parsed_source
+
+from .utils import best_time, synthetic_module
+
+MODULE_COUNT = 100
+FUNCTIONS_PER_MODULE = 100
+
+
+def _allocated(function):
+    """Return the result of the given function and the number of bytes it leaves allocated."""
+    tracemalloc.start()
+    try:
+        result = function()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def main():
+    code_texts = [synthetic_module(FUNCTIONS_PER_MODULE, nesting_depth=1, seed=seed) for seed in range(MODULE_COUNT)]
+
+    def build_nodes():
+        return [
+            node
+            for code_text in code_texts
+            for node in ast.walk(ast.parse(code_text))
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+
+    def build_table():
+        table = FunctionTable()
+        for index, code_text in enumerate(code_texts):
+            table.add_code(python_parsed_source(code_text), file_path=f'module_{index}.py')
+        return table
+
+    nodes, nodes_size = _allocated(build_nodes)
+    table, table_size = _allocated(build_table)
+
+    def query_nodes():
+        return [
+            node
+            for node in nodes
+            if ast.get_docstring(node) is not None
+            and node.end_lineno - node.lineno + 1 >= 10
+            and len(node.args.args) > 1
+        ]
+
+    nodes_query_time = best_time(query_nodes)
+    table_query_time = best_time(lambda: table.select(has_docstring=True, min_length=10, min_arguments=2))
+    with tempfile.TemporaryDirectory() as directory_path:
+        file_path = os.path.join(directory_path, 'functions.table')
+        table.save(file_path)
+        load_time = best_time(lambda: FunctionTable.load(file_path))
+        file_size = os.path.getsize(file_path)
+
+    print(f'{len(table)} functions')
+    print(f'{"":>12} {"memory (MB)":>12} {"query (ms)":>11}')
+    print(f'{"ast nodes":>12} {nodes_size / 1e6:>12.1f} {nodes_query_time * 1000:>11.2f}')
+    print(f'{"table":>12} {table_size / 1e6:>12.1f} {table_query_time * 1000:>11.2f}')
+    print(f'saved table: {file_size / 1e6:.2f} MB, loaded in {load_time * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
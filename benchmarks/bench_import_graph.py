@@ -0,0 +1,79 @@
+"""Measure the size of python_import_graph's ImportGraph and the speed of its queries and updates.
+
+The generated tree has packages of PACKAGE_SIZE modules and each module imports IMPORTS_PER_MODULE modules...
+(mostly from its own package, with some absolute and relative imports of other packages).
+"""
+
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from d8s_python import python_import_graph
+
+from .utils import best_time
+
+MODULE_COUNTS = (5_000, 50_000)
+PACKAGE_SIZE = 50
+IMPORTS_PER_MODULE = 8
+
+
+def write_tree(directory_path: str, module_count: int, *, seed: int = 0) -> None:
+    """Write a tree of module_count modules (and their packages) to the directory_path."""
+    generator = random.Random(seed)
+    package_count = module_count // PACKAGE_SIZE
+    for package_index in range(package_count):
+        package_path = os.path.join(directory_path, 'monorepo', f'package_{package_index}')
+        os.makedirs(package_path)
+        with open(os.path.join(package_path, '__init__.py'), 'w') as f:
+            f.write('from . import module_0\n')
+
+        for module_index in range(PACKAGE_SIZE - 1):
+            imports = []
+            for _ in range(IMPORTS_PER_MODULE):
+                other_index = generator.randrange(PACKAGE_SIZE - 1)
+                if generator.random() < 0.8:
+                    imports.append(f'from . import module_{other_index}')
+                elif generator.random() < 0.5:
+                    other_package = generator.randrange(package_count)
+                    imports.append(f'import monorepo.package_{other_package}.module_{other_index}')
+                else:
+                    other_package = generator.randrange(package_count)
+                    imports.append(f'from ..package_{other_package}.module_{other_index} import name')
+            imports.append('import os, sys')
+            with open(os.path.join(package_path, f'module_{module_index}.py'), 'w') as f:
+                f.write('\n'.join(imports) + '\n')
+
+
+def main():
+    print(
+        f'{"modules":>8} {"build (s)":>10} {"graph (MB)":>11} {"deps (ms)":>10} {"dependents (ms)":>16} '
+        f'{"cycles (ms)":>12} {"update (ms)":>12}'
+    )
+    for module_count in MODULE_COUNTS:
+        with tempfile.TemporaryDirectory() as directory_path:
+            write_tree(directory_path, module_count)
+
+            start = time.perf_counter()
+            tracemalloc.start()
+            graph = python_import_graph(directory_path, max_workers=1)
+            graph_size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            build_time = time.perf_counter() - start
+
+            module_name = 'monorepo.package_0.module_0'
+            dependencies_time = best_time(lambda: graph.dependencies(module_name, transitive=True), repeat=5)
+            dependents_time = best_time(lambda: graph.dependents(module_name, transitive=True), repeat=5)
+            cycles_time = best_time(graph.cycles, repeat=1)
+            update_time = best_time(lambda: graph.update_file(graph.module_file_path(module_name)), repeat=5)
+
+            print(
+                f'{len(graph):>8} {build_time:>10.1f} {graph_size / 1024 / 1024:>11.1f} '
+                f'{dependencies_time * 1000:>10.1f} {dependents_time * 1000:>16.1f} {cycles_time * 1000:>12.1f} '
+                f'{update_time * 1000:>12.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Compare N type queries against a 10k-line module with and without the AstNodeIndex."""
+
+import ast
+
+from d8s_python import ParsedSource, python_ast_objects_of_type
+
+from .utils import best_time, synthetic_module_with_lines
+
+LINE_COUNT = 10_000
+QUERY_TYPES = [
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ExceptHandler,
+    ast.Raise,
+    ast.Name,
+    ast.Call,
+    ast.Return,
+    ast.If,
+    ast.For,
+    ast.Try,
+    (ast.FunctionDef, ast.AsyncFunctionDef),
+    ast.expr,
+]
+
+
+def current_queries(code_text: str) -> None:
+    """Run every query the way the functions did before the index existed (parsing and walking for every query)."""
+    for ast_type in QUERY_TYPES:
+        tuple(python_ast_objects_of_type(code_text, ast_type))
+
+
+def walk_queries(parsed_code: ast.Module) -> None:
+    """Run every query with a full ast.walk of an already parsed module."""
+    for ast_type in QUERY_TYPES:
+        tuple(python_ast_objects_of_type(parsed_code, ast_type))
+
+
+def index_queries(code_text: str) -> None:
+    """Run every query against the index of a new ParsedSource (so parsing and indexing are included)."""
+    parsed_source = ParsedSource(code_text)
+    for ast_type in QUERY_TYPES:
+        tuple(python_ast_objects_of_type(parsed_source, ast_type))
+
+
+def main():
+    code_text = synthetic_module_with_lines(LINE_COUNT)
+    parsed_code = ast.parse(code_text)
+
+    current_time = best_time(lambda: current_queries(code_text), repeat=3)
+    walk_time = best_time(lambda: walk_queries(parsed_code), repeat=3)
+    index_time = best_time(lambda: index_queries(code_text), repeat=3)
+    print(f'{len(QUERY_TYPES)} type queries on a {LINE_COUNT} line module')
+    print(f'  parse + ast.walk per query:    {current_time * 1000:8.1f} ms')
+    print(f'  ast.walk per query (no parse): {walk_time * 1000:8.1f} ms')
+    print(f'  ParsedSource + AstNodeIndex:   {index_time * 1000:8.1f} ms ({current_time / index_time:.1f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
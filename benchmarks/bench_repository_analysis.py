@@ -0,0 +1,45 @@
+"""Show how python_files_analyze's throughput scales from one worker process to one per core."""
+
+import os
+import tempfile
+
+from d8s_python import python_files_analyze
+
+from .utils import best_time, synthetic_module
+
+FILE_COUNT = 400
+EXTRACTORS = [
+    'python_function_names',
+    'python_function_docstrings',
+    'python_package_imports',
+    'python_exceptions_raised',
+    'python_todos',
+    'python_functions_signatures',
+]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory_path:
+        for index in range(FILE_COUNT):
+            # use a mix of file sizes so that the scheduling of large files matters
+            code_text = synthetic_module(10 + (index % 10) ** 3 // 4)
+            with open(os.path.join(directory_path, f'module_{index}.py'), 'w') as f:
+                f.write(code_text)
+
+        print(f'python_files_analyze on {FILE_COUNT} files with {len(EXTRACTORS)} extractors')
+        print(f'{"workers":>8} {"chunk size":>11} {"seconds":>8} {"files/s":>8}')
+        cpu_count = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+        for max_workers in worker_counts:
+            for chunk_size in (1, 8):
+                analysis_time = best_time(
+                    lambda: list(
+                        python_files_analyze(directory_path, EXTRACTORS, max_workers=max_workers, chunk_size=chunk_size)
+                    ),
+                    repeat=1,
+                )
+                print(f'{max_workers:>8} {chunk_size:>11} {analysis_time:>8.2f} {FILE_COUNT / analysis_time:>8.0f}')
+
+
+if __name__ == '__main__':
+    main()
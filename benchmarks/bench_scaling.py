@@ -0,0 +1,206 @@
+"""Time every public function which takes code_text on generated modules of increasing size and report how each scales.
+
+The complexity of each function is estimated by fitting a line to log(time) against log(line count); a slope...
+greater than --max-slope (1 is linear) flags the function as superlinear if it was timed on at least three sizes...
+for at least --min-seconds in total (shorter or sparser timings are too noisy to fit). d8s_python's in-memory...
+caches are cleared before each repeat so memoized functions are timed doing their work rather than hitting...
+their caches. The results are written as JSON (to stdout or to --output) and a summary is written to stderr....
+With --check, the exit status is 1 if any function is flagged. For example:
+
+    python -m benchmarks.bench_scaling --sizes 1000 4000 16000 --exception-density 0.2 --output scaling.json
+"""
+
+import argparse
+import ast
+import contextlib
+import inspect
+import io
+import json
+import math
+import sys
+import time
+import typing
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import d8s_python
+import d8s_python.ast_data
+import d8s_python.bytecode_data
+from d8s_python import ParsedSource
+
+from .utils import best_time, synthetic_module_with_lines
+
+DEFAULT_SIZES = (1_000, 2_000, 4_000, 8_000)
+DEFAULT_MAX_SLOPE = 1.25
+# a function is only flagged as superlinear if it was timed on at least this many sizes...
+MIN_FLAGGED_SIZES = 3
+# and if its (best) times add up to at least this many seconds
+DEFAULT_MIN_SECONDS = 0.05
+# the arguments (after code_text) which functions that need more than the code_text are given
+EXTRA_ARGUMENTS: Dict[str, Tuple[Any, ...]] = {
+    'python_functions_as_import_string': ('benchmark_module',),
+    'python_ast_objects_of_type': (ast.FunctionDef,),
+    'python_ast_objects_not_of_type': (ast.FunctionDef,),
+}
+
+
+def code_text_functions() -> Dict[str, Callable[..., Any]]:
+    """Return every public function in d8s_python whose first argument is code_text (i.e. it accepts a ParsedSource)."""
+    functions = {}
+    for name in d8s_python.__all__:
+        function = getattr(d8s_python, name)
+        if not inspect.isfunction(function):
+            continue
+
+        parameters = list(inspect.signature(function).parameters.values())
+        if parameters and ParsedSource in typing.get_args(parameters[0].annotation):
+            functions[name] = function
+    return functions
+
+
+def clear_caches() -> None:
+    """Clear d8s_python's in-memory caches of code objects and parse failures."""
+    code_cache = d8s_python.bytecode_data._CODE_CACHE
+    with code_cache._lock:
+        code_cache._entries.clear()
+    with d8s_python.ast_data._PARSE_FAILURES_LOCK:
+        d8s_python.ast_data._PARSE_FAILURES.clear()
+
+
+def run_function(function: Callable[..., Any], code_text: str, extra_arguments: Tuple[Any, ...]) -> None:
+    """Run the function on the code_text (consuming its results if it is lazy and discarding anything it prints)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(code_text, *extra_arguments)
+        if isinstance(result, typing.Iterator):
+            list(result)
+
+
+def fitted_slope(sizes: Sequence[int], seconds: Sequence[float]) -> float:
+    """Return the slope of the least-squares line through (log(size), log(seconds))."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(second, 1e-9)) for second in seconds]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    variance = sum((x - x_mean) ** 2 for x in xs)
+    return covariance / variance if variance else 0.0
+
+
+def benchmark(
+    functions: Dict[str, Callable[..., Any]],
+    modules: Dict[int, str],
+    *,
+    repeat: int,
+    time_budget: float,
+    max_slope: float,
+    min_seconds: float,
+) -> List[Dict[str, Any]]:
+    """Time each function on each module (larger modules are skipped once a function takes longer than time_budget)."""
+    results = []
+    for name, function in functions.items():
+        extra_arguments = EXTRA_ARGUMENTS.get(name, ())
+        sizes: List[int] = []
+        seconds: List[float] = []
+        error = None
+        for size, code_text in modules.items():
+            start = time.perf_counter()
+            try:
+                seconds.append(
+                    best_time(
+                        lambda: run_function(function, code_text, extra_arguments), repeat=repeat, setup=clear_caches
+                    )
+                )
+            except Exception as e:  # pylint: disable=W0703
+                error = f'{type(e).__name__}: {e}'
+                break
+            sizes.append(size)
+            if time.perf_counter() - start > time_budget:
+                break
+
+        slope = fitted_slope(sizes, seconds) if len(sizes) > 1 else None
+        is_flaggable = len(sizes) >= MIN_FLAGGED_SIZES and sum(seconds) >= min_seconds
+        results.append(
+            {
+                'function': name,
+                'lines': sizes,
+                'seconds': seconds,
+                'slope': slope,
+                'superlinear': is_flaggable and slope > max_slope,
+                'error': error,
+            }
+        )
+    return results
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='module sizes (in lines)')
+    parser.add_argument('--nesting-depth', type=int, default=0)
+    parser.add_argument('--line-length', type=int, default=None)
+    parser.add_argument('--exception-density', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--functions', nargs='+', help='only benchmark the functions with these names')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--time-budget', type=float, default=10.0, help='seconds per function and size')
+    parser.add_argument('--max-slope', type=float, default=DEFAULT_MAX_SLOPE)
+    parser.add_argument(
+        '--min-seconds',
+        type=float,
+        default=DEFAULT_MIN_SECONDS,
+        help='the least total time for which a function can be flagged',
+    )
+    parser.add_argument('--output', help='write the JSON results to this file (instead of stdout)')
+    parser.add_argument('--check', action='store_true', help='exit with status 1 if any function is superlinear')
+    arguments = parser.parse_args(argv)
+
+    generator_options = {
+        'nesting_depth': arguments.nesting_depth,
+        'line_length': arguments.line_length,
+        'exception_density': arguments.exception_density,
+        'seed': arguments.seed,
+    }
+    # the modules are keyed by their actual line counts (which are what the complexity is fitted against)
+    modules = {}
+    for size in sorted(arguments.sizes):
+        code_text = synthetic_module_with_lines(size, **generator_options)
+        modules[len(code_text.splitlines())] = code_text
+    functions = code_text_functions()
+    if arguments.functions:
+        functions = {name: functions[name] for name in arguments.functions}
+
+    results = benchmark(
+        functions,
+        modules,
+        repeat=arguments.repeat,
+        time_budget=arguments.time_budget,
+        max_slope=arguments.max_slope,
+        min_seconds=arguments.min_seconds,
+    )
+    report = {
+        'python_version': sys.version.split()[0],
+        'd8s_python_version': d8s_python.__version__,
+        'generator': generator_options,
+        'module_bytes': {size: len(code_text.encode()) for size, code_text in modules.items()},
+        'max_slope': arguments.max_slope,
+        'min_seconds': arguments.min_seconds,
+        'results': results,
+        'superlinear': [result['function'] for result in results if result['superlinear']],
+    }
+
+    report_json = json.dumps(report, indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            f.write(report_json + '\n')
+    else:
+        print(report_json)
+
+    for result in results:
+        slope = 'n/a' if result['slope'] is None else f'{result["slope"]:.2f}'
+        flag = '  SUPERLINEAR' if result['superlinear'] else ''
+        error = f'  ({result["error"]})' if result['error'] else ''
+        print(f'{result["function"]:<50} slope {slope:>5}{flag}{error}', file=sys.stderr)
+
+    return 1 if arguments.check and report['superlinear'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
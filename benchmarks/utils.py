@@ -0,0 +1,90 @@
+import random
+import textwrap
+import timeit
+from typing import Callable, Optional
+
+FUNCTION_TEMPLATE = '''def function_{index}(a, b: int = {index}) -> int:
+    """Docstring for function_{index}."""
+    total = a + b
+{long_line}{exception_block}    for i in range(total):
+        if i % 2:
+            total += i
+{nested_function}    return total
+'''
+EXCEPTION_BLOCK_TEMPLATE = '''    try:
+        total = total / (a - {index})
+    except ZeroDivisionError as e:
+        raise ValueError('bad value') from e
+'''
+LONG_LINE_TEMPLATE = "    message = f'{{total}} {padding}'\n"
+
+
+def _synthetic_function(
+    index: int, nesting_depth: int, *, line_length: Optional[int], exception_density: float, rng: random.Random
+) -> str:
+    """Generate a function with nesting_depth levels of functions nested inside of it."""
+    nested_function = ''
+    if nesting_depth:
+        nested_function = _synthetic_function(
+            index, nesting_depth - 1, line_length=line_length, exception_density=exception_density, rng=rng
+        )
+        nested_function = textwrap.indent(nested_function, '    ')
+
+    long_line = ''
+    if line_length:
+        padding_length = max(0, line_length - len(LONG_LINE_TEMPLATE.format(padding='')) + 1)
+        long_line = LONG_LINE_TEMPLATE.format(padding='x' * padding_length)
+
+    exception_block = ''
+    if rng.random() < exception_density:
+        exception_block = EXCEPTION_BLOCK_TEMPLATE.format(index=index)
+
+    return FUNCTION_TEMPLATE.format(
+        index=index, long_line=long_line, exception_block=exception_block, nested_function=nested_function
+    )
+
+
+def synthetic_module(
+    function_count: int,
+    *,
+    nesting_depth: int = 0,
+    line_length: Optional[int] = None,
+    exception_density: float = 1.0,
+    seed: int = 0,
+) -> str:
+    """Generate python code with the given number of top-level functions.
+
+    Each top-level function has nesting_depth levels of functions nested inside of it. If line_length is given,...
+    each function has a line (an f-string assignment) which is line_length characters long. exception_density is...
+    the fraction of functions which have a try/except block that raises an exception. The same arguments always...
+    generate the same code.
+    """
+    rng = random.Random(seed)
+    return '\n\n'.join(
+        _synthetic_function(index, nesting_depth, line_length=line_length, exception_density=exception_density, rng=rng)
+        for index in range(function_count)
+    )
+
+
+def synthetic_module_with_lines(line_count: int, **options) -> str:
+    """Generate python code with (approximately) the given number of lines.
+
+    The options are passed to synthetic_module.
+    """
+    # the functions are separated by two lines
+    sample_line_count = len(synthetic_module(10, **options).splitlines()) + 2
+    return synthetic_module(max(1, line_count * 10 // sample_line_count), **options)
+
+
+def best_time(
+    function: Callable[[], object],
+    *,
+    repeat: int = 5,
+    number: int = 1,
+    setup: Optional[Callable[[], object]] = None,
+) -> float:
+    """Return the fastest time (in seconds) of the given function over the given number of repeats....
+
+    If a setup function is given, it is run (untimed) before each repeat.
+    """
+    return min(timeit.repeat(function, setup=setup or 'pass', repeat=repeat, number=number)) / number
@@ -2,5 +2,175 @@ __version__ = '0.9.0'
 __author__ = '''Floyd Hightower'''
 __email__ = 'floyd.hightower27@gmail.com'
 
-from .ast_data import *
-from .python_data import *
+# the functions in this package are imported from their modules the first time they are used (so importing the...
+# package is quick); the names below must match the __all__ of each module (which tests/test_init.py checks for...
+# every module in the package)
+_MODULE_EXPORTS = {
+    'ast_data': (
+        'CodeText',
+        'AstType',
+        'ParsedSource',
+        'AstNodeIndex',
+        'python_parsed_source',
+        'python_ast_node_index',
+        'ExceptionRecord',
+        'python_exception_records',
+        'python_ast_raise_name',
+        'python_ast_exception_handler_exceptions_handled',
+        'python_ast_exception_handler_exceptions_raised',
+        'python_exceptions_handled',
+        'python_exceptions_raised',
+        'python_functions_as_import_string',
+        'python_ast_object_line_number',
+        'python_ast_object_line_numbers',
+        'python_ast_traverse',
+        'python_ast_objects_of_type',
+        'python_ast_objects_not_of_type',
+        'python_ast_parse',
+        'ParseError',
+        'python_ast_try_parse',
+        'python_ast_function_defs',
+        'python_function_arguments',
+        'python_function_argument_names',
+        'python_function_argument_defaults',
+        'python_function_argument_annotations',
+        'python_function_names',
+        'python_function_docstrings',
+        'python_variable_names',
+        'python_constants',
+    ),
+    'python_data': (
+        'python_functions_signatures',
+        'python_todos',
+        'python_make_pythonic',
+        'python_namespace_has_argument',
+        'python_traceback_prettify',
+        'python_traceback_pretty_print',
+        'python_clean',
+        'python_function_blocks',
+        'python_line_count',
+        'python_function_lengths',
+        'python_version',
+        'python_is_version_2',
+        'python_is_version_3',
+        'python_files_using_functions',
+        'python_files_using_function',
+        'python_keywords',
+        'python_object_properties_enumerate',
+        'python_copy_deep',
+        'python_copy_shallow',
+        'python_file_names',
+        'python_fstrings',
+        'python_code_details',
+        'python_disassemble',
+        'python_stack_local_data',
+        'python_object_doc_string',
+        'python_object_source_file',
+        'python_object_module',
+        'python_object_source_code',
+        'python_object_signature',
+        'python_sort_type_list_by_name',
+        'python_type_name',
+        'python_object_type_to_word',
+        'python_package_imports',
+    ),
+    'cache_data': (
+        'AnalysisCache',
+        'python_file_content_hash',
+    ),
+    'fstring_data': (
+        'FStringExpression',
+        'python_fstring_expressions',
+    ),
+    'todo_data': (
+        'DEFAULT_TODO_MARKERS',
+        'Todo',
+        'python_comments',
+        'python_todos_in_file_object',
+        'python_file_todos',
+        'python_files_todos',
+    ),
+    'metrics_data': (
+        'python_metrics_enable',
+        'python_metrics_disable',
+        'python_metrics_enabled',
+        'python_metrics_recording',
+        'python_metrics_reset',
+        'python_metrics_snapshot',
+        'python_metrics_prometheus',
+    ),
+    'import_data': (
+        'ImportStatement',
+        'ImportGraph',
+        'python_import_statements',
+        'python_import_graph',
+    ),
+    'symbol_data': (
+        'SYMBOL_KINDS',
+        'Symbol',
+        'SymbolScope',
+        'SymbolIndex',
+        'python_symbol_index',
+    ),
+    'function_data': (
+        'FunctionLengths',
+        'FunctionLengthSummary',
+        'FunctionRecord',
+        'FunctionTable',
+        'python_function_length_metrics',
+        'python_function_length_summary',
+        'python_function_records',
+        'python_function_table',
+    ),
+    'call_data': (
+        'CallSite',
+        'CallSiteIndex',
+        'python_call_sites',
+    ),
+    'bytecode_data': (
+        'CodeInstructions',
+        'python_code_object',
+        'python_bytecode',
+        'python_files_bytecode',
+        'python_opcode_histogram',
+        'python_instruction_counts',
+    ),
+    'object_data': (
+        'ObjectProperty',
+        'python_object_properties',
+    ),
+    'async_data': (
+        'DEFAULT_MAX_PENDING',
+        'python_file_names_async',
+        'python_file_paths_async',
+        'python_files_using_function_async',
+        'python_files_analyze_async',
+        'python_object_source_code_async',
+    ),
+    'repository_data': (
+        'Extractor',
+        'FileAnalysis',
+        'python_file_paths',
+        'python_file_analyze',
+        'python_files_analyze',
+    ),
+}
+_EXPORT_MODULES = {name: module_name for module_name, names in _MODULE_EXPORTS.items() for name in names}
+
+__all__ = list(_EXPORT_MODULES)
+
+
+def __getattr__(name: str):
+    """Import the given name from the module which defines it."""
+    import importlib
+
+    if name not in _EXPORT_MODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(importlib.import_module(f'.{_EXPORT_MODULES[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,100 +1,460 @@
 import ast
-from typing import Iterable, List, Optional, Tuple, Union
+import bisect
+import collections
+import functools
+import heapq
+import io
+import mmap
+import os
+import re
+import threading
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .metrics_data import _METRICS, _instrumented, _timed
+
+if TYPE_CHECKING:
+    from .symbol_data import SymbolIndex
+
+__all__ = [
+    'CodeText',
+    'AstType',
+    'ParsedSource',
+    'AstNodeIndex',
+    'python_parsed_source',
+    'python_ast_node_index',
+    'ExceptionRecord',
+    'python_exception_records',
+    'python_ast_raise_name',
+    'python_ast_exception_handler_exceptions_handled',
+    'python_ast_exception_handler_exceptions_raised',
+    'python_exceptions_handled',
+    'python_exceptions_raised',
+    'python_functions_as_import_string',
+    'python_ast_object_line_number',
+    'python_ast_object_line_numbers',
+    'python_ast_traverse',
+    'python_ast_objects_of_type',
+    'python_ast_objects_not_of_type',
+    'python_ast_parse',
+    'ParseError',
+    'python_ast_try_parse',
+    'python_ast_function_defs',
+    'python_function_arguments',
+    'python_function_argument_names',
+    'python_function_argument_defaults',
+    'python_function_argument_annotations',
+    'python_function_names',
+    'python_function_docstrings',
+    'python_variable_names',
+    'python_constants',
+]
+
+# the most parse failures which are remembered by python_ast_try_parse
+_PARSE_FAILURE_CACHE_SIZE = 4096
+
+# files at least this big are memory-mapped (rather than read into memory) when code is read from a file
+_MMAP_THRESHOLD_BYTES = 1024 * 1024
+
+SourceBytes = Union[bytes, bytearray, memoryview, mmap.mmap]
+_SOURCE_BYTES_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+
+def _python_file_object_source(file_object: BinaryIO) -> Union[str, SourceBytes]:
+    """Read the code in the file_object (a binary file is memory-mapped if it is large and is read from its start)."""
+    try:
+        file_descriptor = file_object.fileno()
+        is_large = os.fstat(file_descriptor).st_size >= _MMAP_THRESHOLD_BYTES
+        is_mappable = is_large and 'b' in getattr(file_object, 'mode', '') and file_object.tell() == 0
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        is_mappable = False
+
+    if is_mappable:
+        return mmap.mmap(file_descriptor, 0, access=mmap.ACCESS_READ)
+    return file_object.read()
+
+
+def _python_source(code_text: object) -> Union[str, SourceBytes]:
+    """Return the code in the given code_text as a str or as bytes (paths and file objects are read)."""
+    if isinstance(code_text, (str,) + _SOURCE_BYTES_TYPES):
+        return code_text
+    elif isinstance(code_text, os.PathLike):
+        with open(code_text, 'rb') as f:
+            return _python_file_object_source(f)
+    elif hasattr(code_text, 'read'):
+        return _python_file_object_source(code_text)
+    raise TypeError(f'Expected python code (a str, bytes, path, or file object), but got a {type(code_text).__name__}')
+
+
+def _python_is_code_text(code_text_or_ast_object: object) -> bool:
+    """Return whether or not the given object is code (rather than an ast object)."""
+    return isinstance(code_text_or_ast_object, (str, os.PathLike) + _SOURCE_BYTES_TYPES) or hasattr(
+        code_text_or_ast_object, 'read'
+    )
 
-import more_itertools
-from d8s_lists import iterable_replace, truthy_items
 
-# TODO: all of these functions where code_text is given should also be able to read a file at a given path (?)
+def _python_decode_source(source: SourceBytes) -> str:
+    """Decode the given source using the encoding declared in it (see PEP 263) or utf-8....
 
+    Like the parser, a utf-8 byte order mark is removed and line breaks are kept as they are.
+    """
+    import tokenize
 
-def _python_ast_exception_name(node: Union[ast.Raise, ast.ExceptHandler]) -> str:  # noqa: CCR001
-    """."""
-    if hasattr(node, 'exc') and node.exc:  # this handles ast.Raise nodes
-        if hasattr(
-            node.exc, 'id'
-        ):  # this handles ast.Raise nodes where the exception being raised is an ast.Name (e.g. "e" or "ValueError")
-            return node.exc.id
-        elif hasattr(
-            node.exc.func, 'id'
-        ):  # handles ast.Raise nodes where the exception being raised is an ast.Call (e.g. "ValueError('Foo Bar')")
-            return node.exc.func.id
-        elif hasattr(
-            node.exc.func, 'attr'
-        ):  # this handles ast.Raise nodes raising a non-built-in error (e.g. "pint.UndefinedUnitError")
-            return f'{node.exc.func.value.id}.{node.exc.func.attr}'
-    elif hasattr(node, 'type') and node.type:  # this handles ast.ExceptHandler nodes
-        if hasattr(
-            node.type, 'id'
-        ):  # this handles ast.ExceptHandler nodes raising a built-in error (e.g. "RuntimeError")
-            return node.type.id
-        elif hasattr(
-            node.type, 'attr'
-        ):  # this handles ast.ExceptHandler nodes raising a non-built-in error (e.g. "pint.UndefinedUnitError")
-            return f'{node.type.value.id}.{node.type.attr}'
-    elif hasattr(
-        node, 'attr'
-    ):  # this handles situations where the exception being raised is an ast.Attribute (e.g. "pint.UndefinedUnitError")
-        return f'{node.value.id}.{node.attr}'
-    elif hasattr(node, 'id'):  # this handles situations where the exception being raised is an ast.Name (e.g. "e")
+    if isinstance(source, memoryview):
+        source = source.tobytes()
+
+    position = 0
+
+    def readline() -> bytes:
+        nonlocal position
+        line_end = source.find(b'\n', position)
+        line_end = len(source) if line_end == -1 else line_end + 1
+        line = bytes(source[position:line_end])
+        position = line_end
+        return line
+
+    encoding, _ = tokenize.detect_encoding(readline)
+    return str(source, encoding)
+
+
+def _python_line_offsets(code_text: str) -> List[int]:
+    """Return the offset at which each line starts in the code_text (lines are split the way the parser splits them)."""
+    return [0] + [match.end() for match in re.finditer('\r\n|\r|\n', code_text)]
+
+
+def _python_offset_position(code_text: str, line_offsets: List[int], offset: int) -> Tuple[int, int]:
+    """Return the lineno and col_offset (a number of utf-8 bytes) of the given offset in the code_text."""
+    line_index = bisect.bisect_right(line_offsets, offset) - 1
+    line_prefix = code_text[line_offsets[line_index] : offset]  # noqa=E203
+    col_offset = len(line_prefix) if line_prefix.isascii() else len(line_prefix.encode('utf-8', 'surrogatepass'))
+    return line_index + 1, col_offset
+
+
+class ParsedSource:
+    """Python code which has been parsed once so it can be shared by every function which takes code_text.
+
+    Any function in this package which takes code_text will also accept a ParsedSource. Data derived from the...
+    code (like the lines of the code) is built lazily and cached on the ParsedSource.
+
+    The code may be given as a str, as bytes, or as a path (an os.PathLike like a pathlib.Path, since a str is...
+    code) or binary file object to read the code from. Bytes are given to the parser as they are and are only...
+    decoded (using the encoding declared in the code (see PEP 263)) if the code_text is needed. The code is...
+    parsed with python_ast_parse (using strict).
+    """
+
+    def __init__(self, code_text: Union[str, SourceBytes, 'os.PathLike[str]', BinaryIO], *, strict: bool = False):
+        source = _python_source(code_text)
+        if isinstance(source, str):
+            self.code_text = source
+            self.source_bytes: Optional[SourceBytes] = None
+        else:
+            self.source_bytes = source
+        self.module = python_ast_parse(source, strict=strict)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.code_text!r})'
+
+    @functools.cached_property
+    def code_text(self) -> str:
+        """The text of the code (decoded from the source_bytes)."""
+        return _python_decode_source(self.source_bytes)
+
+    @functools.cached_property
+    def lines(self) -> List[str]:
+        """The lines of the code_text."""
+        return self.code_text.splitlines()
+
+    @functools.cached_property
+    def line_offsets(self) -> List[int]:
+        """The offset at which each line starts in the code_text (lines are split the way the parser splits them)."""
+        return _python_line_offsets(self.code_text)
+
+    def lines_text(self, start: int, end: int) -> str:
+        """Return the text of the lines from the start line number through the end line number (inclusive)."""
+        line_offsets = self.line_offsets
+        if end < len(line_offsets):
+            text = self.code_text[line_offsets[start - 1] : line_offsets[end]]  # noqa=E203
+            # remove the line break at the end of the last line
+            text = text[:-2] if text.endswith('\r\n') else text[:-1]
+        else:
+            text = self.code_text[line_offsets[start - 1] :]  # noqa=E203
+
+        if '\r' in text:
+            text = re.sub(r'\r\n?', '\n', text)
+        return text
+
+    def offset(self, lineno: int, col_offset: int) -> int:
+        """Return the offset in the code_text of the given lineno and col_offset (as found on an ast object)."""
+        line_start = self.line_offsets[lineno - 1]
+        if self.code_text[line_start : line_start + col_offset].isascii():  # noqa=E203
+            return line_start + col_offset
+
+        # the col_offset of an ast object is a number of utf-8 bytes rather than a number of characters
+        line_end = self.line_offsets[lineno] if lineno < len(self.line_offsets) else len(self.code_text)
+        line_bytes = self.code_text[line_start:line_end].encode('utf-8')
+        return line_start + len(line_bytes[:col_offset].decode('utf-8', errors='ignore'))
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Return the lineno and col_offset (as found on an ast object) of the given offset in the code_text."""
+        return _python_offset_position(self.code_text, self.line_offsets, offset)
+
+    @functools.cached_property
+    def node_index(self) -> 'AstNodeIndex':
+        """An index of the module's ast objects by type."""
+        return AstNodeIndex(self.module)
+
+    @functools.cached_property
+    def symbol_index(self) -> 'SymbolIndex':
+        """An index of the module's scopes and of the names defined and used in them (see python_symbol_index)."""
+        from .symbol_data import SymbolIndex
+
+        return SymbolIndex(self.module)
+
+
+AstType = Union[type, Tuple[type, ...]]
+
+
+class AstNodeIndex:
+    """An index of the ast objects in an ast object by their type (built with a single walk of the ast object).
+
+    Objects are returned in the order in which ast.walk finds them. Once the index is built, looking up the...
+    objects of a type (or tuple of types) costs O(matches) rather than a walk of the entire tree.
+    """
+
+    def __init__(self, ast_object: object):
+        with _timed('AstNodeIndex'):
+            self.ast_object = ast_object
+            self._nodes = list(ast.walk(ast_object))
+            self._positions = self._positions_by_type(self._nodes)
+
+            body = getattr(ast_object, 'body', None)
+            self._top_level_nodes = [ast_object] + (body if isinstance(body, list) else [])
+            self._top_level_positions = self._positions_by_type(self._top_level_nodes)
+
+        self._cache: Dict[Tuple[AstType, bool], Tuple[object, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @staticmethod
+    def _positions_by_type(nodes: List[object]) -> Dict[type, List[int]]:
+        """Map each type in the given nodes to the positions of the nodes of that type."""
+        positions = collections.defaultdict(list)
+        for position, node in enumerate(nodes):
+            positions[type(node)].append(position)
+        return positions
+
+    def objects_of_type(self, ast_type: AstType, *, recursive_search: bool = True) -> Tuple[object, ...]:
+        """Return all of the indexed ast objects of the given ast_type (which may be a tuple of types).
+
+        If recursive_search is False, only the indexed ast object and its top-level body are searched.
+        """
+        key = (ast_type, recursive_search)
+        if _METRICS.enabled:
+            _METRICS.cache_lookup('ast_node_index', key in self._cache)
+        if key not in self._cache:
+            if recursive_search:
+                nodes, positions = self._nodes, self._positions
+            else:
+                nodes, positions = self._top_level_nodes, self._top_level_positions
+
+            matching_positions = [
+                type_positions for node_type, type_positions in positions.items() if issubclass(node_type, ast_type)
+            ]
+            if len(matching_positions) > 1:
+                matching_positions = [heapq.merge(*matching_positions)]
+
+            self._cache[key] = tuple(
+                nodes[position] for type_positions in matching_positions for position in type_positions
+            )
+        return self._cache[key]
+
+
+CodeText = Union[str, SourceBytes, 'os.PathLike[str]', BinaryIO, ParsedSource]
+
+
+def python_parsed_source(code_text: CodeText) -> ParsedSource:
+    """Return a ParsedSource for the given code_text (the code_text is only parsed if it is not already parsed)."""
+    if isinstance(code_text, ParsedSource):
+        return code_text
+    return ParsedSource(code_text)
+
+
+def python_ast_node_index(code_text_or_ast_object: Union[CodeText, object]) -> AstNodeIndex:
+    """Return an index of the ast objects in the code_text_or_ast_object by type.
+
+    If a ParsedSource is given, its (cached) index is returned.
+    """
+    if isinstance(code_text_or_ast_object, ParsedSource):
+        return code_text_or_ast_object.node_index
+    elif _python_is_code_text(code_text_or_ast_object):
+        return python_parsed_source(code_text_or_ast_object).node_index
+    return AstNodeIndex(code_text_or_ast_object)
+
+
+def _python_code_text(code_text: CodeText) -> str:
+    """Return the text of the given code_text."""
+    if isinstance(code_text, ParsedSource):
+        return code_text.code_text
+
+    source = _python_source(code_text)
+    return source if isinstance(source, str) else _python_decode_source(source)
+
+
+def _python_ast_dotted_name(node: object) -> Optional[str]:
+    """Return the dotted name of the given ast.Name, ast.Attribute, or ast.Call (e.g. "a.b.FooError")."""
+    if isinstance(node, ast.Call):
+        return _python_ast_dotted_name(node.func)
+    elif isinstance(node, ast.Attribute):
+        value_name = _python_ast_dotted_name(node.value)
+        return f'{value_name}.{node.attr}' if value_name else None
+    elif isinstance(node, ast.Name):
         return node.id
+    return None
+
+
+class ExceptionRecord(NamedTuple):
+    """An exception raised or handled in python code."""
+
+    # the dotted name of the exception (this is None for a bare raise outside of an exception handler...
+    # and for a bare except)
+    name: Optional[str]
+    # either 'raised' or 'handled'
+    kind: str
+    line_number: int
+    col_offset: int
+    # the qualified name of the function the exception is raised or handled in (None at module level)
+    function_name: Optional[str]
+    # the line number of the exception handler whose exception is re-raised (by a bare raise or by raising the...
+    # handler's name); re-raises produce a record for each exception the handler handles (a re-raise in a bare...
+    # except produces one record whose name is None)
+    handler_line_number: Optional[int] = None
+
+
+def _python_exception_handled_records(
+    handler: ast.ExceptHandler, function_name: Optional[str]
+) -> Iterator[ExceptionRecord]:
+    """."""
+    if handler.type is None:
+        yield ExceptionRecord(None, 'handled', handler.lineno, handler.col_offset, function_name)
+        return
+
+    exception_types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    for exception_type in exception_types:
+        yield ExceptionRecord(
+            _python_ast_dotted_name(exception_type),
+            'handled',
+            exception_type.lineno,
+            exception_type.col_offset,
+            function_name,
+        )
+
+
+def _python_exception_raised_records(
+    node: ast.Raise, handlers: List[ast.ExceptHandler], function_name: Optional[str]
+) -> Iterator[ExceptionRecord]:
+    """."""
+    if node.exc is None:
+        reraised_handler = handlers[-1] if handlers else None
+    elif isinstance(node.exc, ast.Name):
+        reraised_handler = next((handler for handler in reversed(handlers) if handler.name == node.exc.id), None)
+    else:
+        reraised_handler = None
+
+    if reraised_handler is None:
+        name = None if node.exc is None else _python_ast_dotted_name(node.exc)
+        yield ExceptionRecord(name, 'raised', node.lineno, node.col_offset, function_name)
+        return
+
+    for handled_record in _python_exception_handled_records(reraised_handler, function_name):
+        yield ExceptionRecord(
+            handled_record.name, 'raised', node.lineno, node.col_offset, function_name, reraised_handler.lineno
+        )
+
+
+@_instrumented
+def python_exception_records(code_text_or_ast_object: Union[CodeText, object]) -> Iterator[ExceptionRecord]:
+    """Yield a record of every exception raised or handled in the code_text_or_ast_object (in source order)....
+
+    The code is traversed once. A bare raise (or raising the name an exception handler binds the exception...
+    to) inside an exception handler yields a record for each of the exceptions the handler handles.
+    """
+    if isinstance(code_text_or_ast_object, ParsedSource) or _python_is_code_text(code_text_or_ast_object):
+        parsed_code = python_ast_parse(code_text_or_ast_object)
+    else:
+        parsed_code = code_text_or_ast_object
+
+    # each scope is the qualified name of a function or class and the exception handlers it is in (a bare raise...
+    # in a function defined in an exception handler does not re-raise that handler's exception)
+    scopes: List[Tuple[Optional[str], List[ast.ExceptHandler]]] = [(None, [])]
+    function_names: List[Optional[str]] = [None]
+    pending_records: List[ExceptionRecord] = []
+
+    def enter(node: object) -> None:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            scope_name, _ = scopes[-1]
+            qualified_name = f'{scope_name}.{node.name}' if scope_name else node.name
+            is_function = not isinstance(node, ast.ClassDef)
+            scopes.append((f'{qualified_name}.<locals>' if is_function else qualified_name, []))
+            function_names.append(qualified_name if is_function else function_names[-1])
+        elif isinstance(node, ast.ExceptHandler):
+            scopes[-1][1].append(node)
+            pending_records.extend(_python_exception_handled_records(node, function_names[-1]))
+        elif isinstance(node, ast.Raise):
+            pending_records.extend(_python_exception_raised_records(node, scopes[-1][1], function_names[-1]))
+
+    def exit_(node: object) -> None:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            scopes.pop()
+            function_names.pop()
+        elif isinstance(node, ast.ExceptHandler):
+            scopes[-1][1].pop()
+
+    for _ in python_ast_traverse(parsed_code, on_enter=enter, on_exit=exit_):
+        if pending_records:
+            yield from pending_records
+            pending_records.clear()
 
 
 def python_ast_raise_name(node: ast.Raise) -> Optional[str]:
     """Get the name of the exception raise by the given ast.Raise object."""
-    return _python_ast_exception_name(node)
+    return _python_ast_dotted_name(node.exc) if node.exc else None
 
 
 def python_ast_exception_handler_exceptions_handled(handler: ast.ExceptHandler) -> Optional[Iterable[str]]:
     """Return all of the exceptions handled by the given exception handler."""
-    handler_has_multiple_exceptions = handler.type and hasattr(handler.type, 'elts')
-    if handler_has_multiple_exceptions:
-        yield from (_python_ast_exception_name(i) for i in handler.type.elts)
-    else:
-        exception_name = _python_ast_exception_name(handler)
-        if exception_name:
-            yield exception_name
+    for record in _python_exception_handled_records(handler, None):
+        if record.name is not None:
+            yield record.name
 
 
 def python_ast_exception_handler_exceptions_raised(handler: ast.ExceptHandler) -> Optional[Iterable[str]]:
     """Return the exception raised by the given exception handler."""
-    raise_nodes = python_ast_objects_of_type(handler, ast.Raise)
-    exceptions_names = list(map(python_ast_raise_name, raise_nodes))
-    for name in exceptions_names:
-        if name and name == handler.name:
-            exceptions_names = iterable_replace(
-                exceptions_names, name, python_ast_exception_handler_exceptions_handled(handler)
-            )
-        elif name is None:
-            exceptions_names = iterable_replace(
-                exceptions_names, name, python_ast_exception_handler_exceptions_handled(handler)
-            )
-    yield from more_itertools.collapse(exceptions_names, base_type=str)
+    yield from _python_exceptions_raised(python_exception_records(handler))
 
 
-def python_exceptions_handled(code_text: str) -> Iterable[str]:
+def python_exceptions_handled(code_text: CodeText) -> Iterable[str]:
     """Return a list of all exceptions handled in the given code."""
-    ast_except_handlers = python_ast_objects_of_type(code_text, ast.ExceptHandler)
-    yield from more_itertools.collapse(
-        list(map(python_ast_exception_handler_exceptions_handled, ast_except_handlers)), base_type=str
-    )
+    for record in python_exception_records(code_text):
+        if record.kind == 'handled' and record.name is not None:
+            yield record.name
 
 
-def python_exceptions_raised(code_text: str) -> Iterable[str]:
-    """Return a list of all exceptions raised in the given code."""
-    parsed_code = python_ast_parse(code_text)
+def _python_exceptions_raised(records: Iterable[ExceptionRecord]) -> Iterator[Optional[str]]:
+    """Yield the names of the exceptions raised in the given records....
 
-    ast_except_handlers = python_ast_objects_of_type(parsed_code, ast.ExceptHandler)
-    exceptions = list(map(python_ast_exception_handler_exceptions_raised, ast_except_handlers))
+    Re-raises of an exception handler which does not name what it handles (e.g. a bare except) are skipped.
+    """
+    for record in records:
+        if record.kind == 'raised' and not (record.name is None and record.handler_line_number is not None):
+            yield record.name
 
-    # remove all of the ast.ExceptHandlers so exceptions are not parsed twice...
-    # (once from the code above and once in the code below)
-    nodes = python_ast_objects_not_of_type(parsed_code, ast.ExceptHandler)
-    exceptions.extend(list(map(python_ast_raise_name, (node for node in nodes if isinstance(node, ast.Raise)))))
 
-    yield from more_itertools.collapse(exceptions, base_type=str)
+def python_exceptions_raised(code_text: CodeText) -> Iterable[str]:
+    """Return a list of all exceptions raised in the given code."""
+    yield from _python_exceptions_raised(python_exception_records(code_text))
 
 
-def python_functions_as_import_string(code_text: str, module_name: str) -> str:
+def python_functions_as_import_string(code_text: CodeText, module_name: str) -> str:
     """."""
     import jinja2
 
@@ -119,20 +479,74 @@ def python_ast_object_line_number(ast_object: object) -> Optional[int]:
 
 def python_ast_object_line_numbers(ast_object: object) -> Tuple[int, int]:
     """."""
-    from d8s_algorithms import depth_first_traverse
-
-    line_numbers = tuple(
-        truthy_items(
-            list(
-                depth_first_traverse(
-                    ast_object, ast.iter_child_nodes, collect_items_function=python_ast_object_line_number
-                )
-            )
-        )
-    )
+    line_numbers = [
+        node.lineno for node in python_ast_traverse(ast_object) if getattr(node, 'lineno', None) is not None
+    ]
     return min(line_numbers), max(line_numbers)
 
 
+@_instrumented
+def python_ast_traverse(  # noqa: CCR001
+    ast_object: object,
+    *,
+    post_order: bool = False,
+    prune: Optional[Callable[[object], bool]] = None,
+    on_enter: Optional[Callable[[object], None]] = None,
+    on_exit: Optional[Callable[[object], None]] = None,
+) -> Iterator[object]:
+    """Traverse the ast_object depth-first (without recursion, so deeply nested code can be traversed)....
+
+    Nodes are yielded lazily in pre-order (or in post-order if post_order is True). If prune returns True for a...
+    node, the node is still yielded but its children are skipped. on_enter is called with each node before any of...
+    its children are visited and on_exit is called with each node after all of its children are visited.
+    """
+    if not post_order and on_exit is None:
+        # a stack of the iterators over each level's remaining children (the for-else steps up a level when a...
+        # level's children are exhausted)
+        stack = [iter((ast_object,))]
+        while stack:
+            for node in stack[-1]:
+                if on_enter is not None:
+                    on_enter(node)
+                yield node
+                if prune is None or not prune(node):
+                    stack.append(ast.iter_child_nodes(node))
+                break
+            else:
+                stack.pop()
+        return
+
+    def enter(node: object) -> Tuple[object, Iterator[object]]:
+        if on_enter is not None:
+            on_enter(node)
+        children = iter(()) if prune is not None and prune(node) else ast.iter_child_nodes(node)
+        return node, children
+
+    stack = []
+    if not post_order:
+        root, children = enter(ast_object)
+        yield root
+        stack.append((root, children))
+    else:
+        stack.append(enter(ast_object))
+
+    while stack:
+        node, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if on_exit is not None:
+                on_exit(node)
+            if post_order:
+                yield node
+            continue
+
+        child, grandchildren = enter(child)
+        if not post_order:
+            yield child
+        stack.append((child, grandchildren))
+
+
 def _python_ast_clean(code_text: str) -> str:
     """."""
     import re
@@ -141,11 +555,15 @@ def _python_ast_clean(code_text: str) -> str:
 
 
 # TODO: have a decorator to parse a first argument that is a string
+@_instrumented
 def python_ast_objects_of_type(  # noqa: CCR001
-    code_text_or_ast_object: Union[str, object], ast_type: type, *, recursive_search: bool = True
+    code_text_or_ast_object: Union[CodeText, object], ast_type: type, *, recursive_search: bool = True
 ) -> Iterable[object]:
     """Return all of the ast objects of the given ast_type in the code_text_or_ast_object."""
-    if isinstance(code_text_or_ast_object, str):
+    if isinstance(code_text_or_ast_object, ParsedSource):
+        yield from code_text_or_ast_object.node_index.objects_of_type(ast_type, recursive_search=recursive_search)
+        return
+    elif _python_is_code_text(code_text_or_ast_object):
         parsed_code = python_ast_parse(code_text_or_ast_object)
     else:
         parsed_code = code_text_or_ast_object
@@ -160,73 +578,148 @@ def python_ast_objects_of_type(  # noqa: CCR001
             yield from (node for node in parsed_code.body if isinstance(node, ast_type))
 
 
-def python_ast_objects_not_of_type(code_text_or_ast_object: Union[str, object], ast_type: type) -> Iterable[object]:
-    """Return all of the ast objects which are not of the given ast_type in the code_text_or_ast_object."""
-    from d8s_algorithms import depth_first_traverse
+def python_ast_objects_not_of_type(
+    code_text_or_ast_object: Union[CodeText, object], ast_type: AstType
+) -> Iterable[object]:
+    """Return all of the ast objects which are not of the given ast_type in the code_text_or_ast_object....
 
-    if isinstance(code_text_or_ast_object, str):
+    The children of objects of the given ast_type are skipped (the objects of the ast_type themselves are included).
+    """
+    if isinstance(code_text_or_ast_object, ParsedSource) or _python_is_code_text(code_text_or_ast_object):
         parsed_code = python_ast_parse(code_text_or_ast_object)
     else:
         parsed_code = code_text_or_ast_object
 
-    ast_objects_not_of_type = truthy_items(
-        list(
-            depth_first_traverse(
-                parsed_code,
-                lambda x: ast.iter_child_nodes(x) if not isinstance(x, ast_type) else [],
-                collect_items_function=lambda x: x,
-            )
-        )
-    )
-    return ast_objects_not_of_type
+    return list(python_ast_traverse(parsed_code, prune=lambda node: isinstance(node, ast_type)))
 
-    # ast_objects_not_of_type = (node for node in ast.walk(parsed_code) if not isinstance(node, ast_type))
-    # for node in ast.walk(parsed_code):
-    #     if not isinstance(node, ast_type):
-    #         yield node
-    #     else:
-    #         break
 
-    # return ast_objects_not_of_type
+@_instrumented
+def python_ast_parse(code_text: CodeText, *, strict: bool = False) -> ast.Module:
+    """Parse the code_text....
 
+    If the code_text can not be parsed, it is parsed again with its line breaks escaped (unless strict is True, in...
+    which case the error is raised without parsing the code_text again).
+    """
+    if isinstance(code_text, ParsedSource):
+        return code_text.module
+
+    # bytes are given to the parser without being decoded first
+    source = _python_source(code_text)
+    if _METRICS.enabled:
+        source_size = len(source.encode('utf-8', 'surrogatepass')) if isinstance(source, str) else len(source)
+        _METRICS.increment('parsed_bytes', source_size)
 
-def python_ast_parse(code_text: str) -> ast.Module:
-    """."""
     try:
-        parsed_code = ast.parse(code_text)
-    except Exception:  # pylint: disable=W0703
-        code_text = _python_ast_clean(code_text)
-        parsed_code = ast.parse(code_text)
+        parsed_code = ast.parse(source)
+    except Exception as error:  # pylint: disable=W0703
+        if strict:
+            if _METRICS.enabled:
+                _METRICS.increment('parse_failures')
+            raise
+
+        if _METRICS.enabled:
+            _METRICS.increment('parse_retries')
+        try:
+            code_text = source if isinstance(source, str) else _python_decode_source(source)
+            parsed_code = ast.parse(_python_ast_clean(code_text))
+        except Exception:
+            if _METRICS.enabled:
+                _METRICS.increment('parse_failures')
+            # the error in the code as it was given (rather than in the escaped code) is raised
+            raise error from None
     return parsed_code
 
 
-def python_ast_function_defs(code_text: str, recursive_search: bool = True) -> Iterable[ast.FunctionDef]:
+class ParseError(NamedTuple):
+    """Why python code could not be parsed (as returned by python_ast_try_parse)."""
+
+    # the name of the exception raised parsing the code (e.g. "SyntaxError" or "UnicodeDecodeError")
+    error_type: str
+    message: str
+    # the position of the error (these are None if the error does not have a position)
+    line_number: Optional[int] = None
+    col_offset: Optional[int] = None
+
+
+# the parse errors of the code which python_ast_try_parse could not parse (by the code's hash and strict)
+_PARSE_FAILURES: 'collections.OrderedDict[Tuple[str, bool], ParseError]' = collections.OrderedDict()
+_PARSE_FAILURES_LOCK = threading.Lock()
+
+
+def _python_parse_error(error: Exception) -> ParseError:
+    """Describe the given error raised parsing code."""
+    if isinstance(error, SyntaxError):
+        # the offset of a syntax error is one-based
+        col_offset = error.offset - 1 if error.offset else None
+        return ParseError(type(error).__name__, error.msg, error.lineno, col_offset)
+    return ParseError(type(error).__name__, str(error))
+
+
+def python_ast_try_parse(code_text: CodeText, *, strict: bool = False) -> Union[ast.Module, ParseError]:
+    """Parse the code_text (like python_ast_parse), but return a ParseError rather than raising one....
+
+    The errors of code which can not be parsed are remembered by the code's hash (so the same code is not parsed...
+    again).
+    """
+    from .cache_data import python_file_content_hash
+
+    if isinstance(code_text, ParsedSource):
+        return code_text.module
+
+    source = _python_source(code_text)
+    source_bytes = source.encode('utf-8', 'surrogatepass') if isinstance(source, str) else source
+    key = (python_file_content_hash(source_bytes), strict)
+    with _PARSE_FAILURES_LOCK:
+        parse_error = _PARSE_FAILURES.get(key)
+        if parse_error is not None:
+            _PARSE_FAILURES.move_to_end(key)
+    if _METRICS.enabled:
+        _METRICS.cache_lookup('parse_failures', parse_error is not None)
+    if parse_error is not None:
+        return parse_error
+
+    try:
+        return python_ast_parse(source, strict=strict)
+    except (SyntaxError, ValueError) as e:
+        parse_error = _python_parse_error(e)
+
+    with _PARSE_FAILURES_LOCK:
+        _PARSE_FAILURES[key] = parse_error
+        while len(_PARSE_FAILURES) > _PARSE_FAILURE_CACHE_SIZE:
+            _PARSE_FAILURES.popitem(last=False)
+    return parse_error
+
+
+def python_ast_function_defs(
+    code_text: Union[CodeText, object], recursive_search: bool = True
+) -> Iterable[ast.FunctionDef]:
     """."""
-    yield from python_ast_objects_of_type(code_text, ast.FunctionDef, recursive_search=recursive_search)
-    yield from python_ast_objects_of_type(code_text, ast.AsyncFunctionDef, recursive_search=recursive_search)
+    node_index = python_ast_node_index(code_text)
+    yield from node_index.objects_of_type(ast.FunctionDef, recursive_search=recursive_search)
+    yield from node_index.objects_of_type(ast.AsyncFunctionDef, recursive_search=recursive_search)
 
 
-def python_function_arguments(function_text: str) -> List[ast.arg]:
+def python_function_arguments(function_text: CodeText) -> List[ast.arg]:
     """."""
     parsed_code = python_ast_parse(function_text)
     args = parsed_code.body[0].args.args
     return args
 
 
-def python_function_argument_names(function_text: str) -> Iterable[str]:
+def python_function_argument_names(function_text: CodeText) -> Iterable[str]:
     """."""
     argument_names = (arg.arg for arg in python_function_arguments(function_text))
     return argument_names
 
 
-def python_function_argument_defaults(function_text: str) -> List[str]:
+def python_function_argument_defaults(function_text: CodeText) -> List[str]:
     """."""
     # TODO: this function does not return defaults for keyword args
     parsed_code = python_ast_parse(function_text)
     return parsed_code.body[0].args.defaults
 
 
-def python_function_argument_annotations(function_text: str) -> List[str]:
+def python_function_argument_annotations(function_text: CodeText) -> List[str]:
     """."""
     annotations = []
     args = python_function_arguments(function_text)
@@ -239,7 +732,7 @@ def python_function_argument_annotations(function_text: str) -> List[str]:
 
 
 def python_function_names(
-    code_text: str, *, ignore_private_functions: bool = False, ignore_nested_functions: bool = False
+    code_text: Union[CodeText, object], *, ignore_private_functions: bool = False, ignore_nested_functions: bool = False
 ) -> List[str]:
     """."""
     function_objects = python_ast_function_defs(code_text, recursive_search=not ignore_nested_functions)
@@ -250,7 +743,7 @@ def python_function_names(
 
 
 def python_function_docstrings(
-    code_text: str, *, ignore_private_functions: bool = False, ignore_nested_functions: bool = False
+    code_text: Union[CodeText, object], *, ignore_private_functions: bool = False, ignore_nested_functions: bool = False
 ) -> List[str]:
     """Get docstrings for all of the functions in the given text."""
     function_objects = python_ast_function_defs(code_text, recursive_search=not ignore_nested_functions)
@@ -260,20 +753,17 @@ def python_function_docstrings(
     return docstrings
 
 
-def python_variable_names(code_text: str) -> List[str]:
-    """Get all of the variables names in the code_text."""
-    # TODO: add a caveat that this function will only find *stored* variables and not those which are referenced or...
-    # loaded. E.g., given "x = y + 1", this function will return ["x"]; note that "y" is not included
-    parsed_code = python_ast_parse(code_text)
-    variable_names = [
-        node.id for node in ast.walk(parsed_code) if isinstance(node, ast.Name) and (isinstance(node.ctx, ast.Store))
-    ]
-    return variable_names
+def python_variable_names(code_text: Union[CodeText, object]) -> List[str]:
+    """Get all of the variables names in the code_text....
+
+    Only names which are assigned to are found (given "x = y + 1", ["x"] is returned). See python_symbol_index...
+    for the names which are loaded, imported, declared global, etc. (and the scopes they are in).
+    """
+    from .symbol_data import python_symbol_index
+
+    return [symbol.name for symbol in python_symbol_index(code_text).symbols('assigned')]
 
 
-def python_constants(code_text: str) -> List[str]:
-    """Get all constants in the code_text."""
-    # TODO: add a caveat that this function will only find *stored* variables which are uppercased
-    variables = python_variable_names(code_text)
-    constants = [var for var in variables if var.isupper()]
-    return constants
+def python_constants(code_text: Union[CodeText, object]) -> List[str]:
+    """Get all constants (variables whose names are uppercased) in the code_text."""
+    return [name for name in python_variable_names(code_text) if name.isupper()]
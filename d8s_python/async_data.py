@@ -0,0 +1,187 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
+
+from .python_data import (
+    _python_function_calls_in_file,
+    _python_is_file_name,
+    python_file_names,
+    python_object_source_code,
+)
+from .repository_data import Extractor, FileAnalysis, _python_file_analyze
+
+__all__ = [
+    'DEFAULT_MAX_PENDING',
+    'python_file_names_async',
+    'python_file_paths_async',
+    'python_files_using_function_async',
+    'python_files_analyze_async',
+    'python_object_source_code_async',
+]
+
+# the most work items which are submitted to an executor (and whose results have not been used) at once
+DEFAULT_MAX_PENDING = 32
+
+_Item = TypeVar('_Item')
+_Result = TypeVar('_Result')
+
+
+async def _python_executor_map(
+    function: Callable[[_Item], _Result],
+    items: AsyncIterator[_Item],
+    *,
+    executor: Optional[Executor],
+    max_pending: int,
+) -> AsyncIterator[Tuple[_Item, _Result]]:
+    """Run the function on each of the items in the executor and yield each item and its result as they finish....
+
+    At most max_pending items are submitted to the executor at once and more items are only submitted as the...
+    results are used (so a slow consumer does not cause results to pile up). If the consumer stops early (or...
+    is cancelled), the items which have not started are cancelled and the items are closed.
+    """
+    loop = asyncio.get_running_loop()
+    pending: Dict['asyncio.Future[_Result]', _Item] = {}
+    items_done = False
+    try:
+        while True:
+            while not items_done and len(pending) < max_pending:
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    items_done = True
+                    break
+                pending[loop.run_in_executor(executor, function, item)] = item
+
+            if not pending:
+                return
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        # closing the items stops (and cleans up) the generator producing them if it is suspended
+        close_items = getattr(items, 'aclose', None)
+        if close_items is not None:
+            await close_items()
+
+
+def _python_directory_entries(directory_path: str, exclude_tests: bool) -> Tuple[List[str], List[str]]:
+    """Return the names of the python files and the paths of the directories in the given directory."""
+    file_names = []
+    directory_paths = []
+    # the files and the directories are both found in a single listing of the directory
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            # like os.walk, symbolic links to directories are not followed
+            if entry.is_dir(follow_symlinks=False):
+                directory_paths.append(entry.path)
+            elif entry.is_file() and _python_is_file_name(entry.name, exclude_tests=exclude_tests):
+                file_names.append(entry.name)
+    return file_names, directory_paths
+
+
+async def python_file_names_async(
+    path: str, *, exclude_tests: bool = False, executor: Optional[Executor] = None
+) -> List[str]:
+    """Find all python files in the given directory (like python_file_names) without blocking the event loop....
+
+    The directory is read in the executor (the event loop's default executor if no executor is given).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(python_file_names, path, exclude_tests=exclude_tests))
+
+
+async def python_file_paths_async(
+    paths: Union[str, Iterable[str]],
+    *,
+    exclude_tests: bool = False,
+    recursive: bool = True,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[str]:
+    """Find all python files in the given paths (like python_file_paths) without blocking the event loop....
+
+    Each directory is read in the executor (the event loop's default executor if no executor is given) and its...
+    python files are yielded before the next directory is read. If recursive is False, only the files directly...
+    in the given directories are found.
+    """
+    loop = asyncio.get_running_loop()
+    if isinstance(paths, str):
+        paths = [paths]
+
+    directory_paths = []
+    for path in paths:
+        if await loop.run_in_executor(executor, os.path.isfile, path):
+            yield path
+        else:
+            directory_paths.append(path)
+
+    # the directories are searched depth-first (in the order they are found)
+    directory_paths.reverse()
+    while directory_paths:
+        directory_path = directory_paths.pop()
+        file_names, subdirectory_paths = await loop.run_in_executor(
+            executor, _python_directory_entries, directory_path, exclude_tests
+        )
+        for file_name in file_names:
+            yield os.path.join(directory_path, file_name)
+        if recursive:
+            directory_paths.extend(reversed(subdirectory_paths))
+
+
+async def python_files_using_function_async(
+    function_name: str,
+    search_path: str,
+    *,
+    recursive: bool = False,
+    executor: Optional[Executor] = None,
+    max_pending: int = DEFAULT_MAX_PENDING,
+) -> AsyncIterator[str]:
+    """Yield the path of each file in the search_path which uses the given function (as each file is searched)....
+
+    Files are found and searched (in the same way as python_files_using_function) in the executor (the event...
+    loop's default executor if no executor is given) with at most max_pending files being searched at once.
+    """
+    call_pattern = f'{function_name}('.encode('utf-8')
+    search_file = functools.partial(_python_function_calls_in_file, call_patterns=frozenset([call_pattern]))
+    file_paths = python_file_paths_async(search_path, recursive=recursive, executor=executor)
+    async for file_path, found_patterns in _python_executor_map(
+        search_file, file_paths, executor=executor, max_pending=max_pending
+    ):
+        if found_patterns:
+            yield file_path
+
+
+async def python_files_analyze_async(
+    paths: Union[str, Iterable[str]],
+    extractors: Iterable[Extractor],
+    *,
+    exclude_tests: bool = False,
+    executor: Optional[Executor] = None,
+    io_executor: Optional[Executor] = None,
+    max_pending: int = DEFAULT_MAX_PENDING,
+    strict_parse: bool = False,
+) -> AsyncIterator[FileAnalysis]:
+    """Yield the analysis of every python file in the given paths (like python_files_analyze) as each file finishes....
+
+    Files are found in the io_executor and are read, parsed, and run through the extractors in the executor (a...
+    ProcessPoolExecutor, in which case the extractors must be picklable, or a ThreadPoolExecutor). The event...
+    loop's default executor is used for an executor which is not given. At most max_pending files are analyzed at once.
+    strict_parse is used as it is in python_files_analyze.
+    """
+    analyze_file = functools.partial(_python_file_analyze, extractors=list(extractors), strict_parse=strict_parse)
+    file_paths = python_file_paths_async(paths, exclude_tests=exclude_tests, executor=io_executor)
+    async for _, analysis in _python_executor_map(analyze_file, file_paths, executor=executor, max_pending=max_pending):
+        yield analysis
+
+
+async def python_object_source_code_async(python_object: Any, *, executor: Optional[Executor] = None) -> str:
+    """Get the source code for the given python object (like python_object_source_code) without blocking....
+
+    The source file is read in the executor (the event loop's default executor if no executor is given).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, python_object_source_code, python_object)
@@ -0,0 +1,202 @@
+import array
+import collections
+import dis
+import inspect
+import pathlib
+import threading
+import types
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .ast_data import CodeText, _python_code_text
+from .cache_data import python_file_content_hash
+from .metrics_data import _METRICS, _instrumented
+from .repository_data import python_file_paths
+
+__all__ = [
+    'CodeInstructions',
+    'python_code_object',
+    'python_bytecode',
+    'python_files_bytecode',
+    'python_opcode_histogram',
+    'python_instruction_counts',
+]
+
+# the most sources whose code objects (and instructions) are kept in memory
+_CODE_CACHE_SIZE = 1024
+
+
+class CodeInstructions(NamedTuple):
+    """The instructions of a code object (of a module, class, function, lambda, or comprehension)."""
+
+    # the qualified name of the code object (e.g. "<module>" or "A.f.<locals>.g")
+    qualified_name: str
+    first_line_number: int
+    # the opcode (see dis.opname), argument (or -1 if it has none), and line number (or -1 if it has none) of...
+    # each instruction
+    opcodes: 'array.array[int]'
+    args: 'array.array[int]'
+    line_numbers: 'array.array[int]'
+
+
+class _CodeCacheEntry:
+    """The code object compiled from a source (and its instructions, once they have been found)."""
+
+    def __init__(self, code_object: types.CodeType):
+        self.code_object = code_object
+        self.instructions: Optional[Tuple[CodeInstructions, ...]] = None
+
+
+class _CodeCache:
+    """A cache of the code objects compiled from sources (by the hash of the source) of a limited size....
+
+    When the cache is full, the least recently used entry is dropped.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: 'collections.OrderedDict[str, _CodeCacheEntry]' = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, content_hash: str) -> Optional[_CodeCacheEntry]:
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is not None:
+                self._entries.move_to_end(content_hash)
+        if _METRICS.enabled:
+            _METRICS.cache_lookup('code_objects', entry is not None)
+        return entry
+
+    def set(self, content_hash: str, entry: _CodeCacheEntry) -> None:
+        with self._lock:
+            self._entries[content_hash] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_CODE_CACHE = _CodeCache(_CODE_CACHE_SIZE)
+
+
+def _python_code_cache_entry(code_text: CodeText) -> _CodeCacheEntry:
+    """Return the cache entry for the given code_text (compiling the code_text if it is not cached)."""
+    # the code is cached (and compiled) by its decoded text, since a str and its utf-8 encoding may not compile to...
+    # the same code (an encoding declared in the code is only used to decode bytes)
+    source = _python_code_text(code_text)
+    content_hash = python_file_content_hash(source.encode('utf-8', 'surrogatepass'))
+    entry = _CODE_CACHE.get(content_hash)
+    if entry is None:
+        # like the functions in dis, the code is compiled as an expression if it is one
+        try:
+            code_object = compile(source, '<disassembly>', 'eval')
+        except SyntaxError:
+            code_object = compile(source, '<disassembly>', 'exec')
+        entry = _CodeCacheEntry(code_object)
+        _CODE_CACHE.set(content_hash, entry)
+    return entry
+
+
+def python_code_object(code_text: CodeText) -> types.CodeType:
+    """Return the code object compiled from the given code_text....
+
+    Code objects are cached by the hash of the code_text's (decoded) text (so the same code is only compiled once).
+    """
+    return _python_code_cache_entry(code_text).code_object
+
+
+# the (3.11+) opcode of the inline cache entries which follow some instructions (dis skips them)
+_CACHE_OPCODE = dis.opmap.get('CACHE')
+
+
+def _python_code_instructions(code_object: types.CodeType, qualified_name: str) -> CodeInstructions:
+    """Find the instructions of the given code object (without the instructions of the code objects nested in it)....
+
+    The bytecode is decoded directly (rather than with dis.get_instructions, which makes an object for every...
+    instruction), but the instructions are the ones dis.get_instructions finds. The line number of an...
+    instruction is the line number of the last line which started at or before it (as dis.dis shows them).
+    """
+    code = code_object.co_code
+    # in python 3.13+, instructions which do not have a line are found with a line number of None
+    line_starts = {offset: -1 if line is None else line for offset, line in dis.findlinestarts(code_object)}
+    opcodes = array.array('B')
+    args = array.array('i')
+    line_numbers = array.array('i')
+    extended_arg = 0
+    line_number = -1
+    for offset in range(0, len(code), 2):
+        line_number = line_starts.get(offset, line_number)
+        opcode = code[offset]
+        if opcode == _CACHE_OPCODE:
+            continue
+
+        if opcode >= dis.HAVE_ARGUMENT:
+            arg = code[offset + 1] | extended_arg
+            extended_arg = arg << 8 if opcode == dis.EXTENDED_ARG else 0
+        else:
+            arg = -1
+            extended_arg = 0
+        opcodes.append(opcode)
+        args.append(arg)
+        line_numbers.append(line_number)
+    return CodeInstructions(qualified_name, code_object.co_firstlineno, opcodes, args, line_numbers)
+
+
+@_instrumented
+def python_bytecode(code_text: CodeText) -> Tuple[CodeInstructions, ...]:
+    """Return the instructions of the code object compiled from the code_text and of every code object nested in it....
+
+    The code objects are given in pre-order (the module's code object comes first). The instructions are cached...
+    with the code object (so the same code is only compiled and disassembled once).
+    """
+    entry = _python_code_cache_entry(code_text)
+    if entry.instructions is None:
+        code_instructions: List[CodeInstructions] = []
+        stack = [(entry.code_object, entry.code_object.co_name)]
+        while stack:
+            code_object, qualified_name = stack.pop()
+            code_instructions.append(_python_code_instructions(code_object, qualified_name))
+
+            nested_code_objects = [value for value in code_object.co_consts if isinstance(value, types.CodeType)]
+            for nested_code_object in reversed(nested_code_objects):
+                # co_qualname is only available in python 3.11+
+                nested_name = getattr(nested_code_object, 'co_qualname', None)
+                if nested_name is None:
+                    nested_name = nested_code_object.co_name
+                    if code_object is not entry.code_object:
+                        # the code objects of functions (unlike those of class bodies) are optimized
+                        is_function = code_object.co_flags & inspect.CO_OPTIMIZED
+                        nested_name = f'{qualified_name}{".<locals>." if is_function else "."}{nested_name}'
+                stack.append((nested_code_object, nested_name))
+        entry.instructions = tuple(code_instructions)
+    return entry.instructions
+
+
+def python_files_bytecode(
+    paths: Union[str, Iterable[str]], *, exclude_tests: bool = False
+) -> Iterator[Tuple[str, Tuple[CodeInstructions, ...]]]:
+    """Yield the path and the instructions (see python_bytecode) of every python file in the given paths....
+
+    Files which can not be compiled are skipped.
+    """
+    for file_path in python_file_paths(paths, exclude_tests=exclude_tests):
+        try:
+            yield file_path, python_bytecode(pathlib.Path(file_path))
+        except (OSError, SyntaxError, ValueError):
+            continue
+
+
+def python_opcode_histogram(code_instructions: Iterable[CodeInstructions]) -> Dict[str, int]:
+    """Count how many times each opcode is used in the given code_instructions (the most used opcodes come first)."""
+    counts: 'collections.Counter[int]' = collections.Counter()
+    for instructions in code_instructions:
+        counts.update(instructions.opcodes)
+    return {dis.opname[opcode]: count for opcode, count in counts.most_common()}
+
+
+def python_instruction_counts(code_instructions: Iterable[CodeInstructions]) -> Dict[str, int]:
+    """Return the number of instructions in each of the code_instructions by qualified name....
+
+    The counts of code objects with the same qualified name (e.g. two lambdas in the same function) are added up.
+    """
+    counts: Dict[str, int] = {}
+    for instructions in code_instructions:
+        counts[instructions.qualified_name] = counts.get(instructions.qualified_name, 0) + len(instructions.opcodes)
+    return counts
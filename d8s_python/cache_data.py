@@ -0,0 +1,229 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import __version__
+from .metrics_data import _METRICS
+
+__all__ = [
+    'AnalysisCache',
+    'python_file_content_hash',
+]
+
+_MISSING = object()
+
+# the most access times of cached results which are kept in memory before they are written to the database
+_ACCESS_TIMES_BATCH_SIZE = 256
+
+
+def python_file_content_hash(file_contents: bytes) -> str:
+    """Return the hash used to identify the given file_contents."""
+    return hashlib.blake2b(file_contents, digest_size=20).hexdigest()
+
+
+class AnalysisCache:
+    """An on-disk cache (in an sqlite database) of the results of analyzing python files.
+
+    Results are stored by the hash of the file's content, the key of the analysis (e.g. the name of an extractor),...
+    and the version of d8s_python (results from other versions are dropped when the cache is opened). A file's...
+    hash is only recomputed when the file's size or modification time change (unless trust_mtime is False)....
+    If max_size_bytes is given, the least recently used results are evicted to keep the cache under that size...
+    (the times results are used are only kept if max_size_bytes is given and are written to the database in batches).
+    """
+
+    def __init__(self, path: str, *, max_size_bytes: Optional[int] = None, trust_mtime: bool = True):
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.trust_mtime = trust_mtime
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # the times at which cached results were used (by content hash and key) which are not yet in the database
+        self._access_times: Dict[Tuple[str, str], float] = {}
+
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript('''
+            -- with a write-ahead log, committing does not wait for the disk
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, content_hash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                content_hash TEXT, key TEXT, version TEXT, value BLOB, size INTEGER, accessed REAL,
+                PRIMARY KEY (content_hash, key, version)
+            );
+            CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+            ''')
+        with self._connection:
+            self._connection.execute('DELETE FROM results WHERE version != ?', (__version__,))
+        self._size_bytes = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def __enter__(self) -> 'AnalysisCache':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the cache's database."""
+        self._write_access_times()
+        self._connection.close()
+
+    def file_content_hash(self, file_path: str) -> Tuple[str, Optional[bytes]]:
+        """Return the content hash of the file at the given file_path and the file's contents (if they were read).
+
+        The file is only read if its size or modification time have changed since it was last hashed.
+        """
+        stat = os.stat(file_path)
+        if self.trust_mtime:
+            row = self._connection.execute(
+                'SELECT content_hash FROM files WHERE path = ? AND size = ? AND mtime_ns = ?',
+                (file_path, stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+            if row:
+                return row[0], None
+
+        with open(file_path, 'rb') as f:
+            file_contents = f.read()
+        content_hash = python_file_content_hash(file_contents)
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                (file_path, stat.st_size, stat.st_mtime_ns, content_hash),
+            )
+        return content_hash, file_contents
+
+    def get(
+        self,
+        file_path: str,
+        key: str,
+        default: Any = None,
+        *,
+        count: bool = True,
+        content_hash: Optional[str] = None,
+    ) -> Any:
+        """Return the cached result of the analysis with the given key of the file at the given file_path....
+
+        If count is False, the lookup is not counted in the cache's hits and misses (or in the metrics). If a...
+        content_hash is given (as returned by file_content_hash), the file is not hashed again.
+        """
+        if content_hash is None:
+            content_hash, _ = self.file_content_hash(file_path)
+        row = self._connection.execute(
+            'SELECT value FROM results WHERE content_hash = ? AND key = ? AND version = ?',
+            (content_hash, key, __version__),
+        ).fetchone()
+        if count:
+            if _METRICS.enabled:
+                _METRICS.cache_lookup('analysis_cache', row is not None)
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if row is None:
+            return default
+
+        # access times are only used to evict results
+        if self.max_size_bytes is not None:
+            self._access_times[(content_hash, key)] = time.time()
+            if len(self._access_times) >= _ACCESS_TIMES_BATCH_SIZE:
+                self._write_access_times()
+        return pickle.loads(row[0])
+
+    def set(self, file_path: str, key: str, value: Any, *, content_hash: Optional[str] = None) -> None:
+        """Cache the value as the result of the analysis with the given key of the file at the given file_path....
+
+        If a content_hash is given (as returned by file_content_hash before the file was analyzed), the value is...
+        cached under it rather than under the hash of the file's current content (so the result of analyzing a...
+        file which changed during the analysis is not cached as the result for the changed file).
+        """
+        if content_hash is None:
+            content_hash, _ = self.file_content_hash(file_path)
+        self._access_times.pop((content_hash, key), None)
+        pickled_value = pickle.dumps(value)
+        with self._connection:
+            previous_row = self._connection.execute(
+                'SELECT size FROM results WHERE content_hash = ? AND key = ? AND version = ?',
+                (content_hash, key, __version__),
+            ).fetchone()
+            self._connection.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                (content_hash, key, __version__, pickled_value, len(pickled_value), time.time()),
+            )
+        self._size_bytes += len(pickled_value) - (previous_row[0] if previous_row else 0)
+        self._evict()
+
+    def get_or_compute(self, file_path: str, key: str, compute: Callable[[str], Any]) -> Any:
+        """Return the cached result of the analysis with the given key or compute (and cache) it if it is missing.
+
+        compute is called with the file_path.
+        """
+        content_hash, _ = self.file_content_hash(file_path)
+        value = self.get(file_path, key, _MISSING, content_hash=content_hash)
+        if value is _MISSING:
+            value = compute(file_path)
+            self.set(file_path, key, value, content_hash=content_hash)
+        return value
+
+    def _write_access_times(self) -> None:
+        """Write the access times which are kept in memory to the database."""
+        if not self._access_times:
+            return
+
+        with self._connection:
+            self._connection.executemany(
+                'UPDATE results SET accessed = ? WHERE content_hash = ? AND key = ? AND version = ?',
+                [
+                    (accessed, content_hash, key, __version__)
+                    for (content_hash, key), accessed in self._access_times.items()
+                ],
+            )
+        self._access_times.clear()
+
+    def _evict(self) -> None:
+        """Evict the least recently used results until the cache is no bigger than max_size_bytes."""
+        if self.max_size_bytes is None or self._size_bytes <= self.max_size_bytes:
+            return
+
+        self._write_access_times()
+        with self._connection:
+            rows = self._connection.execute('SELECT rowid, size FROM results ORDER BY accessed').fetchall()
+            evicted_row_ids = []
+            for row_id, size in rows:
+                if self._size_bytes <= self.max_size_bytes:
+                    break
+                evicted_row_ids.append((row_id,))
+                self._size_bytes -= size
+            self._connection.executemany('DELETE FROM results WHERE rowid = ?', evicted_row_ids)
+        self.evictions += len(evicted_row_ids)
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """Remove the cached results of the file at the given file_path (or all cached results if no path is given)."""
+        with self._connection:
+            if file_path is None:
+                self._connection.execute('DELETE FROM results')
+                self._connection.execute('DELETE FROM files')
+            else:
+                self._connection.execute(
+                    'DELETE FROM results WHERE content_hash IN (SELECT content_hash FROM files WHERE path = ?)',
+                    (file_path,),
+                )
+                self._connection.execute('DELETE FROM files WHERE path = ?', (file_path,))
+        self._size_bytes = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return statistics about the cache's use and size."""
+        lookups = self.hits + self.misses
+        entries = self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': self._size_bytes,
+        }
@@ -0,0 +1,217 @@
+import ast
+import os
+import sqlite3
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from . import __version__
+from .ast_data import CodeText, _python_ast_dotted_name, python_ast_objects_of_type, python_parsed_source
+from .metrics_data import _instrumented
+from .repository_data import python_file_paths, python_files_analyze
+
+__all__ = [
+    'CallSite',
+    'CallSiteIndex',
+    'python_call_sites',
+]
+
+# the most call sites which are written to the index's database at once
+_CALL_SITE_BATCH_SIZE = 10_000
+# the most paths whose indexed files are looked up one path at a time when the index is updated
+_PATH_QUERY_LIMIT = 100
+
+
+class CallSite(NamedTuple):
+    """A call of a function (or of any other callable) in python code."""
+
+    # the dotted name of what is called as it is written (e.g. "f", "self.f", or "os.path.join"); a call of an...
+    # attribute of something which does not have a name (e.g. "a[0].f()") is named by the attribute ("f")
+    callee: str
+    line_number: int
+    col_offset: int
+    # the path of the file the call is in (None if the call was not found in a file)
+    file_path: Optional[str] = None
+
+
+def python_call_sites(code_text: CodeText) -> List[CallSite]:
+    """Return the calls in the given code_text whose callee has a name (in the order ast.walk finds them)."""
+    call_sites = []
+    for node in python_ast_objects_of_type(python_parsed_source(code_text), ast.Call):
+        callee = _python_ast_dotted_name(node.func)
+        if callee is None and isinstance(node.func, ast.Attribute):
+            callee = node.func.attr
+        if callee is not None:
+            call_sites.append(CallSite(callee, node.lineno, node.col_offset))
+    return call_sites
+
+
+def _python_call_site_names(callee: str) -> Tuple[str, ...]:
+    """Return the names a call of the given callee is found by (the callee and, if it is dotted, its last name)."""
+    _, dot, bare_name = callee.rpartition('.')
+    return (callee, bare_name) if dot else (callee,)
+
+
+class CallSiteIndex:
+    """An on-disk inverted index (in an sqlite database) from the names of callees to the places they are called.
+
+    A call is found by the callee's dotted name as it is written (e.g. "os.path.join") and by the callee's last...
+    name ("join"), so looking up "join" finds "join(...)", "os.path.join(...)", and "self.join(...)". Calls are...
+    found in the ast (so text in strings and comments is never mistaken for a call). The index is updated...
+    incrementally: only files whose size or modification time have changed are parsed again. Indexes built by...
+    other versions of d8s_python are cleared when the index is opened.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript('''
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime_ns INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS call_sites (
+                name TEXT, file_id INTEGER, callee TEXT, line_number INTEGER, col_offset INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS call_sites_name ON call_sites (name);
+            CREATE INDEX IF NOT EXISTS call_sites_file_id ON call_sites (file_id);
+            ''')
+        row = self._connection.execute("SELECT value FROM metadata WHERE key = 'version'").fetchone()
+        if row is None or row[0] != __version__:
+            with self._connection:
+                self._connection.execute('DELETE FROM call_sites')
+                self._connection.execute('DELETE FROM files')
+                self._connection.execute("INSERT OR REPLACE INTO metadata VALUES ('version', ?)", (__version__,))
+
+    def __enter__(self) -> 'CallSiteIndex':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of indexed files."""
+        return self._connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def close(self) -> None:
+        """Close the index's database."""
+        self._connection.close()
+
+    def _remove_files(self, file_ids: List[int]) -> None:
+        """Remove the files with the given ids (and their call sites) from the index."""
+        parameters = [(file_id,) for file_id in file_ids]
+        self._connection.executemany('DELETE FROM call_sites WHERE file_id = ?', parameters)
+        self._connection.executemany('DELETE FROM files WHERE id = ?', parameters)
+
+    def _add_file(self, file_path: str, stat: os.stat_result, call_sites: Iterable[CallSite]) -> None:
+        """Add the file at the given file_path (which must not be indexed) and its call sites to the index."""
+        cursor = self._connection.execute(
+            'INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)', (file_path, stat.st_size, stat.st_mtime_ns)
+        )
+        file_id = cursor.lastrowid
+        self._connection.executemany(
+            'INSERT INTO call_sites VALUES (?, ?, ?, ?, ?)',
+            (
+                (name, file_id, call_site.callee, call_site.line_number, call_site.col_offset)
+                for call_site in call_sites
+                for name in _python_call_site_names(call_site.callee)
+            ),
+        )
+
+    def _indexed_files(self, paths: List[str], directory_prefixes: Tuple[str, ...]) -> Dict[str, Tuple[int, int, int]]:
+        """Return the id, size, and modification time of each indexed file in the given paths (by its path)....
+
+        If many paths are given, every indexed file is returned instead (which is quicker than a query per path).
+        """
+        query = 'SELECT path, id, size, mtime_ns FROM files'
+        if len(paths) > _PATH_QUERY_LIMIT:
+            rows = self._connection.execute(query).fetchall()
+        else:
+            rows = []
+            for path in paths:
+                rows.extend(self._connection.execute(f'{query} WHERE path = ?', (path,)))
+            for prefix in directory_prefixes:
+                # the paths which start with the prefix are a range of the (unique) index of the paths
+                prefix_end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                rows.extend(self._connection.execute(f'{query} WHERE path >= ? AND path < ?', (prefix, prefix_end)))
+        return {path: (file_id, size, mtime_ns) for path, file_id, size, mtime_ns in rows}
+
+    @_instrumented
+    def update(
+        self, paths: Union[str, Iterable[str]], *, exclude_tests: bool = False, max_workers: Optional[int] = None
+    ) -> int:
+        """Index the python files in the given paths which are new or have changed since they were last indexed....
+
+        Indexed files in the given paths which no longer exist are removed from the index. Changed files are...
+        parsed with python_files_analyze (using max_workers). Files which can not be parsed are indexed without...
+        any call sites. The number of files which were parsed is returned.
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        paths = [os.path.abspath(path) for path in paths]
+        given_paths = set(paths)
+        directory_prefixes = tuple(os.path.join(path, '') for path in paths if not os.path.isfile(path))
+        indexed_files = self._indexed_files(paths, directory_prefixes)
+
+        found_file_paths: Set[str] = set()
+        changed_files: Dict[str, os.stat_result] = {}
+        for file_path in python_file_paths(paths, exclude_tests=exclude_tests):
+            found_file_paths.add(file_path)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            indexed_file = indexed_files.get(file_path)
+            if indexed_file is None or indexed_file[1:] != (stat.st_size, stat.st_mtime_ns):
+                changed_files[file_path] = stat
+
+        removed_file_ids = [
+            file_id
+            for file_path, (file_id, _, _) in indexed_files.items()
+            if file_path not in found_file_paths
+            and (file_path in given_paths or file_path.startswith(directory_prefixes))
+        ]
+        removed_file_ids.extend(
+            indexed_files[file_path][0] for file_path in changed_files if file_path in indexed_files
+        )
+        with self._connection:
+            self._remove_files(removed_file_ids)
+
+        if changed_files:
+            analyses = python_files_analyze(list(changed_files), [python_call_sites], max_workers=max_workers)
+            pending_call_site_count = 0
+            try:
+                for analysis in analyses:
+                    call_sites = analysis.results.get('python_call_sites', [])
+                    self._add_file(analysis.file_path, changed_files[analysis.file_path], call_sites)
+                    # the call sites are committed in batches (rather than all at once or one file at a time)
+                    pending_call_site_count += len(call_sites)
+                    if pending_call_site_count >= _CALL_SITE_BATCH_SIZE:
+                        self._connection.commit()
+                        pending_call_site_count = 0
+            finally:
+                self._connection.commit()
+        return len(changed_files)
+
+    def update_file(self, file_path: str) -> None:
+        """Update the index after the file at the given file_path has been changed, added, or removed."""
+        self.update([file_path], max_workers=1)
+
+    def lookup(self, name: str) -> List[CallSite]:
+        """Return the places the callee with the given name (a dotted name or a last name) is called....
+
+        The call sites are sorted by file path and position.
+        """
+        rows = self._connection.execute(
+            'SELECT callee, line_number, col_offset, path FROM call_sites JOIN files ON files.id = file_id '
+            'WHERE name = ? ORDER BY path, line_number, col_offset',
+            (name,),
+        )
+        return [CallSite(*row) for row in rows]
+
+    def file_paths_calling(self, name: str) -> List[str]:
+        """Return the (sorted) paths of the files in which the callee with the given name is called."""
+        rows = self._connection.execute(
+            'SELECT path FROM files WHERE id IN (SELECT file_id FROM call_sites WHERE name = ?) ORDER BY path', (name,)
+        )
+        return [path for path, in rows]
@@ -0,0 +1,253 @@
+import ast
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from .ast_data import (
+    CodeText,
+    ParsedSource,
+    _python_code_text,
+    _python_line_offsets,
+    _python_offset_position,
+    _python_source,
+)
+
+__all__ = [
+    'FStringExpression',
+    'python_fstring_expressions',
+]
+
+# the prefix and opening quote of a string literal
+_STRING_START_REGEX = re.compile(r'([rRbBuUfF]{0,2})(\'\'\'|"""|\'|")')
+_NAME_REGEX = re.compile(r'\w+')
+_STRING_PREFIX_CHARACTERS = set('rRbBuUfF')
+# what can come between the strings of an implicitly concatenated string
+_STRING_SEPARATOR_REGEX = re.compile(r'(?:\s|\\\r?\n|#[^\r\n]*)*')
+
+
+class FStringExpression(NamedTuple):
+    """A replacement field (an expression in braces) in an f-string."""
+
+    # the text between the braces (e.g. "value!r:>{width}")
+    text: str
+    # the expression (e.g. "value")
+    expression: str
+    # the conversion (e.g. "r") or None
+    conversion: Optional[str]
+    # the format spec (e.g. ">{width}") or None
+    format_spec: Optional[str]
+    # the position of the expression (the col_offset is a number of utf-8 bytes, like the col_offset of an ast object)
+    line_number: int
+    col_offset: int
+
+
+# the offsets in the text of the start of a field's expression, the end of its expression, and the end of the...
+# field (its closing brace), the field's conversion (or None), and the start and end of its format spec (or None)
+_Field = Tuple[int, int, int, Optional[str], Optional[Tuple[int, int]]]
+
+
+def _scan_string(text: str, position: int, fields: List[_Field]) -> int:
+    """Scan the string literal which starts at the given position and return the position after it."""
+    match = _STRING_START_REGEX.match(text, position)
+    prefix, quote = match.groups()
+    if 'f' in prefix.lower():
+        return _scan_fstring_body(text, match.end(), fields, quote=quote, raw='r' in prefix.lower())
+
+    position = match.end()
+    while position < len(text):
+        if text.startswith(quote, position):
+            return position + len(quote)
+        position += 2 if text[position] == '\\' else 1
+    return position
+
+
+def _scan_fstring_body(text: str, position: int, fields: List[_Field], *, quote: Optional[str], raw: bool) -> int:
+    """Scan the body of an f-string which starts at the given position and return the position after its quote....
+
+    If quote is None, the body is scanned to the end of the text.
+    """
+    while position < len(text):
+        character = text[position]
+        if quote and character == quote[0] and text.startswith(quote, position):
+            return position + len(quote)
+        elif character == '\\' and quote:
+            if not raw and text.startswith('N{', position + 1):
+                # a named unicode character (e.g. "\N{DASH}") is not a replacement field
+                position = text.index('}', position) + 1
+            elif text.startswith('{', position + 1):
+                position += 1
+            else:
+                position += 2
+        elif character == '{':
+            if text.startswith('{{', position):
+                position += 2
+            else:
+                position = _scan_field(text, position, fields)
+        else:
+            position += 1
+    return position
+
+
+def _scan_expression(text: str, position: int, fields: List[_Field]) -> int:
+    """Scan the expression of a replacement field which starts at the given position....
+
+    The position of the character which ends the expression ("!", ":", "=", or "}") is returned.
+    """
+    depth = 0
+    while position < len(text):
+        character = text[position]
+        if character in '([{':
+            depth += 1
+        elif character in ')]}':
+            if depth == 0:
+                return position
+            depth -= 1
+        elif character in '\'"':
+            position = _scan_string(text, position, fields)
+            continue
+        elif character == '_' or character.isalnum():
+            name_end = _NAME_REGEX.match(text, position).end()
+            prefix = text[position:name_end]
+            is_string_prefix = len(prefix) <= 2 and set(prefix) <= _STRING_PREFIX_CHARACTERS
+            if is_string_prefix and text.startswith(('"', "'"), name_end):
+                position = _scan_string(text, position, fields)
+            else:
+                position = name_end
+            continue
+        elif character == '#':
+            position = text.find('\n', position)
+            position = len(text) if position == -1 else position
+            continue
+        elif depth == 0 and character in '!:=':
+            # "!=", "==", "<=" and ">=" are operators rather than the end of the expression
+            if text.startswith(('!=', '=='), position):
+                position += 2
+                continue
+            if character != '=' or text[position - 1] not in '<>':
+                return position
+        position += 1
+    return position
+
+
+def _scan_field(text: str, position: int, fields: List[_Field]) -> int:
+    """Scan the replacement field whose opening brace is at the given position and return the position after it."""
+    # the fields in the field's expression and format spec are found after the field itself
+    nested_fields: List[_Field] = []
+    start = position + 1
+    position = _scan_expression(text, start, nested_fields)
+    expression_end = position
+    if text.startswith('=', position):
+        # a self-documenting expression (e.g. "{value=}")
+        position += 1
+        while position < len(text) and text[position].isspace():
+            position += 1
+
+    conversion = None
+    if text.startswith('!', position):
+        conversion_end = position + 1
+        while conversion_end < len(text) and text[conversion_end] not in ':}':
+            conversion_end += 1
+        conversion = text[position + 1 : conversion_end]  # noqa=E203
+        position = conversion_end
+
+    format_spec = None
+    if text.startswith(':', position):
+        format_spec_start = position = position + 1
+        while position < len(text) and text[position] != '}':
+            if text[position] == '{':
+                position = _scan_field(text, position, nested_fields)
+            else:
+                position += 1
+        format_spec = (format_spec_start, position)
+
+    fields.append((start, expression_end, position, conversion, format_spec))
+    fields.extend(nested_fields)
+    return position + 1
+
+
+def _scan_strings(text: str, start: int, end: int) -> List[_Field]:
+    """Find the replacement fields in the (implicitly concatenated) string literals between the start and end."""
+    fields: List[_Field] = []
+    position = start
+    while position < end:
+        position = _STRING_SEPARATOR_REGEX.match(text, position).end()
+        if position >= end:
+            break
+        position = _scan_string(text, position, fields)
+    return fields
+
+
+def _python_fstring_expression(text: str, line_offsets: List[int], field: _Field) -> Optional[FStringExpression]:
+    """Describe the given field (None is returned if the field has no expression)."""
+    start, expression_end, end, conversion, format_spec = field
+    expression = text[start:expression_end]
+    stripped_expression = expression.strip()
+    if not stripped_expression:
+        return None
+
+    expression_start = start + len(expression) - len(expression.lstrip())
+    line_number, col_offset = _python_offset_position(text, line_offsets, expression_start)
+    if format_spec is not None:
+        format_spec = text[format_spec[0] : format_spec[1]]  # noqa=E203
+    return FStringExpression(text[start:end], stripped_expression, conversion, format_spec, line_number, col_offset)
+
+
+def _python_is_string_span(text: str, start: int, end: int) -> bool:
+    """Return whether or not the text from the start to the end offset could be a string literal."""
+    return bool(_STRING_START_REGEX.match(text, start)) and text[end - 1 : end] in ('"', "'")  # noqa=E203
+
+
+def _python_text_fstring_expressions(text: str) -> Iterator[FStringExpression]:
+    """Find the replacement fields in the given text (which is not python code) as if it were an f-string's contents."""
+    fields: List[_Field] = []
+    _scan_fstring_body(text, 0, fields, quote=None, raw=True)
+    line_offsets = _python_line_offsets(text)
+    for field in fields:
+        fstring_expression = _python_fstring_expression(text, line_offsets, field)
+        if fstring_expression:
+            yield fstring_expression
+
+
+def python_fstring_expressions(code_text: CodeText) -> Iterator[FStringExpression]:
+    """Find the replacement fields of all of the f-strings in the given code_text (in source order)....
+
+    Fields nested in another field (in its expression or format spec) come after that field. Text which is not...
+    python code is searched as if it were the contents of an f-string (e.g. "Hello, {name}").
+    """
+    if isinstance(code_text, ParsedSource):
+        parsed_source = code_text
+    else:
+        # files are only read once (even if the code can not be parsed)
+        source = _python_source(code_text)
+        try:
+            # the code is parsed without escaping its line breaks (see python_ast_parse), since the positions of...
+            # the f-strings in the escaped code are not their positions in the code
+            parsed_source = ParsedSource(source, strict=True)
+        except (SyntaxError, ValueError):
+            yield from _python_text_fstring_expressions(_python_code_text(source))
+            return
+
+    text = parsed_source.code_text
+    joined_strs = sorted(
+        parsed_source.node_index.objects_of_type(ast.JoinedStr), key=lambda node: (node.lineno, node.col_offset)
+    )
+    spans = [
+        (parsed_source.offset(node.lineno, node.col_offset), parsed_source.offset(node.end_lineno, node.end_col_offset))
+        for node in joined_strs
+    ]
+    # a ParsedSource which could only be parsed with its line breaks escaped (so the positions of its f-strings...
+    # are not where its f-strings are) is searched as text
+    if not all(_python_is_string_span(text, start, end) for start, end in spans):
+        yield from _python_text_fstring_expressions(text)
+        return
+
+    previous_end = -1
+    for start, end in spans:
+        # the f-strings nested in other f-strings are found when their enclosing f-string is scanned
+        if start < previous_end:
+            continue
+        previous_end = end
+
+        for field in _scan_strings(text, start, previous_end):
+            fstring_expression = _python_fstring_expression(text, parsed_source.line_offsets, field)
+            if fstring_expression:
+                yield fstring_expression
@@ -0,0 +1,444 @@
+import array
+import ast
+import bisect
+import heapq
+import io
+import itertools
+import math
+import mmap
+import struct
+import sys
+import tokenize
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .ast_data import CodeText, ParsedSource, python_ast_function_defs, python_ast_node_index, python_parsed_source
+from .cache_data import AnalysisCache
+from .metrics_data import _instrumented
+from .repository_data import python_files_analyze
+
+__all__ = [
+    'FunctionLengths',
+    'FunctionLengthSummary',
+    'FunctionRecord',
+    'FunctionTable',
+    'python_function_length_metrics',
+    'python_function_length_summary',
+    'python_function_records',
+    'python_function_table',
+]
+
+# the type codes of the table's columns (in the order they are saved; the int columns come first so each column...
+# starts at an offset which is aligned for its type)
+_COLUMN_TYPECODES = {
+    'name_ids': 'i',
+    'file_ids': 'i',
+    'start_lines': 'i',
+    'end_lines': 'i',
+    'argument_counts': 'i',
+    'docstring_lengths': 'i',
+    'flags': 'B',
+}
+_ASYNC_FLAG = 1
+_DOCSTRING_FLAG = 2
+
+# a saved table starts with the magic bytes, the number of functions, and the sizes of its tables of names and...
+# file paths (which follow the columns)
+_FILE_MAGIC = b'D8SFTBL1'
+_FILE_HEADER = struct.Struct('<8sQQQ')
+
+
+class FunctionRecord(NamedTuple):
+    """The metadata of a function (as stored in a FunctionTable)."""
+
+    name: str
+    # the path of the file the function is in (None if the function was not found in a file)
+    file_path: Optional[str]
+    # the line of the "def" and the last line of the function (decorators are not included)
+    start_line: int
+    end_line: int
+    is_async: bool
+    # the number of arguments (including *args, **kwargs, and keyword-only arguments)
+    argument_count: int
+    has_docstring: bool
+    # the number of characters in the docstring (as it is written, before it is cleaned up)
+    docstring_length: int
+
+
+def _python_function_record(
+    node: Union[ast.FunctionDef, ast.AsyncFunctionDef], file_path: Optional[str]
+) -> FunctionRecord:
+    """Return the FunctionRecord of the given function."""
+    arguments = node.args
+    argument_count = len(arguments.posonlyargs) + len(arguments.args) + len(arguments.kwonlyargs)
+    argument_count += (arguments.vararg is not None) + (arguments.kwarg is not None)
+    docstring = ast.get_docstring(node, clean=False)
+    return FunctionRecord(
+        node.name,
+        file_path,
+        node.lineno,
+        node.end_lineno,
+        isinstance(node, ast.AsyncFunctionDef),
+        argument_count,
+        docstring is not None,
+        len(docstring) if docstring is not None else 0,
+    )
+
+
+def python_function_records(code_text: CodeText) -> List[FunctionRecord]:
+    """Return the metadata of every function in the code_text (in the order ast.walk finds them)."""
+    function_defs = python_ast_node_index(python_parsed_source(code_text)).objects_of_type(
+        (ast.FunctionDef, ast.AsyncFunctionDef)
+    )
+    return [_python_function_record(node, None) for node in function_defs]
+
+
+def _python_percentiles(sorted_values: Sequence[float], percentiles: Iterable[float]) -> Dict[float, float]:
+    """Return each of the given percentiles of the sorted_values (interpolated linearly, like numpy.percentile)."""
+    results = {}
+    for percentile in percentiles:
+        if not sorted_values:
+            results[percentile] = math.nan
+            continue
+        position = (len(sorted_values) - 1) * percentile / 100
+        lower_index = int(position)
+        upper_index = min(lower_index + 1, len(sorted_values) - 1)
+        lower, upper = sorted_values[lower_index], sorted_values[upper_index]
+        results[percentile] = lower + (upper - lower) * (position - lower_index)
+    return results
+
+
+class FunctionTable:
+    """A compact, columnar table of the metadata of functions (see FunctionRecord).
+
+    Each field is stored in an array (a column) and names and file paths are interned (so a table of millions of...
+    functions does not keep any ast objects or repeated strings alive). Queries (like select and longest) work...
+    on the columns and return row numbers (which can be turned into FunctionRecords with rows). A table can be...
+    saved to a file and loaded by memory-mapping the file (a loaded table can not be added to).
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, Sequence[int]] = {
+            column: array.array(typecode) for column, typecode in _COLUMN_TYPECODES.items()
+        }
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._file_paths: List[Optional[str]] = []
+        self._file_ids: Dict[Optional[str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._columns['start_lines'])
+
+    def __getitem__(self, row: int) -> FunctionRecord:
+        columns = self._columns
+        flags = columns['flags'][row]
+        return FunctionRecord(
+            self._names[columns['name_ids'][row]],
+            self._file_paths[columns['file_ids'][row]],
+            columns['start_lines'][row],
+            columns['end_lines'][row],
+            bool(flags & _ASYNC_FLAG),
+            columns['argument_counts'][row],
+            bool(flags & _DOCSTRING_FLAG),
+            columns['docstring_lengths'][row],
+        )
+
+    def rows(self, rows: Optional[Iterable[int]] = None) -> Iterator[FunctionRecord]:
+        """Yield the FunctionRecord of each of the given rows (or of every row if no rows are given)."""
+        return map(self.__getitem__, range(len(self)) if rows is None else rows)
+
+    def column(self, column: str) -> Sequence[int]:
+        """Return the given column as an array (or as a memoryview if the table was loaded from a file)....
+
+        The columns are "name_ids", "file_ids", "start_lines", "end_lines", "argument_counts", "docstring_lengths",...
+        and "flags". Columns support the buffer protocol, so they can be wrapped without copying (e.g. by...
+        numpy.frombuffer).
+        """
+        return self._columns[column]
+
+    @staticmethod
+    def _intern(value, values: list, value_ids: dict) -> int:
+        value_id = value_ids.get(value)
+        if value_id is None:
+            value_id = value_ids[value] = len(values)
+            values.append(value)
+        return value_id
+
+    def append(self, record: FunctionRecord) -> None:
+        """Add the given record to the table."""
+        columns = self._columns
+        if not isinstance(columns['flags'], array.array):
+            raise TypeError('A FunctionTable which was loaded from a file can not be added to')
+
+        columns['name_ids'].append(self._intern(record.name, self._names, self._name_ids))
+        columns['file_ids'].append(self._intern(record.file_path, self._file_paths, self._file_ids))
+        columns['start_lines'].append(record.start_line)
+        columns['end_lines'].append(record.end_line)
+        columns['argument_counts'].append(record.argument_count)
+        columns['docstring_lengths'].append(record.docstring_length)
+        columns['flags'].append(_ASYNC_FLAG * record.is_async | _DOCSTRING_FLAG * record.has_docstring)
+
+    def extend(self, records: Iterable[FunctionRecord], *, file_path: Optional[str] = None) -> None:
+        """Add the given records to the table (with the given file_path, if one is given)."""
+        for record in records:
+            self.append(record if file_path is None else record._replace(file_path=file_path))
+
+    def add_code(self, code_text: CodeText, *, file_path: Optional[str] = None) -> None:
+        """Add every function in the code_text to the table (straight from the parsed code)."""
+        function_defs = python_ast_node_index(python_parsed_source(code_text)).objects_of_type(
+            (ast.FunctionDef, ast.AsyncFunctionDef)
+        )
+        for node in function_defs:
+            self.append(_python_function_record(node, file_path))
+
+    def lengths(self) -> 'array.array[int]':
+        """Return the number of lines in each function (the end_line minus the start_line plus one)."""
+        return array.array(
+            'i', (end - start + 1 for start, end in zip(self._columns['start_lines'], self._columns['end_lines']))
+        )
+
+    def select(  # noqa: CCR001
+        self,
+        *,
+        name: Optional[str] = None,
+        file_path: Optional[str] = None,
+        is_async: Optional[bool] = None,
+        has_docstring: Optional[bool] = None,
+        min_length: Optional[int] = None,
+        max_length: Optional[int] = None,
+        min_arguments: Optional[int] = None,
+        max_arguments: Optional[int] = None,
+    ) -> List[int]:
+        """Return the rows of the functions which match all of the given conditions (in the order of the rows)."""
+        columns = self._columns
+        rows: Iterable[int] = range(len(self))
+        # names and file paths are compared by their ids (a name or file path which is not in the table matches nothing)
+        if name is not None:
+            name_id = self._name_ids.get(name, -1)
+            rows = [row for row in rows if columns['name_ids'][row] == name_id]
+        if file_path is not None:
+            file_id = self._file_ids.get(file_path, -1)
+            rows = [row for row in rows if columns['file_ids'][row] == file_id]
+
+        flag_mask = _ASYNC_FLAG * (is_async is not None) | _DOCSTRING_FLAG * (has_docstring is not None)
+        if flag_mask:
+            flag_values = _ASYNC_FLAG * bool(is_async) | _DOCSTRING_FLAG * bool(has_docstring)
+            rows = [row for row in rows if columns['flags'][row] & flag_mask == flag_values]
+
+        if min_length is not None or max_length is not None:
+            start_lines, end_lines = columns['start_lines'], columns['end_lines']
+            min_length = -sys.maxsize if min_length is None else min_length
+            max_length = sys.maxsize if max_length is None else max_length
+            rows = [row for row in rows if min_length <= end_lines[row] - start_lines[row] + 1 <= max_length]
+        if min_arguments is not None or max_arguments is not None:
+            argument_counts = columns['argument_counts']
+            min_arguments = -sys.maxsize if min_arguments is None else min_arguments
+            max_arguments = sys.maxsize if max_arguments is None else max_arguments
+            rows = [row for row in rows if min_arguments <= argument_counts[row] <= max_arguments]
+        return list(rows)
+
+    def longest(self, count: int, rows: Optional[Iterable[int]] = None) -> List[int]:
+        """Return the rows of the count longest functions (of the given rows), longest first."""
+        lengths = self.lengths()
+        return heapq.nlargest(count, range(len(self)) if rows is None else rows, key=lengths.__getitem__)
+
+    def length_percentiles(
+        self, percentiles: Iterable[float] = (50, 90, 99), rows: Optional[Iterable[int]] = None
+    ) -> Dict[float, float]:
+        """Return each of the given percentiles of the lengths of the functions (of the given rows)....
+
+        Percentiles are interpolated linearly between the two nearest lengths (like numpy.percentile). If there...
+        are no functions, every percentile is nan.
+        """
+        lengths = self.lengths()
+        return _python_percentiles(sorted(lengths if rows is None else (lengths[row] for row in rows)), percentiles)
+
+    def counts_by_file(self, rows: Optional[Iterable[int]] = None) -> Dict[Optional[str], int]:
+        """Return the number of functions (of the given rows) in each file."""
+        file_ids = self._columns['file_ids']
+        counts = [0] * len(self._file_paths)
+        for file_id in file_ids if rows is None else (file_ids[row] for row in rows):
+            counts[file_id] += 1
+        return {file_path: count for file_path, count in zip(self._file_paths, counts) if count}
+
+    def save(self, path: str) -> None:
+        """Save the table to the file at the given path (see load)."""
+        names = '\0'.join(self._names).encode('utf-8', 'surrogatepass')
+        # None (the file path of functions which were not found in a file) is saved as an empty path
+        file_paths = '\0'.join(file_path or '' for file_path in self._file_paths).encode('utf-8', 'surrogatepass')
+        with open(path, 'wb') as f:
+            f.write(_FILE_HEADER.pack(_FILE_MAGIC, len(self), len(names), len(file_paths)))
+            for column in _COLUMN_TYPECODES:
+                values = self._columns[column]
+                # the columns are saved in little-endian order
+                if sys.byteorder == 'big':
+                    values = array.array(_COLUMN_TYPECODES[column], values)
+                    values.byteswap()
+                f.write(memoryview(values).cast('B'))
+            f.write(names)
+            f.write(file_paths)
+
+    @classmethod
+    def load(cls, path: str) -> 'FunctionTable':
+        """Load a table saved by save (the file is memory-mapped, so the columns are not read until they are used)."""
+        with open(path, 'rb') as f:
+            file_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, row_count, names_size, file_paths_size = _FILE_HEADER.unpack_from(file_map)
+        if magic != _FILE_MAGIC:
+            raise ValueError(f'{path} is not a saved FunctionTable')
+
+        table = cls()
+        buffer = memoryview(file_map)
+        offset = _FILE_HEADER.size
+        for column, typecode in _COLUMN_TYPECODES.items():
+            size = row_count * array.array(typecode).itemsize
+            values = buffer[offset : offset + size].cast(typecode)  # noqa=E203
+            if sys.byteorder == 'big':
+                values = array.array(typecode, values)
+                values.byteswap()
+            table._columns[column] = values
+            offset += size
+
+        names = str(buffer[offset : offset + names_size], 'utf-8', 'surrogatepass')  # noqa=E203
+        offset += names_size
+        file_paths = str(buffer[offset : offset + file_paths_size], 'utf-8', 'surrogatepass')  # noqa=E203
+        table._names = names.split('\0') if row_count else []
+        table._name_ids = {name: name_id for name_id, name in enumerate(table._names)}
+        table._file_paths = [file_path or None for file_path in file_paths.split('\0')] if row_count else []
+        table._file_ids = {file_path: file_id for file_id, file_path in enumerate(table._file_paths)}
+        return table
+
+
+def python_function_table(
+    paths: Union[str, Iterable[str]],
+    *,
+    exclude_tests: bool = False,
+    max_workers: Optional[int] = None,
+    cache: Optional[AnalysisCache] = None,
+) -> FunctionTable:
+    """Build a FunctionTable of every function in every python file in the given paths....
+
+    The files are read with python_files_analyze (so the max_workers and cache are used as they are there) and...
+    their functions are added in the order the files finish. Files which can not be parsed are skipped.
+    """
+    table = FunctionTable()
+    for analysis in python_files_analyze(
+        paths, [python_function_records], exclude_tests=exclude_tests, max_workers=max_workers, cache=cache
+    ):
+        table.extend(analysis.results.get('python_function_records', []), file_path=analysis.file_path)
+    return table
+
+
+class FunctionLengths(NamedTuple):
+    """The lengths of a function (from its first decorator through the end of its last statement)."""
+
+    name: str
+    start_line: int
+    end_line: int
+    # the number of lines
+    physical_lines: int
+    # the number of lines which are not empty (the length python_function_lengths returns)
+    non_blank_lines: int
+    # the number of logical lines (each statement, or each compound statement's header, on its own line(s) is a...
+    # logical line; comments, blank lines, and line continuations are not counted)
+    logical_lines: int
+
+
+class FunctionLengthSummary(NamedTuple):
+    """Summary statistics of one of the lengths (e.g. the logical lines) of many functions."""
+
+    function_count: int
+    total: int
+    # the mean and percentiles are nan if there are no functions
+    mean: float
+    maximum: int
+    percentiles: Dict[float, float]
+
+
+def _python_function_spans(parsed_source: ParsedSource) -> Iterator[Tuple[str, int, int]]:
+    """Yield the name, start line, and end line of every function (in the order python_function_blocks finds them)."""
+    for function_def in python_ast_function_defs(parsed_source):
+        start = min([function_def.lineno] + [decorator.lineno for decorator in function_def.decorator_list])
+        yield function_def.name, start, function_def.end_lineno
+
+
+def _python_non_blank_line_counts(parsed_source: ParsedSource) -> List[int]:
+    """Return the number of lines which are not empty among the first n lines of the code (for each n)....
+
+    The lines are found from the line offsets (so the text of the lines is never copied).
+    """
+    code_text = parsed_source.code_text
+    code_length = len(code_text)
+    line_offsets = parsed_source.line_offsets
+    # a line is empty if it ends where it starts (i.e. its first character is a line break or it is the last line...
+    # and there is nothing on it)
+    non_blank_lines = (offset < code_length and code_text[offset] not in '\r\n' for offset in line_offsets)
+    return list(itertools.accumulate(non_blank_lines, initial=0))
+
+
+def _python_logical_line_ends(parsed_source: ParsedSource) -> List[int]:
+    """Return the (sorted) line numbers on which the logical lines of the code end (from its NEWLINE tokens)."""
+    # newline='' keeps the line breaks as they are (so the lines are numbered the way the parser numbers them)
+    readline = io.StringIO(parsed_source.code_text, newline='').readline
+    return [token.start[0] for token in tokenize.generate_tokens(readline) if token.type == tokenize.NEWLINE]
+
+
+@_instrumented
+def python_function_length_metrics(code_text: CodeText) -> List[FunctionLengths]:
+    """Return the lengths of every function in the code_text (in the order python_function_blocks finds them)....
+
+    The lengths are counted from each function's line span, the line offsets, and the token stream of the code...
+    (which is tokenized once), so the code of the functions (and of the functions nested in them) is never copied.
+    """
+    parsed_source = python_parsed_source(code_text)
+    non_blank_line_counts = _python_non_blank_line_counts(parsed_source)
+    logical_line_ends = _python_logical_line_ends(parsed_source)
+    return [
+        FunctionLengths(
+            name,
+            start,
+            end,
+            end - start + 1,
+            non_blank_line_counts[end] - non_blank_line_counts[start - 1],
+            bisect.bisect_right(logical_line_ends, end) - bisect.bisect_left(logical_line_ends, start),
+        )
+        for name, start, end in _python_function_spans(parsed_source)
+    ]
+
+
+def python_function_length_summary(
+    paths: Union[str, Iterable[str]],
+    *,
+    percentiles: Iterable[float] = (50, 90, 99),
+    exclude_tests: bool = False,
+    max_workers: Optional[int] = None,
+    cache: Optional[AnalysisCache] = None,
+) -> Dict[str, FunctionLengthSummary]:
+    """Summarize the lengths of every function in every python file in the given paths....
+
+    A summary is returned for each of the lengths of FunctionLengths ("physical_lines", "non_blank_lines", and...
+    "logical_lines"). The files are read with python_files_analyze (so the max_workers and cache are used as they...
+    are there). Files which can not be parsed (or tokenized) are skipped.
+    """
+    length_fields = ('physical_lines', 'non_blank_lines', 'logical_lines')
+    lengths: Dict[str, array.array] = {field: array.array('i') for field in length_fields}
+    for analysis in python_files_analyze(
+        paths, [python_function_length_metrics], exclude_tests=exclude_tests, max_workers=max_workers, cache=cache
+    ):
+        for function_lengths in analysis.results.get('python_function_length_metrics', []):
+            for field in length_fields:
+                lengths[field].append(getattr(function_lengths, field))
+
+    percentiles = tuple(percentiles)
+    summaries = {}
+    for field, values in lengths.items():
+        sorted_values = sorted(values)
+        total = sum(sorted_values)
+        summaries[field] = FunctionLengthSummary(
+            len(sorted_values),
+            total,
+            total / len(sorted_values) if sorted_values else math.nan,
+            sorted_values[-1] if sorted_values else 0,
+            _python_percentiles(sorted_values, percentiles),
+        )
+    return summaries
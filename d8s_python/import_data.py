@@ -0,0 +1,350 @@
+import array
+import ast
+import os
+import pathlib
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .ast_data import CodeText, python_ast_objects_of_type, python_parsed_source
+from .cache_data import AnalysisCache
+from .repository_data import python_files_analyze
+
+__all__ = [
+    'ImportStatement',
+    'ImportGraph',
+    'python_import_statements',
+    'python_import_graph',
+]
+
+
+class ImportStatement(NamedTuple):
+    """An import of a module (by an import statement) or of names from a module (by a from ... import statement)."""
+
+    # the name of the module (e.g. "a.b" for "import a.b" or "from ..a.b import c", or None for "from . import c")
+    module: Optional[str]
+    # the names imported from the module (empty for "import a.b")
+    names: Tuple[str, ...]
+    # the number of dots in a relative import (0 for an absolute import)
+    level: int
+    line_number: int
+
+
+def python_import_statements(code_text: CodeText) -> List[ImportStatement]:
+    """Return the imports in the given code_text (in the order ast.walk finds them)."""
+    statements = []
+    for node in python_ast_objects_of_type(python_parsed_source(code_text), (ast.Import, ast.ImportFrom)):
+        if isinstance(node, ast.Import):
+            statements.extend(ImportStatement(alias.name, (), 0, node.lineno) for alias in node.names)
+        else:
+            names = tuple(alias.name for alias in node.names)
+            statements.append(ImportStatement(node.module, names, node.level, node.lineno))
+    return statements
+
+
+def _python_module_name(file_path: str, source_root: str) -> Tuple[str, bool]:
+    """Return the name of the module in the file at the file_path and whether or not the module is a package."""
+    parts = os.path.splitext(os.path.relpath(file_path, source_root))[0].split(os.sep)
+    is_package = parts[-1] == '__init__'
+    if is_package:
+        parts.pop()
+    return '.'.join(parts), is_package
+
+
+def _python_imported_names(module_name: str, is_package: bool, statements: Iterable[ImportStatement]) -> Iterator[str]:
+    """Yield the absolute name of everything imported by the given statements (e.g. "a.b.c" for "from a.b import c").
+
+    Relative imports are resolved against the package of the module (imports which go above the top-level...
+    package can not be resolved and are skipped).
+    """
+    package_parts = module_name.split('.') if is_package else module_name.split('.')[:-1]
+    for statement in statements:
+        module = statement.module
+        if statement.level:
+            if statement.level > len(package_parts):
+                continue
+            base_parts = package_parts[: len(package_parts) - statement.level + 1]  # noqa=E203
+            module = '.'.join(base_parts + ([module] if module else []))
+
+        if not statement.names:
+            yield module
+        for name in statement.names:
+            yield module if name == '*' else f'{module}.{name}'
+
+
+class ImportGraph:
+    """A graph of the imports between the modules in one or more source roots (directories on the import path).
+
+    Each module has an integer id and the modules it depends on (and the modules which depend on it) are kept...
+    in arrays of ids. An import is an edge to every prefix of the imported name which is a module in the graph...
+    (so "from a import b" depends on the module a.b if there is one and on the package a, since importing a.b...
+    runs a/__init__.py). Imports of modules which are not in the graph are ignored.
+    """
+
+    def __init__(self, source_roots: Iterable[str] = ()):
+        self.source_roots = [os.path.abspath(source_root) for source_root in source_roots]
+        self._module_ids: Dict[str, int] = {}
+        self._module_names: List[str] = []
+        # the path of the file of each module (or None if the module has been removed)
+        self._file_paths: List[Optional[str]] = []
+        self._module_ids_by_file_path: Dict[str, int] = {}
+        # the absolute names each module imports (kept so that imports can be resolved again as modules come and...
+        # go), stored as ids in a table of every name imported by any module
+        self._imported_names: List['array.array[int]'] = []
+        self._name_ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._dependencies: List['array.array[int]'] = []
+        self._dependents: List['array.array[int]'] = []
+
+    def __len__(self) -> int:
+        return len(self._module_ids)
+
+    def __contains__(self, module_name: str) -> bool:
+        return module_name in self._module_ids
+
+    @property
+    def modules(self) -> List[str]:
+        """The names of the modules in the graph."""
+        return list(self._module_ids)
+
+    def module_id(self, module_name: str) -> int:
+        """Return the id of the module with the given name."""
+        try:
+            return self._module_ids[module_name]
+        except KeyError:
+            raise KeyError(f'The module {module_name!r} is not in the import graph') from None
+
+    def module_name(self, module_id: int) -> str:
+        """Return the name of the module with the given id."""
+        return self._module_names[module_id]
+
+    def module_file_path(self, module_name: str) -> str:
+        """Return the path of the file of the module with the given name."""
+        return self._file_paths[self.module_id(module_name)]
+
+    def _add_module(self, module_name: str, file_path: str, imported_names: Iterable[str]) -> int:
+        """Add a module (without resolving its imports) and return its id."""
+        module_id = len(self._module_names)
+        self._module_ids[module_name] = module_id
+        self._module_names.append(module_name)
+        self._file_paths.append(file_path)
+        self._module_ids_by_file_path[file_path] = module_id
+        self._imported_names.append(self._name_id_array(imported_names))
+        self._dependencies.append(array.array('i'))
+        self._dependents.append(array.array('i'))
+        return module_id
+
+    def _name_id_array(self, names: Iterable[str]) -> 'array.array[int]':
+        """Return the ids of the given names (names which are not in the table of names are added to it)."""
+        name_ids = array.array('i')
+        for name in dict.fromkeys(names):
+            name_id = self._name_ids.get(name)
+            if name_id is None:
+                name_id = self._name_ids[name] = len(self._names)
+                self._names.append(name)
+            name_ids.append(name_id)
+        return name_ids
+
+    def _resolve(self, imported_name: str) -> Tuple[int, ...]:
+        """Return the ids of the modules in the graph which are prefixes of the given imported name (longest first)."""
+        module_ids = []
+        while imported_name:
+            module_id = self._module_ids.get(imported_name)
+            if module_id is not None:
+                module_ids.append(module_id)
+            imported_name = imported_name.rpartition('.')[0]
+        return tuple(module_ids)
+
+    def _module_dependencies(
+        self, module_id: int, resolutions: Optional[List[Tuple[int, ...]]] = None
+    ) -> 'array.array[int]':
+        """Resolve the imports of the module with the given id (using the resolutions of the names, if given)."""
+        dependency_ids = set()
+        for name_id in self._imported_names[module_id]:
+            dependency_ids.update(self._resolve(self._names[name_id]) if resolutions is None else resolutions[name_id])
+        # a package importing its own names (e.g. "from . import x" in a package's __init__.py) is not a dependency
+        dependency_ids.discard(module_id)
+        return array.array('i', sorted(dependency_ids))
+
+    def _resolve_all(self) -> None:
+        """Resolve the imports of every module (and rebuild the dependents of every module)."""
+        # each name is only resolved once (rather than once for every module which imports it)
+        resolutions = [self._resolve(name) for name in self._names]
+        dependents: List[List[int]] = [[] for _ in self._module_names]
+        for module_id in self._module_ids.values():
+            dependencies = self._dependencies[module_id] = self._module_dependencies(module_id, resolutions)
+            for dependency_id in dependencies:
+                dependents[dependency_id].append(module_id)
+        self._dependents = [array.array('i', sorted(module_ids)) for module_ids in dependents]
+
+    def _resolve_module(self, module_id: int) -> None:
+        """Resolve the imports of the module with the given id again (and update the dependents of its imports)."""
+        for dependency_id in self._dependencies[module_id]:
+            self._dependents[dependency_id].remove(module_id)
+        self._dependencies[module_id] = self._module_dependencies(module_id)
+        for dependency_id in self._dependencies[module_id]:
+            self._dependents[dependency_id].append(module_id)
+
+    def _source_root(self, file_path: str) -> str:
+        """Return the source root the file at the given file_path is in."""
+        for source_root in self.source_roots:
+            if not os.path.relpath(file_path, source_root).startswith(os.pardir):
+                return source_root
+        raise ValueError(f'The file {file_path!r} is not in any of the source roots of the import graph')
+
+    def update_file(self, file_path: str) -> None:
+        """Update the graph after the file at the given file_path has been changed, added, or removed.
+
+        Only the given file is read. If a module has been added or removed, the imports of every module are...
+        resolved again (which does not read any files).
+        """
+        file_path = os.path.abspath(file_path)
+        source_root = self._source_root(file_path)
+        module_name, is_package = _python_module_name(file_path, source_root)
+        module_id = self._module_ids_by_file_path.get(file_path)
+        if module_id is None and (not module_name or module_name in self):
+            # the file is shadowed by a module of the same name in an earlier source root
+            return
+
+        if not os.path.isfile(file_path):
+            if module_id is not None:
+                del self._module_ids[module_name]
+                del self._module_ids_by_file_path[file_path]
+                self._file_paths[module_id] = None
+                self._imported_names[module_id] = array.array('i')
+                self._dependencies[module_id] = array.array('i')
+                self._resolve_all()
+            return
+
+        try:
+            statements = python_import_statements(python_parsed_source(pathlib.Path(file_path)))
+        except (SyntaxError, ValueError, UnicodeDecodeError):
+            # like python_import_graph, the imports of a file which can not be parsed are ignored
+            statements = []
+        imported_names = _python_imported_names(module_name, is_package, statements)
+
+        if module_id is None:
+            self._add_module(module_name, file_path, imported_names)
+            self._resolve_all()
+        else:
+            self._imported_names[module_id] = self._name_id_array(imported_names)
+            self._resolve_module(module_id)
+
+    def _reachable(self, module_name: str, edges: List['array.array[int]']) -> List[str]:
+        """Return the names of the modules reachable from the given module by following the given edges."""
+        start_id = self.module_id(module_name)
+        visited = bytearray(len(self._module_names))
+        visited[start_id] = 1
+        queue = [start_id]
+        for module_id in queue:
+            for next_id in edges[module_id]:
+                if not visited[next_id]:
+                    visited[next_id] = 1
+                    queue.append(next_id)
+        return [self._module_names[module_id] for module_id in queue[1:]]
+
+    def dependencies(self, module_name: str, *, transitive: bool = False) -> List[str]:
+        """Return the names of the modules the given module imports....
+
+        If transitive is True, the modules those modules import (and so on) are included (closest first).
+        """
+        if transitive:
+            return self._reachable(module_name, self._dependencies)
+        return [self._module_names[module_id] for module_id in self._dependencies[self.module_id(module_name)]]
+
+    def dependents(self, module_name: str, *, transitive: bool = False) -> List[str]:
+        """Return the names of the modules which import the given module....
+
+        If transitive is True, the modules which import those modules (and so on) are included (closest first).
+        """
+        if transitive:
+            return self._reachable(module_name, self._dependents)
+        return [self._module_names[module_id] for module_id in self._dependents[self.module_id(module_name)]]
+
+    def cycles(self) -> List[List[str]]:
+        """Return the import cycles in the graph (each cycle is a list of modules which all depend on each other)....
+
+        The cycles are the strongly connected components of the graph with more than one module (found with an...
+        iterative version of Tarjan's algorithm).
+        """
+        module_count = len(self._module_names)
+        indices = [-1] * module_count
+        low_links = [0] * module_count
+        on_stack = bytearray(module_count)
+        stack: List[int] = []
+        cycles = []
+        index = 0
+
+        for root_id in self._module_ids.values():
+            if indices[root_id] != -1:
+                continue
+
+            # each frame is a module id and the position of the next of its dependencies to visit
+            frames = [(root_id, 0)]
+            indices[root_id] = low_links[root_id] = index
+            index += 1
+            stack.append(root_id)
+            on_stack[root_id] = 1
+            while frames:
+                module_id, position = frames[-1]
+                dependencies = self._dependencies[module_id]
+                if position < len(dependencies):
+                    frames[-1] = (module_id, position + 1)
+                    dependency_id = dependencies[position]
+                    if indices[dependency_id] == -1:
+                        indices[dependency_id] = low_links[dependency_id] = index
+                        index += 1
+                        stack.append(dependency_id)
+                        on_stack[dependency_id] = 1
+                        frames.append((dependency_id, 0))
+                    elif on_stack[dependency_id]:
+                        low_links[module_id] = min(low_links[module_id], indices[dependency_id])
+                    continue
+
+                frames.pop()
+                if frames:
+                    parent_id = frames[-1][0]
+                    low_links[parent_id] = min(low_links[parent_id], low_links[module_id])
+                if low_links[module_id] == indices[module_id]:
+                    component = []
+                    while True:
+                        member_id = stack.pop()
+                        on_stack[member_id] = 0
+                        component.append(member_id)
+                        if member_id == module_id:
+                            break
+                    if len(component) > 1:
+                        cycles.append(sorted(self._module_names[member_id] for member_id in component))
+        return cycles
+
+
+def python_import_graph(
+    source_roots: Union[str, Iterable[str]],
+    *,
+    exclude_tests: bool = False,
+    max_workers: Optional[int] = None,
+    cache: Optional[AnalysisCache] = None,
+) -> ImportGraph:
+    """Build the graph of the imports between the modules in the given source roots (directories on the import path).
+
+    Module names are the paths of the files relative to their source root (e.g. the file a/b/__init__.py in a...
+    source root is the module a.b). The files are read with python_files_analyze (so the max_workers and cache...
+    are used as they are there). The imports of a file which can not be parsed are ignored.
+    """
+    if isinstance(source_roots, str):
+        source_roots = [source_roots]
+
+    graph = ImportGraph(source_roots)
+    for source_root in graph.source_roots:
+        analyses = python_files_analyze(
+            source_root, [python_import_statements], max_workers=max_workers, exclude_tests=exclude_tests, cache=cache
+        )
+        for analysis in analyses:
+            module_name, is_package = _python_module_name(analysis.file_path, source_root)
+            # a module found in an earlier source root shadows a module of the same name in a later source root
+            if module_name and module_name not in graph:
+                statements = analysis.results.get('python_import_statements', [])
+                graph._add_module(
+                    module_name, analysis.file_path, _python_imported_names(module_name, is_package, statements)
+                )
+
+    graph._resolve_all()
+    return graph
@@ -0,0 +1,296 @@
+import collections
+import contextlib
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+__all__ = [
+    'python_metrics_enable',
+    'python_metrics_disable',
+    'python_metrics_enabled',
+    'python_metrics_recording',
+    'python_metrics_reset',
+    'python_metrics_snapshot',
+    'python_metrics_prometheus',
+]
+
+# the number of latencies kept for each function (from which the percentiles are calculated)
+_LATENCY_SAMPLE_SIZE = 1024
+_PERCENTILES = (0.5, 0.9, 0.99)
+_CO_GENERATOR = 0x20
+
+_Function = TypeVar('_Function', bound=Callable[..., Any])
+
+
+class _FunctionMetrics:
+    """The calls and latencies of an instrumented function."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        # a uniform sample of the latencies (see https://en.wikipedia.org/wiki/Reservoir_sampling)
+        self.latencies: List[float] = []
+
+    def record(self, seconds: float, rng) -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if len(self.latencies) < _LATENCY_SAMPLE_SIZE:
+            self.latencies.append(seconds)
+        else:
+            position = rng.randrange(self.calls)
+            if position < _LATENCY_SAMPLE_SIZE:
+                self.latencies[position] = seconds
+
+    def percentiles(self) -> Dict[float, float]:
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return {percentile: 0.0 for percentile in _PERCENTILES}
+        return {
+            percentile: latencies[min(len(latencies) - 1, int(percentile * len(latencies)))]
+            for percentile in _PERCENTILES
+        }
+
+
+class _Metrics:
+    """The metrics recorded while instrumentation is enabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._rng = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.functions: Dict[str, _FunctionMetrics] = collections.defaultdict(_FunctionMetrics)
+            self.counters: Dict[str, int] = collections.Counter()
+            self.cache_hits: Dict[str, int] = collections.Counter()
+            self.cache_misses: Dict[str, int] = collections.Counter()
+
+    def record_time(self, name: str, seconds: float, *, error: bool = False) -> None:
+        if self._rng is None:
+            import random
+
+            self._rng = random.Random(0)
+
+        with self._lock:
+            function_metrics = self.functions[name]
+            function_metrics.record(seconds, self._rng)
+            if error:
+                function_metrics.errors += 1
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += amount
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.cache_hits[cache] += 1
+            else:
+                self.cache_misses[cache] += 1
+
+
+_METRICS = _Metrics()
+
+
+def _timed_generator(name: str, generator: Iterator[Any]) -> Iterator[Any]:
+    """Yield the items of the generator, recording the time spent in the generator when it is finished or closed."""
+    elapsed = 0.0
+    error = False
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(generator)
+            except StopIteration as e:
+                return e.value
+            except BaseException:
+                error = True
+                raise
+            finally:
+                elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        generator.close()
+        _METRICS.record_time(name, elapsed, error=error)
+
+
+def _instrumented(function: _Function) -> _Function:
+    """Record the calls and latency of the function while instrumentation is enabled.
+
+    When instrumentation is disabled, the only cost is a call through the wrapper. The latency of a generator is...
+    the time spent producing its items (which is recorded when it is exhausted or closed).
+    """
+    name = function.__qualname__
+    is_generator_function = bool(function.__code__.co_flags & _CO_GENERATOR)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _METRICS.enabled:
+            return function(*args, **kwargs)
+
+        if is_generator_function:
+            return _timed_generator(name, function(*args, **kwargs))
+
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException:
+            _METRICS.record_time(name, time.perf_counter() - start, error=True)
+            raise
+        _METRICS.record_time(name, time.perf_counter() - start)
+        return result
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def _timed(name: str) -> Iterator[None]:
+    """Record the time spent in the block under the given name while instrumentation is enabled."""
+    if not _METRICS.enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _METRICS.record_time(name, time.perf_counter() - start, error=error)
+
+
+def python_metrics_enable() -> None:
+    """Start recording metrics about d8s_python's functions (metrics are recorded separately in each process)."""
+    _METRICS.enabled = True
+
+
+def python_metrics_disable() -> None:
+    """Stop recording metrics (the metrics recorded so far are kept)."""
+    _METRICS.enabled = False
+
+
+def python_metrics_enabled() -> bool:
+    """Return whether or not metrics are being recorded."""
+    return _METRICS.enabled
+
+
+@contextlib.contextmanager
+def python_metrics_recording(*, reset: bool = True) -> Iterator[None]:
+    """Record metrics inside of the with block (if reset is True, the metrics recorded before are discarded)."""
+    if reset:
+        python_metrics_reset()
+    was_enabled = _METRICS.enabled
+    python_metrics_enable()
+    try:
+        yield
+    finally:
+        _METRICS.enabled = was_enabled
+
+
+def python_metrics_reset() -> None:
+    """Discard all of the recorded metrics."""
+    _METRICS.reset()
+
+
+def python_metrics_snapshot() -> Dict[str, Any]:
+    """Return a copy of the recorded metrics.
+
+    The snapshot has the calls, errors, total, maximum and percentile latencies (in seconds) of each instrumented...
+    function, the bytes of code parsed, the number of parses retried after cleaning the code...
+    (parse_retries), the number of parses which raised an error like SyntaxError (after cleaning the code, unless...
+    the parse was strict) (parse_failures), and the hits, misses and hit rate of each cache.
+    """
+    with _METRICS._lock:
+        functions = {}
+        for name, function_metrics in sorted(_METRICS.functions.items()):
+            percentiles = function_metrics.percentiles()
+            functions[name] = {
+                'calls': function_metrics.calls,
+                'errors': function_metrics.errors,
+                'total_seconds': function_metrics.total_seconds,
+                'max_seconds': function_metrics.max_seconds,
+                **{f'p{int(percentile * 100)}_seconds': value for percentile, value in percentiles.items()},
+            }
+
+        caches = {}
+        for cache in sorted(set(_METRICS.cache_hits) | set(_METRICS.cache_misses)):
+            hits, misses = _METRICS.cache_hits[cache], _METRICS.cache_misses[cache]
+            caches[cache] = {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses)}
+
+        return {
+            'enabled': _METRICS.enabled,
+            'functions': functions,
+            'parsed_bytes': _METRICS.counters['parsed_bytes'],
+            'parse_retries': _METRICS.counters['parse_retries'],
+            'parse_failures': _METRICS.counters['parse_failures'],
+            'caches': caches,
+        }
+
+
+def _prometheus_label(value: str) -> str:
+    """Escape the value for use as a label value in the prometheus text format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def python_metrics_prometheus(snapshot: Optional[Dict[str, Any]] = None, *, prefix: str = 'd8s_python') -> str:
+    """Return the snapshot (or a new snapshot of the recorded metrics) in the prometheus text format.
+
+    See https://prometheus.io/docs/instrumenting/exposition_formats/ for details about the format.
+    """
+    if snapshot is None:
+        snapshot = python_metrics_snapshot()
+
+    lines = [
+        f'# HELP {prefix}_function_seconds The latency of instrumented functions.',
+        f'# TYPE {prefix}_function_seconds summary',
+    ]
+    for name, function_metrics in snapshot['functions'].items():
+        label = f'function="{_prometheus_label(name)}"'
+        for percentile in _PERCENTILES:
+            value = function_metrics[f'p{int(percentile * 100)}_seconds']
+            lines.append(f'{prefix}_function_seconds{{{label},quantile="{percentile}"}} {value!r}')
+        lines.append(f'{prefix}_function_seconds_sum{{{label}}} {function_metrics["total_seconds"]!r}')
+        lines.append(f'{prefix}_function_seconds_count{{{label}}} {function_metrics["calls"]}')
+
+    lines.extend(
+        [
+            f'# HELP {prefix}_function_errors_total The number of calls of instrumented functions which raised.',
+            f'# TYPE {prefix}_function_errors_total counter',
+        ]
+    )
+    for name, function_metrics in snapshot['functions'].items():
+        lines.append(
+            f'{prefix}_function_errors_total{{function="{_prometheus_label(name)}"}} {function_metrics["errors"]}'
+        )
+
+    for counter, description in (
+        ('parsed_bytes', 'The bytes of code parsed.'),
+        ('parse_retries', 'The number of parses retried after cleaning the code.'),
+        ('parse_failures', 'The number of parses which raised SyntaxError (after cleaning, unless strict).'),
+    ):
+        lines.extend(
+            [
+                f'# HELP {prefix}_{counter}_total {description}',
+                f'# TYPE {prefix}_{counter}_total counter',
+                f'{prefix}_{counter}_total {snapshot[counter]}',
+            ]
+        )
+
+    for counter, description in (('hits', 'The number of cache hits.'), ('misses', 'The number of cache misses.')):
+        lines.extend(
+            [f'# HELP {prefix}_cache_{counter}_total {description}', f'# TYPE {prefix}_cache_{counter}_total counter']
+        )
+        for cache, cache_metrics in snapshot['caches'].items():
+            lines.append(
+                f'{prefix}_cache_{counter}_total{{cache="{_prometheus_label(cache)}"}} {cache_metrics[counter]}'
+            )
+
+    return '\n'.join(lines) + '\n'
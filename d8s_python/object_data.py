@@ -0,0 +1,153 @@
+import functools
+import threading
+import types
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Set, Tuple
+
+__all__ = [
+    'ObjectProperty',
+    'python_object_properties',
+]
+
+# the types of values whose attributes are not enumerated (even if max_depth allows it)
+_UNEXPLORED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+class ObjectProperty(NamedTuple):
+    """An attribute of an object (as found by python_object_properties)."""
+
+    # the name of the attribute (the names of the attributes of an attribute are dotted (e.g. "child.name"))
+    name: str
+    # "attribute", "method" (the value is the method), "method_result" (the value is what calling the method...
+    # without any arguments returned), "error" (the value is the exception raised getting the attribute or...
+    # calling the method), or "timeout" (the value is None)
+    kind: str
+    value: Any
+    # how many attributes deep the attribute is (0 for the attributes of the object itself)
+    depth: int
+
+
+def _python_evaluate(function: Callable[[], Any], timeout: Optional[float]) -> Tuple[str, Any]:
+    """Call the function and return whether it "finished", raised an "error", or ran out of time and its result....
+
+    If a timeout is given, the function is run in a daemon thread which is abandoned (rather than stopped) if it...
+    does not finish in time.
+    """
+    if timeout is None:
+        try:
+            return 'finished', function()
+        except Exception as e:  # pylint: disable=W0703
+            return 'error', e
+
+    outcome = ['timeout', None]
+
+    def run():
+        try:
+            outcome[:] = ['finished', function()]
+        except Exception as e:  # pylint: disable=W0703
+            outcome[:] = ['error', e]
+
+    thread = threading.Thread(target=run, name='python_object_properties', daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return tuple(outcome)
+
+
+def _python_attribute(python_object: Any, name: str, *, run_methods: bool, static: bool) -> Tuple[str, Any]:
+    """Return the kind and value of the attribute with the given name."""
+    if static:
+        import inspect
+
+        value = inspect.getattr_static(python_object, name)
+    else:
+        value = getattr(python_object, name)
+
+    if not callable(value):
+        return 'attribute', value
+    elif run_methods and not static:
+        try:
+            return 'method_result', value()
+        except TypeError:
+            # the method needs arguments
+            return 'method', value
+    return 'method', value
+
+
+def _python_object_has_attributes(value: Any) -> bool:
+    """Return whether or not the given value is an object whose attributes are worth enumerating."""
+    value_type = type(value)
+    if issubclass(value_type, _UNEXPLORED_TYPES):
+        return False
+    return bool(value_type.__dictoffset__) or hasattr(value_type, '__slots__')
+
+
+def _python_object_properties(
+    python_object: Any,
+    name_prefix: str,
+    depth: int,
+    ancestor_ids: Set[int],
+    *,
+    run_methods: bool,
+    internal_properties: bool,
+    static: bool,
+    timeout: Optional[float],
+    max_depth: int,
+) -> Iterator[ObjectProperty]:
+    """Enumerate the attributes of the python_object (and of its attributes, up to the max_depth)."""
+    for name in dir(python_object):
+        if not internal_properties and name.startswith('_'):
+            continue
+
+        get_attribute = functools.partial(
+            _python_attribute, python_object, name, run_methods=run_methods, static=static
+        )
+        outcome, value = _python_evaluate(get_attribute, timeout)
+        if outcome == 'finished':
+            kind, value = value
+        else:
+            kind = outcome
+        yield ObjectProperty(f'{name_prefix}{name}', kind, value, depth)
+
+        if kind == 'attribute' and depth < max_depth and id(value) not in ancestor_ids:
+            if _python_object_has_attributes(value):
+                yield from _python_object_properties(
+                    value,
+                    f'{name_prefix}{name}.',
+                    depth + 1,
+                    ancestor_ids | {id(value)},
+                    run_methods=run_methods,
+                    internal_properties=internal_properties,
+                    static=static,
+                    timeout=timeout,
+                    max_depth=max_depth,
+                )
+
+
+def python_object_properties(
+    python_object: Any,
+    *,
+    run_methods: bool = False,
+    internal_properties: bool = True,
+    static: bool = False,
+    timeout: Optional[float] = None,
+    max_depth: int = 0,
+) -> Iterator[ObjectProperty]:
+    """Yield the name, kind, and value of each of the attributes of the python_object (in the order of dir())....
+
+    Attributes are only evaluated as they are yielded. If run_methods is True, each method is called without any...
+    arguments (and its result is yielded if it does not need any arguments). If static is True, attributes are...
+    found with inspect.getattr_static (so no properties, descriptors, or __getattr__ methods are run and no...
+    methods are called). If a timeout (in seconds) is given, an attribute which takes longer than the timeout to...
+    evaluate is yielded as a "timeout" (and is left running in a daemon thread). The attributes of attributes...
+    which are objects with attributes of their own are enumerated up to max_depth levels deep.
+    """
+    yield from _python_object_properties(
+        python_object,
+        '',
+        0,
+        {id(python_object)},
+        run_methods=run_methods,
+        internal_properties=internal_properties,
+        static=static,
+        timeout=timeout,
+        max_depth=max_depth,
+    )
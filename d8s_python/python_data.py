@@ -1,51 +1,156 @@
-import argparse
+import ast
+import itertools
+import os
 import re
 import sys
-from ast import Import, ImportFrom
-from typing import Any, Dict, Iterator, List, Union
+from ast import AST, AsyncFunctionDef, FunctionDef, Import, ImportFrom
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Pattern, Set, Tuple, Union
+
+from .ast_data import (
+    _MMAP_THRESHOLD_BYTES,
+    CodeText,
+    ParsedSource,
+    _python_code_text,
+    _python_is_code_text,
+    python_ast_node_index,
+    python_parsed_source,
+)
+from .metrics_data import _instrumented
+
+if TYPE_CHECKING:
+    import argparse
+
+    from .cache_data import AnalysisCache
+    from .call_data import CallSiteIndex
+
+__all__ = [
+    'python_functions_signatures',
+    'python_todos',
+    'python_make_pythonic',
+    'python_namespace_has_argument',
+    'python_traceback_prettify',
+    'python_traceback_pretty_print',
+    'python_clean',
+    'python_function_blocks',
+    'python_line_count',
+    'python_function_lengths',
+    'python_version',
+    'python_is_version_2',
+    'python_is_version_3',
+    'python_files_using_functions',
+    'python_files_using_function',
+    'python_keywords',
+    'python_object_properties_enumerate',
+    'python_copy_deep',
+    'python_copy_shallow',
+    'python_file_names',
+    'python_fstrings',
+    'python_code_details',
+    'python_disassemble',
+    'python_stack_local_data',
+    'python_object_doc_string',
+    'python_object_source_file',
+    'python_object_module',
+    'python_object_source_code',
+    'python_object_signature',
+    'python_sort_type_list_by_name',
+    'python_type_name',
+    'python_object_type_to_word',
+    'python_package_imports',
+]
+
+# the "def" keyword (with an optional "async" before it) followed by the function's name
+_FUNCTION_DEF_NAME_REGEX = re.compile(r'(?:async(?:\s|\\)+)?def(?:\s|\\)+(\w+)')
+# everything which can come between the end of a function's last argument (or return annotation) and the colon...
+# which ends the function's signature
+_FUNCTION_SIGNATURE_END_REGEX = re.compile(r'(?:[\s\\(),/\]]|#[^\r\n]*)*:')
+# at most this many call patterns are found with a separate search of a file for each pattern (more patterns are...
+# found with a single regex search of the file)
+_CALL_PATTERNS_FIND_MAX = 2
+
+
+def _python_function_signature_nodes(function_def: Union[FunctionDef, AsyncFunctionDef]) -> Iterator[AST]:
+    """Yield all of the ast objects in the signature of the given function_def."""
+    arguments = function_def.args
+    yield from arguments.posonlyargs
+    yield from arguments.args
+    yield from (arg for arg in (arguments.vararg, arguments.kwarg) if arg)
+    yield from arguments.kwonlyargs
+    yield from arguments.defaults
+    yield from (default for default in arguments.kw_defaults if default)
+    yield from getattr(function_def, 'type_params', [])
+    if function_def.returns:
+        yield function_def.returns
+
+
+def _python_function_signature(
+    parsed_source: ParsedSource, function_def: Union[FunctionDef, AsyncFunctionDef], keep_function_name: bool
+) -> Optional[str]:
+    """Slice the signature of the given function_def out of the parsed_source's code_text."""
+    code_text = parsed_source.code_text
+    name_match = _FUNCTION_DEF_NAME_REGEX.match(
+        code_text, parsed_source.offset(function_def.lineno, function_def.col_offset)
+    )
+    if not name_match or name_match.group(1) != function_def.name:
+        return None
+
+    signature_nodes = tuple(_python_function_signature_nodes(function_def))
+    if signature_nodes:
+        last_node = max(signature_nodes, key=lambda node: (node.end_lineno, node.end_col_offset))
+        signature_end = parsed_source.offset(last_node.end_lineno, last_node.end_col_offset)
+    else:
+        signature_end = name_match.end()
 
-from .ast_data import python_ast_objects_of_type
+    end_match = _FUNCTION_SIGNATURE_END_REGEX.match(code_text, signature_end)
+    if not end_match:
+        return None
+
+    if keep_function_name:
+        signature_start = name_match.start(1)
+    else:
+        # the signature starts at the parenthesis which opens the arguments (not at any space after the name)
+        signature_start = code_text.find('(', name_match.end(1), end_match.end())
+    return code_text[signature_start : end_match.end() - 1]  # noqa=E203
 
 
 # @decorators.map_firstp_arg
+@_instrumented
 def python_functions_signatures(
-    code_text: str,
+    code_text: CodeText,
     *,
     ignore_private_functions: bool = False,
     ignore_nested_functions: bool = False,
     keep_function_name: bool = False,
 ) -> List[str]:
     """Return the function signatures for all of the functions in the given code_text."""
-    from d8s_strings import string_remove_from_start
-
-    from .ast_data import python_function_names
+    from .ast_data import python_ast_function_defs
 
     signatures = []
 
-    function_names = python_function_names(
-        code_text, ignore_private_functions=ignore_private_functions, ignore_nested_functions=ignore_nested_functions
-    )
+    parsed_source = python_parsed_source(code_text)
+    function_defs = python_ast_function_defs(parsed_source, recursive_search=not ignore_nested_functions)
 
-    for name in function_names:
-        regex_for_signature = fr'(def {name}\((?:.|\s)*?\).*?):'
-        sig = re.findall(regex_for_signature, code_text)
-        if any(sig):
-            new_sig = string_remove_from_start(sig[0], 'def ')
-            if not keep_function_name:
-                new_sig = string_remove_from_start(new_sig, name)
-            signatures.append(new_sig)
-        else:
-            message = f'Unable to find signature for the {name} function'
+    for function_def in function_defs:
+        if ignore_private_functions and function_def.name.startswith('_'):
+            continue
+
+        signature = _python_function_signature(parsed_source, function_def, keep_function_name)
+        if signature is None:
+            message = f'Unable to find signature for the {function_def.name} function'
             print(message)
-            signatures.append(None)
+        signatures.append(signature)
 
     return signatures
 
 
-def python_todos(code_text: str, todo_regex: str = 'TODO:.*') -> List[str]:
-    """Return all todos in the given code_text that match the given todo_regex."""
-    todos = re.findall(todo_regex, code_text)
-    return todos
+def python_todos(code_text: CodeText, todo_regex: str = 'TODO:.*') -> List[str]:
+    """Return all todos in the comments of the given code_text that match the given todo_regex.
+
+    Use python_files_todos to find todos in files (with several markers and without reading entire files).
+    """
+    from .todo_data import _python_code_text_todos
+
+    return list(_python_code_text_todos(code_text, todo_regex))
 
 
 # @decorators.map_first_arg
@@ -68,7 +173,7 @@ def python_make_pythonic(name: str) -> str:
 
 
 # @decorators.map_first_arg
-def python_namespace_has_argument(namespace: argparse.Namespace, argument_name: str) -> bool:
+def python_namespace_has_argument(namespace: 'argparse.Namespace', argument_name: str) -> bool:
     """."""
     result = argument_name in namespace
     return result
@@ -90,69 +195,66 @@ def python_traceback_pretty_print(traceback: str) -> None:
 
 
 # @decorators.map_first_arg
-def python_clean(code_text: str) -> str:
+def python_clean(code_text: CodeText) -> str:
     """Clean python code as it is often found in documentation and snippets."""
+    code_text = _python_code_text(code_text)
     code_text = code_text.replace('>>> ', '')
     code_text = code_text.replace('... ', '')
     return code_text
 
 
-def python_function_blocks(  # noqa: CCR001
-    code_text: str, *, ignore_private_functions: bool = False, ignore_nested_functions: bool = False
+@_instrumented
+def python_function_blocks(
+    code_text: CodeText, *, ignore_private_functions: bool = False, ignore_nested_functions: bool = False
 ) -> List[str]:
     """Find the code (as a string) for every function in the given code_text."""
-    from d8s_lists import has_index
-    from d8s_strings import string_chars_at_start_len
-
-    from .ast_data import python_ast_function_defs, python_ast_object_line_numbers
+    from .ast_data import python_ast_function_defs
 
     function_block_strings = []
-    code_text_as_lines = code_text.splitlines()
-    ast_function_defs = python_ast_function_defs(code_text, recursive_search=not ignore_nested_functions)
-    function_block_line_numbers = [(f.name, python_ast_object_line_numbers(f)) for f in ast_function_defs]
-
-    for function_name, (start, end) in function_block_line_numbers:
-        function_block_lines = code_text_as_lines[start - 1 : end]  # noqa=E203
-        function_block_string = '\n'.join(function_block_lines)
+    parsed_source = python_parsed_source(code_text)
+    ast_function_defs = python_ast_function_defs(parsed_source, recursive_search=not ignore_nested_functions)
 
+    for function_def in ast_function_defs:
         if ignore_private_functions:
-            if function_name.startswith('_'):
+            if function_def.name.startswith('_'):
                 continue
 
-        # the code below checks to see if the line after what was determined to be the last line of the function...
-        # should also be included in the function block (which is the case when the closing parenthesis of a...
-        # function call in another function is on a newline (see the...
+        # a function block starts at the function's first decorator (if it has any) and ends at the end of the...
+        # function's last statement (which includes any closing parentheses on later lines (see the...
         # python_data_tests.py::test_python_function_blocks_edge_cases_1 for an example))
-        if has_index(code_text_as_lines, end):
-            # find the indentation level of the function definition (the first line of the function)
-            function_indentation = string_chars_at_start_len(function_block_lines[0], ' ')
-            # TODO: the check below assumes that spaces are used instead of tabs
-            next_line_is_indented = (
-                code_text_as_lines[end].startswith(' ')
-                and string_chars_at_start_len(code_text_as_lines[end], ' ') > function_indentation
-            )
-            next_line_has_only_parenthesis = code_text_as_lines[end].strip(' ') == ')'
-            if next_line_is_indented and next_line_has_only_parenthesis:
-                function_block_string += f'\n{code_text_as_lines[end]}'
-        function_block_strings.append(function_block_string)
+        start = min([function_def.lineno] + [decorator.lineno for decorator in function_def.decorator_list])
+        function_block_strings.append(parsed_source.lines_text(start, function_def.end_lineno))
     return function_block_strings
 
 
-def python_line_count(python_code: str, *, ignore_empty_lines: bool = True) -> int:
+def python_line_count(python_code: CodeText, *, ignore_empty_lines: bool = True) -> int:
     """Return the number of lines in the given function_text."""
     from d8s_lists import truthy_items
 
-    lines = python_code.splitlines()
+    if isinstance(python_code, ParsedSource):
+        lines = python_code.lines
+    else:
+        lines = _python_code_text(python_code).splitlines()
     if ignore_empty_lines:
         return len(tuple(truthy_items(lines)))
     else:
         return len(lines)
 
 
-def python_function_lengths(code_text: str) -> List[int]:
-    """Find the lengths of each function in the given code_text."""
-    function_blocks = python_function_blocks(code_text)
-    return [python_line_count(function_block) for function_block in function_blocks]
+def python_function_lengths(code_text: CodeText) -> List[int]:
+    """Find the lengths (the number of lines which are not empty) of each function in the given code_text....
+
+    The lengths are counted from the functions' line spans without copying their code (see...
+    python_function_length_metrics for more metrics).
+    """
+    from .function_data import _python_function_spans, _python_non_blank_line_counts
+
+    parsed_source = python_parsed_source(code_text)
+    non_blank_line_counts = _python_non_blank_line_counts(parsed_source)
+    return [
+        non_blank_line_counts[end] - non_blank_line_counts[start - 1]
+        for _, start, end in _python_function_spans(parsed_source)
+    ]
 
 
 def python_version() -> str:
@@ -170,21 +272,163 @@ def python_is_version_3() -> bool:
     return not python_is_version_2()
 
 
+def _python_trie_regex(trie: Dict[Optional[int], dict]) -> bytes:
+    """Return a regex matching the byte strings in the given trie (the longest byte string which matches is matched)."""
+    alternatives = [
+        re.escape(bytes([byte])) + _python_trie_regex(node)
+        for byte, node in sorted(item for item in trie.items() if item[0] is not None)
+    ]
+    if not alternatives:
+        return b''
+
+    regex = alternatives[0] if len(alternatives) == 1 else b'(?:' + b'|'.join(alternatives) + b')'
+    # a None key marks the end of a byte string (so the rest of the regex is optional)
+    return b'(?:' + regex + b')?' if None in trie else regex
+
+
+def _python_call_pattern_regex(call_patterns: Iterable[bytes]) -> Optional[Pattern[bytes]]:
+    """Return a regex matching any of the given call patterns in reversed text (or None if there are only a few)....
+
+    Every call pattern ends with "(" so the regex starts with a literal "(" which the regex engine finds quickly...
+    and the reversed function names are matched with a trie of alternations (so matching does not get slower...
+    with each pattern).
+    """
+    call_patterns = set(call_patterns)
+    if len(call_patterns) <= _CALL_PATTERNS_FIND_MAX:
+        return None
+
+    trie: Dict[Optional[int], dict] = {}
+    for pattern in call_patterns:
+        node = trie
+        for byte in reversed(pattern[:-1]):
+            node = node.setdefault(byte, {})
+        node[None] = {}
+    return re.compile(b'\\(' + _python_trie_regex(trie))
+
+
+def _python_function_calls_in_file(
+    file_path: str, call_patterns: FrozenSet[bytes], call_pattern_regex: Optional[Pattern[bytes]] = None
+) -> Set[bytes]:
+    """Find which of the given call patterns (e.g. b'foo(') are in the file at the given file_path....
+
+    Each pattern is found with a separate search of the file unless a call_pattern_regex (see...
+    _python_call_pattern_regex) is given, in which case the reversed file is searched once for all of the patterns.
+    """
+    import mmap
+
+    found_patterns: Set[bytes] = set()
+
+    with open(file_path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if not file_size:
+            return found_patterns
+
+        if file_size >= _MMAP_THRESHOLD_BYTES:
+            file_contents = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            file_contents = f.read()
+
+        try:
+            if call_pattern_regex is None:
+                found_patterns.update(pattern for pattern in call_patterns if file_contents.find(pattern) != -1)
+                return found_patterns
+
+            pattern_lengths = {len(pattern) for pattern in call_patterns}
+            # (a memory-mapped file is read into memory to be reversed)
+            for match in call_pattern_regex.finditer(file_contents[::-1]):
+                # only the longest pattern which ends at a "(" is matched, so the patterns which end the matched...
+                # pattern (e.g. b'foo(' in b'a.foo(') are found as well
+                matched_pattern = match.group()[::-1]
+                found_patterns.update(
+                    matched_pattern[-length:]
+                    for length in pattern_lengths
+                    if matched_pattern[-length:] in call_patterns
+                )
+                if len(found_patterns) == len(call_patterns):
+                    break
+        finally:
+            if isinstance(file_contents, mmap.mmap):
+                file_contents.close()
+
+    return found_patterns
+
+
+@_instrumented
+def python_files_using_functions(
+    function_names: Iterable[str],
+    search_path: str,
+    *,
+    recursive: bool = False,
+    max_workers: Optional[int] = None,
+    cache: Optional['AnalysisCache'] = None,
+    index: Optional['CallSiteIndex'] = None,
+) -> Dict[str, List[str]]:
+    """Find where each of the given functions is used in the given search path.
+
+    A few function names are each searched for with bytes.find (more are searched for in a single regex scan of...
+    each file) and files are searched using a pool of (at most) max_workers threads. Large files are memory-mapped...
+    rather than read into memory. If a cache is given, files which have not changed since they were searched for...
+    the same function names are not searched again.
+
+    If a CallSiteIndex is given, the files are found in the index instead (after the index is updated) so calls are...
+    found in the ast (e.g. "obj.foo(" and "foo (" are calls of foo, but "foo(" in a string or comment is not).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from d8s_file_system import directory_file_paths_matching
+
+    from .cache_data import _MISSING, python_file_content_hash
+
+    if index is not None:
+        file_paths = directory_file_paths_matching(search_path, '*.py', recursive=recursive)
+        index.update(file_paths, max_workers=max_workers)
+        files_using_functions = {}
+        for name in function_names:
+            indexed_file_paths = set(index.file_paths_calling(name))
+            files_using_functions[name] = [path for path in file_paths if os.path.abspath(path) in indexed_file_paths]
+        return files_using_functions
+
+    call_patterns = {f'{name}('.encode('utf-8'): name for name in function_names}
+    call_pattern_regex = _python_call_pattern_regex(call_patterns)
+    cache_key = f'python_files_using_functions:{python_file_content_hash(repr(sorted(call_patterns)).encode())}'
+
+    found_patterns_per_file: Dict[str, Iterable[bytes]] = {}
+    # the content hash of each file before it is searched (so the file's results are cached by the content searched)
+    content_hashes: Dict[str, str] = {}
+    file_paths = directory_file_paths_matching(search_path, '*.py', recursive=recursive)
+    if cache is not None:
+        for file_path in file_paths:
+            content_hashes[file_path], _ = cache.file_content_hash(file_path)
+            found_patterns = cache.get(file_path, cache_key, _MISSING, content_hash=content_hashes[file_path])
+            if found_patterns is not _MISSING:
+                found_patterns_per_file[file_path] = found_patterns
+
+    unsearched_file_paths = [file_path for file_path in file_paths if file_path not in found_patterns_per_file]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        found_patterns_per_unsearched_file = executor.map(
+            _python_function_calls_in_file,
+            unsearched_file_paths,
+            itertools.repeat(frozenset(call_patterns)),
+            itertools.repeat(call_pattern_regex),
+        )
+        for file_path, found_patterns in zip(unsearched_file_paths, found_patterns_per_unsearched_file):
+            found_patterns_per_file[file_path] = found_patterns
+            if cache is not None:
+                cache.set(file_path, cache_key, sorted(found_patterns), content_hash=content_hashes[file_path])
+
+    files_using_functions: Dict[str, List[str]] = {name: [] for name in call_patterns.values()}
+    for file_path in file_paths:
+        for pattern in found_patterns_per_file[file_path]:
+            files_using_functions[call_patterns[pattern]].append(file_path)
+
+    return files_using_functions
+
+
 # TODO: need to standardize the order of arguments between functions like this an the directorySearch function
 # @decorators.map_first_arg
 def python_files_using_function(function_name: str, search_path: str) -> List[str]:
     """Find where the given function is used in the given search path."""
-    from d8s_file_system import directory_read_files_with_path_matching
-
-    files_using_function = []
-
-    function_pattern = f'{function_name}('
-    python_files = directory_read_files_with_path_matching(search_path, '*.py')
-    for file_path, file_contents in python_files:
-        if function_pattern in file_contents:
-            files_using_function.append(file_path)
-
-    return files_using_function
+    return python_files_using_functions([function_name], search_path)[function_name]
 
 
 def python_keywords() -> List[str]:
@@ -209,37 +453,113 @@ def python_keywords() -> List[str]:
 
 
 # @decorators.map_first_arg
-def python_object_properties_enumerate(  # noqa: CCR001
+def python_object_properties_enumerate(
     python_object: Any, *, run_methods: bool = True, internal_properties: bool = True
 ) -> None:
-    """Enumerate and print out the properties of the given object."""
-    for i in python_object.__dir__():
-        if not internal_properties:
-            if i.startswith('_'):
-                continue
+    """Enumerate and print out the properties of the given object (see python_object_properties)."""
+    from .object_data import python_object_properties
 
-        string_to_eval_as_property = 'python_object.{}'.format(i)
-        try:
-            if run_methods:
-                eval_result = eval(string_to_eval_as_property)  # pylint: disable=W0123
-                if callable(eval_result):
-                    string_to_eval_as_function = 'python_object.{}()'.format(i)
-                    try:
-                        print(f'{i}: {eval(string_to_eval_as_function)}')  # pylint: disable=W0123
-                    except TypeError:
-                        print(f'{i}: {eval(string_to_eval_as_property)}')  # pylint: disable=W0123
-                else:
-                    print(f'{i}: {eval_result}')
-            else:
-                print(f'{i}: {eval(string_to_eval_as_property)}')  # pylint: disable=W0123
-        except AttributeError:
-            print(f'! Unable to get the {i} attribute for the item.')
-
-
-def python_copy_deep(python_object: Any) -> Any:
-    """Return a deep (complete, recursive) copy of the given python object."""
+    object_properties = python_object_properties(
+        python_object, run_methods=run_methods, internal_properties=internal_properties
+    )
+    for object_property in object_properties:
+        if object_property.kind == 'error':
+            print(f'! Unable to get the {object_property.name} attribute for the item.')
+        else:
+            print(f'{object_property.name}: {object_property.value}')
+
+
+# values of these types are not copied by python_copy_deep's tree copies (they are immutable or, like the...
+# operators and expression contexts of an ast, they have no fields and are shared by the trees the parser makes)
+_TREE_ATOMIC_TYPES = frozenset(
+    [type(None), bool, int, float, complex, str, bytes, type(Ellipsis)]
+    + [
+        node_type
+        for base_type in (ast.expr_context, ast.boolop, ast.operator, ast.unaryop, ast.cmpop)
+        for node_type in base_type.__subclasses__()
+    ]
+)
+
+
+# the names of the fields and attributes of each type of ast object (by the type)
+_AST_ATTRIBUTE_NAMES: Dict[type, FrozenSet[str]] = {}
+
+
+def _python_copy_tree(python_object: Any) -> Any:  # noqa: CCR001
+    """Return a deep copy of the given python_object (which must be a tree) without recursion....
+
+    If an ast object in the tree has attributes which are not the fields or attributes of its type (like a parent...
+    set by a transform), nothing is copied and _MISSING is returned.
+    """
     import copy
 
+    from .cache_data import _MISSING
+
+    root: List[Any] = [None]
+    # each item is whether or not it finishes a tuple, a value, and the container (and the key in that container)...
+    # to put the value's copy in; the items of a tuple are copied into a list which is turned into a tuple (by the...
+    # item which finishes the tuple) once the items are copied
+    stack: List[Tuple[bool, Any, Any, Any]] = [(False, python_object, root, 0)]
+    atomic_types = _TREE_ATOMIC_TYPES
+    while stack:
+        finishes_tuple, value, container, key = stack.pop()
+        value_type = type(value)
+        if finishes_tuple:
+            container[key] = tuple(value)
+        elif value_type in atomic_types:
+            container[key] = value
+        elif value_type is list or value_type is tuple:
+            container[key] = value_copy = list(value)
+            if value_type is tuple:
+                stack.append((True, value_copy, container, key))
+            # atomic items are already in the copy
+            for index, item in enumerate(value):
+                if type(item) not in atomic_types:
+                    stack.append((False, item, value_copy, index))
+        elif isinstance(value, AST):
+            attribute_names = _AST_ATTRIBUTE_NAMES.get(value_type)
+            if attribute_names is None:
+                attribute_names = _AST_ATTRIBUTE_NAMES[value_type] = frozenset(value._fields + value._attributes)
+            attributes = value.__dict__
+            if not attribute_names.issuperset(attributes):
+                return _MISSING
+
+            container[key] = value_copy = value_type.__new__(value_type)
+            attributes_copy = value_copy.__dict__
+            attributes_copy.update(attributes)
+            for name in value._fields:
+                field = attributes.get(name)
+                if type(field) not in atomic_types:
+                    stack.append((False, field, attributes_copy, name))
+        elif value_type is dict:
+            container[key] = value_copy = dict(value)
+            for item_key, item in value.items():
+                if type(item) not in atomic_types:
+                    stack.append((False, item, value_copy, item_key))
+        else:
+            container[key] = copy.deepcopy(value)
+    return root[0]
+
+
+def python_copy_deep(python_object: Any, *, tree: bool = False) -> Any:
+    """Return a deep (complete, recursive) copy of the given python object....
+
+    If tree is True, the python_object must be a tree of ast objects and/or plain containers (dicts, lists, and...
+    tuples) which does not contain the same container twice. A tree is copied several times faster than...
+    copy.deepcopy copies it (and without recursion, so deeply nested trees can be copied) because no memo of the...
+    copied objects is kept and the fields of ast objects are copied directly. Any other objects in the tree are...
+    copied with copy.deepcopy. If an ast object in the tree has attributes other than the fields and attributes...
+    of its type (like a parent set by a transform), the whole python_object is copied with copy.deepcopy instead.
+    """
+    import copy
+
+    if tree:
+        from .cache_data import _MISSING
+
+        python_object_copy = _python_copy_tree(python_object)
+        if python_object_copy is not _MISSING:
+            return python_object_copy
+
     return copy.deepcopy(python_object)
 
 
@@ -250,6 +570,15 @@ def python_copy_shallow(python_object: Any) -> Any:
     return copy.copy(python_object)
 
 
+def _python_is_file_name(file_name: str, *, exclude_tests: bool = False) -> bool:
+    """Return whether or not the file_name is the name of a python file (which is not a test file, if exclude_tests)."""
+    import fnmatch
+
+    if not fnmatch.fnmatch(file_name, '*.py'):
+        return False
+    return not exclude_tests or ('_test' not in file_name and 'test_' not in file_name)
+
+
 # @decorators.map_first_arg
 def python_file_names(path: str, *, exclude_tests: bool = False) -> List[str]:  # noqa: CCR001
     """Find all python files in the given directory."""
@@ -259,47 +588,51 @@ def python_file_names(path: str, *, exclude_tests: bool = False) -> List[str]:
 
     if not exclude_tests:
         return files
-    else:
-        non_test_files = []
-
-        for file in files:
-            if '_test' not in file and 'test_' not in file:
-                non_test_files.append(file)
-
-        return non_test_files
+    return [file for file in files if _python_is_file_name(file, exclude_tests=True)]
 
 
 # @decorators.map_first_arg
-def python_fstrings(code_text: str, *, include_braces: bool = False) -> Iterator[str]:
+def python_fstrings(code_text: CodeText, *, include_braces: bool = False) -> Iterator[str]:
     """Find all of the python formatted string literals in the given text.
 
-    See https://realpython.com/python-f-strings/ for more details about f-strings.
+    See https://realpython.com/python-f-strings/ for more details about f-strings. Use...
+    python_fstring_expressions to get the positions and parts of each replacement field.
     """
-    from d8s_grammars import python_formatted_string_literal
-    from d8s_lists import flatten
+    from .fstring_data import python_fstring_expressions
+
+    for fstring_expression in python_fstring_expressions(code_text):
+        yield f'{{{fstring_expression.text}}}' if include_braces else fstring_expression.text
 
-    python_f_strings = flatten(python_formatted_string_literal.searchString(code_text).asList())
 
-    if not include_braces:
-        python_f_strings = (f_string.strip('{').strip('}') for f_string in python_f_strings)
+def _python_dis_object(code_text: Any) -> Any:
+    """Return the code object of the given code_text (anything else dis accepts, like a function, is returned as is)."""
+    if isinstance(code_text, ParsedSource) or _python_is_code_text(code_text):
+        from .bytecode_data import python_code_object
 
-    return python_f_strings
+        return python_code_object(code_text)
+    return code_text
 
 
 # @decorators.map_first_arg
-def python_code_details(code_text: str):
-    """Get details about the given code_text. This is a wrapper for `dis.code_info`"""
+def python_code_details(code_text: Any):
+    """Get details about the given code_text (or function, method, class, or code object)....
+
+    This is a wrapper for `dis.code_info`.
+    """
     import dis
 
-    return dis.code_info(code_text)
+    return dis.code_info(_python_dis_object(code_text))
 
 
 # @decorators.map_first_arg
-def python_disassemble(code_text: str):
-    """Disassemble the python code_text. This is a wrapper for `dis.dis`"""
+def python_disassemble(code_text: Any):
+    """Disassemble the python code_text (or function, method, class, or code object). This wraps `dis.dis`....
+
+    See python_bytecode for the instructions of the code_text (and of the functions in it) as data.
+    """
     import dis
 
-    return dis.Bytecode(code_text).dis()
+    return dis.Bytecode(_python_dis_object(code_text)).dis()
 
 
 def python_stack_local_data():
@@ -383,23 +716,19 @@ def _get_importfrom_module_name(node: ImportFrom) -> str:
     return module_name
 
 
-def python_package_imports(code: str) -> Dict[str, List[str]]:
+def python_package_imports(code: Union[CodeText, object]) -> Dict[str, List[str]]:
     """Return a dictionary containing the names of all imported modules."""
-    # Start with the Import nodes.
-    # These will always have an empty list of submodules
-    # so we can just overwrite them without losing any data
-    modules = dict()
-    nodes = python_ast_objects_of_type(code, Import)
-    for node in nodes:
-        for alias in node.names:
-            modules[alias.name] = []
-
-    # Now for the ImportFrom nodes
-    importfrom_nodes = python_ast_objects_of_type(code, ImportFrom)
-    for node in importfrom_nodes:
-        module_name = _get_importfrom_module_name(node)
-
-        for alias in node.names:
-            modules.setdefault(module_name, []).append(alias.name)
+    node_index = python_ast_node_index(code)
+
+    # Import nodes always have an empty list of submodules (so they never replace the names imported by an...
+    # ImportFrom node of the same module)
+    modules: Dict[str, List[str]] = dict()
+    for node in node_index.objects_of_type((Import, ImportFrom)):
+        if isinstance(node, Import):
+            for alias in node.names:
+                modules.setdefault(alias.name, [])
+        else:
+            module_names = modules.setdefault(_get_importfrom_module_name(node), [])
+            module_names.extend(alias.name for alias in node.names)
 
     return modules
@@ -0,0 +1,306 @@
+import functools
+import os
+import pathlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .ast_data import ParsedSource
+from .cache_data import _MISSING, AnalysisCache
+from .metrics_data import _METRICS, _instrumented, _timed
+from .python_data import _python_is_file_name
+
+__all__ = [
+    'Extractor',
+    'FileAnalysis',
+    'python_file_paths',
+    'python_file_analyze',
+    'python_files_analyze',
+]
+
+Extractor = Union[str, Callable[..., Any]]
+
+# the keys under which the errors of files which can not be parsed are cached (by whether the files were parsed...
+# strictly), so files which are known not to parse are not parsed again
+_PARSE_ERROR_KEYS = {False: 'd8s_python.python_ast_parse:error', True: 'd8s_python.python_ast_parse:strict_error'}
+
+
+class FileAnalysis(NamedTuple):
+    """The results of running extractors on a python file."""
+
+    file_path: str
+    # the result of each extractor (by the extractor's name)
+    results: Dict[str, Any]
+    # a description of the error raised by each extractor which failed (by the extractor's name)...
+    # if the file could not be read or parsed, the error is stored under 'python_ast_parse'
+    errors: Dict[str, str]
+
+
+def python_file_paths(paths: Union[str, Iterable[str]], *, exclude_tests: bool = False) -> Iterator[str]:
+    """Find all python files in the given paths (directories are searched recursively and files are yielded as-is)."""
+    if isinstance(paths, str):
+        paths = [paths]
+
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+
+        # the names of the files in each directory are filtered as os.walk lists them (rather than listing each...
+        # directory again)
+        for directory_path, _, file_names in os.walk(path):
+            for file_name in file_names:
+                if _python_is_file_name(file_name, exclude_tests=exclude_tests):
+                    yield os.path.join(directory_path, file_name)
+
+
+def _python_extractor_name(extractor: Extractor) -> str:
+    """Return the name of the given extractor."""
+    if isinstance(extractor, str):
+        return extractor
+    # functools.partial objects do not have a __name__, but the function they wrap does
+    extractor = getattr(extractor, 'func', extractor)
+    return getattr(extractor, '__name__', repr(extractor))
+
+
+def _python_extractor_key(extractor: Extractor) -> str:
+    """Return the key under which the results of the given extractor are cached."""
+    if isinstance(extractor, str):
+        return f'd8s_python.{extractor}'
+    elif isinstance(extractor, functools.partial):
+        return f'{_python_extractor_key(extractor.func)}{extractor.args}{sorted(extractor.keywords.items())}'
+    return f'{extractor.__module__}.{getattr(extractor, "__qualname__", type(extractor).__qualname__)}'
+
+
+def _python_extractor(extractor: Extractor) -> Callable[..., Any]:
+    """Return the function for the given extractor (which may be the name of a function in d8s_python)."""
+    if isinstance(extractor, str):
+        import d8s_python
+
+        return getattr(d8s_python, extractor)
+    return extractor
+
+
+def _python_error_description(error: Exception) -> str:
+    """Describe the given error."""
+    return f'{type(error).__name__}: {error}'
+
+
+@_instrumented
+def _python_file_analyze(
+    file_path: str, extractors: Iterable[Extractor], *, strict_parse: bool = False
+) -> FileAnalysis:
+    """Run each of the extractors on the python file at the given file_path (the file is only parsed once)."""
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+
+    try:
+        # the file is parsed as bytes (and decoded using the encoding it declares only if an extractor needs its text)
+        parsed_source = ParsedSource(pathlib.Path(file_path), strict=strict_parse)
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError) as e:
+        errors['python_ast_parse'] = _python_error_description(e)
+        return FileAnalysis(file_path, results, errors)
+
+    for extractor in extractors:
+        name = _python_extractor_name(extractor)
+        try:
+            with _timed(f'extractor:{name}'):
+                result = _python_extractor(extractor)(parsed_source)
+                # generators can not be sent between processes so they are collected into lists
+                if isinstance(result, Iterator):
+                    result = list(result)
+            results[name] = result
+        except Exception as e:  # pylint: disable=W0703
+            errors[name] = _python_error_description(e)
+
+    return FileAnalysis(file_path, results, errors)
+
+
+def _python_cached_parse_error(
+    cache: Optional[AnalysisCache], file_path: str, strict_parse: bool, content_hash: Optional[str]
+) -> Optional[str]:
+    """Return the cached description of the error raised parsing the file at the given file_path (if there is one)....
+
+    These lookups are not counted in the cache's stats (which count the lookups of the extractors' results).
+    """
+    if cache is None or content_hash is None:
+        return None
+
+    parse_error = cache.get(
+        file_path, _PARSE_ERROR_KEYS[strict_parse], _MISSING, count=False, content_hash=content_hash
+    )
+    if _METRICS.enabled:
+        _METRICS.cache_lookup('parse_errors', parse_error is not _MISSING)
+    return None if parse_error is _MISSING else parse_error
+
+
+def _python_cached_results(
+    cache: Optional[AnalysisCache], file_path: str, extractors: List[Extractor]
+) -> Tuple[Dict[str, Any], List[Extractor], Optional[str]]:
+    """Return the cached results for the file at the given file_path and the extractors which are not cached....
+
+    The file's content hash is returned as well (it is None if there is no cache or the file can not be read).
+    """
+    if cache is None:
+        return {}, extractors, None
+
+    try:
+        content_hash, _ = cache.file_content_hash(file_path)
+    except OSError:
+        return {}, extractors, None
+
+    cached_results: Dict[str, Any] = {}
+    uncached_extractors = []
+    for extractor in extractors:
+        result = cache.get(file_path, _python_extractor_key(extractor), _MISSING, content_hash=content_hash)
+        if result is _MISSING:
+            uncached_extractors.append(extractor)
+        else:
+            cached_results[_python_extractor_name(extractor)] = result
+    return cached_results, uncached_extractors, content_hash
+
+
+def _python_file_analysis_merge(
+    cache: Optional[AnalysisCache],
+    extractors: List[Extractor],
+    cached_results: Dict[str, Any],
+    analysis: FileAnalysis,
+    analyzed_extractors: List[Extractor],
+    strict_parse: bool,
+    content_hash: Optional[str],
+) -> FileAnalysis:
+    """Cache the results of the analysis and merge them with the cached_results (in the order of the extractors)....
+
+    The results are cached by the content_hash the file had before it was analyzed (if the file could not be read...
+    then, there is no content_hash and nothing is cached).
+    """
+    if cache is not None and content_hash is not None and 'python_ast_parse' in analysis.errors:
+        cache.set(
+            analysis.file_path,
+            _PARSE_ERROR_KEYS[strict_parse],
+            analysis.errors['python_ast_parse'],
+            content_hash=content_hash,
+        )
+    elif cache is not None and content_hash is not None:
+        for extractor in analyzed_extractors:
+            name = _python_extractor_name(extractor)
+            if name in analysis.results:
+                cache.set(
+                    analysis.file_path,
+                    _python_extractor_key(extractor),
+                    analysis.results[name],
+                    content_hash=content_hash,
+                )
+
+    all_results = {**cached_results, **analysis.results}
+    names = (_python_extractor_name(extractor) for extractor in extractors)
+    results = {name: all_results[name] for name in names if name in all_results}
+    return FileAnalysis(analysis.file_path, results, analysis.errors)
+
+
+def python_file_analyze(
+    file_path: str,
+    extractors: Iterable[Extractor],
+    *,
+    cache: Optional[AnalysisCache] = None,
+    strict_parse: bool = False,
+) -> FileAnalysis:
+    """Run each of the extractors on the python file at the given file_path (the file is only parsed once).
+
+    If a cache is given, only the extractors whose results for the file are not cached are run and a file which...
+    could not be parsed before (and has not changed) is not parsed again. If strict_parse is True, a file which can...
+    not be parsed is not parsed a second time with its line breaks escaped (see python_ast_parse).
+    """
+    extractors = list(extractors)
+    cached_results, uncached_extractors, content_hash = _python_cached_results(cache, file_path, extractors)
+    parse_error = (
+        _python_cached_parse_error(cache, file_path, strict_parse, content_hash) if uncached_extractors else None
+    )
+    if parse_error is not None:
+        return FileAnalysis(file_path, {}, {'python_ast_parse': parse_error})
+    elif uncached_extractors:
+        analysis = _python_file_analyze(file_path, uncached_extractors, strict_parse=strict_parse)
+    else:
+        analysis = FileAnalysis(file_path, {}, {})
+    return _python_file_analysis_merge(
+        cache, extractors, cached_results, analysis, uncached_extractors, strict_parse, content_hash
+    )
+
+
+def _python_files_analyze_chunk(chunk: List[Tuple[str, List[Extractor]]], strict_parse: bool) -> List[FileAnalysis]:
+    """Run the given extractors on each of the given files (this is run in a worker process)."""
+    return [_python_file_analyze(file_path, extractors, strict_parse=strict_parse) for file_path, extractors in chunk]
+
+
+def _python_file_size(file_path: str) -> int:
+    """Return the size of the file at the given path (or zero if the file can not be found)."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def python_files_analyze(
+    paths: Union[str, Iterable[str]],
+    extractors: Iterable[Extractor],
+    *,
+    max_workers: Optional[int] = None,
+    chunk_size: int = 1,
+    exclude_tests: bool = False,
+    cache: Optional[AnalysisCache] = None,
+    strict_parse: bool = False,
+) -> Iterator[FileAnalysis]:
+    """Run each of the extractors on every python file in the given paths and yield each file's results as it finishes.
+
+    Each extractor is either a function which takes code_text (it is given a ParsedSource) or the name of a...
+    function in d8s_python (e.g. 'python_function_names'). Extractors must be picklable (so lambdas can not be...
+    used) because files are analyzed by a pool of max_workers processes (if max_workers is 1, the files are...
+    analyzed in this process instead). Files are sent to the workers in chunks of chunk_size files with the...
+    largest files first so that a large file found late does not hold up the end of the analysis. If a cache is...
+    given, files whose results are all cached (or which are known not to parse) are yielded first and the other...
+    files are only run through the extractors whose results are not cached. If strict_parse is True, files which...
+    can not be parsed are not parsed a second time with their line breaks escaped (see python_ast_parse).
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    extractors = list(extractors)
+    file_paths = sorted(python_file_paths(paths, exclude_tests=exclude_tests), key=_python_file_size, reverse=True)
+
+    # the cached results and content hash of each file which is analyzed
+    cached_results_per_file: Dict[str, Tuple[Dict[str, Any], Optional[str]]] = {}
+    files_to_analyze = []
+    for file_path in file_paths:
+        cached_results, uncached_extractors, content_hash = _python_cached_results(cache, file_path, extractors)
+        parse_error = (
+            _python_cached_parse_error(cache, file_path, strict_parse, content_hash) if uncached_extractors else None
+        )
+        if parse_error is not None:
+            yield FileAnalysis(file_path, {}, {'python_ast_parse': parse_error})
+        elif uncached_extractors:
+            cached_results_per_file[file_path] = (cached_results, content_hash)
+            files_to_analyze.append((file_path, uncached_extractors))
+        else:
+            yield FileAnalysis(file_path, cached_results, {})
+
+    def merge(analysis: FileAnalysis) -> FileAnalysis:
+        cached_results, content_hash = cached_results_per_file[analysis.file_path]
+        analyzed_extractors = [
+            extractor for extractor in extractors if _python_extractor_name(extractor) not in cached_results
+        ]
+        return _python_file_analysis_merge(
+            cache, extractors, cached_results, analysis, analyzed_extractors, strict_parse, content_hash
+        )
+
+    chunks = [files_to_analyze[i : i + chunk_size] for i in range(0, len(files_to_analyze), chunk_size)]  # noqa=E203
+    if max_workers == 1:
+        for chunk in chunks:
+            yield from map(merge, _python_files_analyze_chunk(chunk, strict_parse))
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_python_files_analyze_chunk, chunk, strict_parse) for chunk in chunks]
+        try:
+            for future in as_completed(futures):
+                yield from map(merge, future.result())
+        finally:
+            # if the caller stops early (or something goes wrong), do not start the chunks which are still waiting
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,276 @@
+import ast
+import collections
+from typing import Deque, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+from .ast_data import CodeText, ParsedSource, _python_is_code_text, python_parsed_source
+from .metrics_data import _timed
+
+__all__ = [
+    'SYMBOL_KINDS',
+    'Symbol',
+    'SymbolScope',
+    'SymbolIndex',
+    'python_symbol_index',
+]
+
+# the kinds of symbols: "assigned" (a name stored to), "deleted", "loaded", "argument", "definition" (the name of...
+# a function or class), "imported", "bound" (a name bound by an except clause or a match pattern), "global", and...
+# "nonlocal" (a name declared global or nonlocal)
+SYMBOL_KINDS = (
+    'assigned',
+    'deleted',
+    'loaded',
+    'argument',
+    'definition',
+    'imported',
+    'bound',
+    'global',
+    'nonlocal',
+)
+# the kinds of symbols which bind a name in the scope they are in
+_BINDING_KINDS = ('assigned', 'argument', 'definition', 'imported', 'bound')
+
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+_COMPREHENSION_NAMES = {
+    ast.ListComp: '<listcomp>',
+    ast.SetComp: '<setcomp>',
+    ast.DictComp: '<dictcomp>',
+    ast.GeneratorExp: '<genexpr>',
+}
+# the types of the ast objects which create a scope
+_SCOPE_TYPES = frozenset((ast.ClassDef,) + _FUNCTION_TYPES + tuple(_COMPREHENSION_NAMES))
+_NAME_CONTEXT_KINDS = {ast.Load: 'loaded', ast.Store: 'assigned', ast.Del: 'deleted'}
+# the fields of a function, class, or comprehension which are evaluated in the scope it creates (the other fields,...
+# like decorators and default values, are evaluated in the enclosing scope)
+_INNER_SCOPE_FIELDS = {'body', 'elt', 'key', 'value', 'generators'}
+# the fields of an arguments object which are evaluated in the scope enclosing the function
+_DEFAULTS_FIELDS = {'defaults', 'kw_defaults'}
+# the match statement's patterns (which bind names) are only available in python 3.10+
+_MATCH_CAPTURE_TYPES = tuple(
+    getattr(ast, name) for name in ('MatchAs', 'MatchStar', 'MatchMapping') if hasattr(ast, name)
+)
+_MATCH_MAPPING_TYPE = getattr(ast, 'MatchMapping', ())
+# the types of the ast objects (other than names) which add symbols to the scope they are in
+_SYMBOL_TYPES = frozenset(
+    (ast.arg, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Import, ast.ImportFrom, ast.Global, ast.Nonlocal)
+    + (ast.ExceptHandler,)
+    + _MATCH_CAPTURE_TYPES
+)
+
+
+class Symbol(NamedTuple):
+    """A use of a name in python code (as found by python_symbol_index)."""
+
+    name: str
+    # one of the SYMBOL_KINDS
+    kind: str
+    # the qualified name of the scope the name is used in (see SymbolScope)
+    scope: str
+    line_number: int
+    col_offset: int
+
+
+class SymbolScope:
+    """A scope (a module, class, function, lambda, or comprehension) and the symbols used in it.
+
+    The qualified name of a scope is like the qualified name of a code object (e.g. "<module>", "A.f",...
+    "f.<locals>.g", or "f.<locals>.<listcomp>").
+    """
+
+    def __init__(self, qualified_name: str, kind: str, line_number: int, parent: Optional['SymbolScope']):
+        self.qualified_name = qualified_name
+        # "module", "class", "function" (functions and lambdas), or "comprehension"
+        self.kind = kind
+        self.line_number = line_number
+        self.parent = parent
+        self.children: List['SymbolScope'] = []
+        # the symbols used in the scope by kind and by name (in the order they are found)
+        self._symbols: Dict[str, Dict[str, List[Symbol]]] = {kind: {} for kind in SYMBOL_KINDS}
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.qualified_name!r}, {self.kind!r}, {self.line_number})'
+
+    def __contains__(self, name: str) -> bool:
+        return any(name in symbols for symbols in self._symbols.values())
+
+    def names(self, kind: str) -> List[str]:
+        """Return the names used in the scope as symbols of the given kind (in the order they are first used)."""
+        return list(self._symbols[kind])
+
+    def symbols(self, name: str, kind: Optional[str] = None) -> List[Symbol]:
+        """Return the symbols of the given name (and of the given kind, if one is given) used in the scope."""
+        if kind is not None:
+            return list(self._symbols[kind].get(name, ()))
+        return sorted(
+            (symbol for symbols in self._symbols.values() for symbol in symbols.get(name, ())),
+            key=lambda symbol: (symbol.line_number, symbol.col_offset),
+        )
+
+    def is_local(self, name: str) -> bool:
+        """Return whether or not the given name is a local name of the scope....
+
+        A name is local if it is bound in the scope and is not declared global or nonlocal in it.
+        """
+        if name in self._symbols['global'] or name in self._symbols['nonlocal']:
+            return False
+        return any(name in self._symbols[kind] for kind in _BINDING_KINDS)
+
+    def _add(self, symbol: Symbol) -> None:
+        self._symbols[symbol.kind].setdefault(symbol.name, []).append(symbol)
+
+
+class SymbolIndex:
+    """An index of the scopes in python code and of the names defined and used in each scope....
+
+    The index is built with a single walk of the code. Symbols are kept in the order in which ast.walk finds the...
+    ast objects they come from. Looking up a scope by its qualified name, the symbols of a kind, or the symbols of...
+    a name costs O(1) (plus the size of the result).
+    """
+
+    def __init__(self, ast_object: object):
+        with _timed('SymbolIndex'):
+            self.module_scope = SymbolScope('<module>', 'module', 1, None)
+            self._scopes = [self.module_scope]
+            self._symbols: List[Symbol] = []
+            self._symbols_by_kind: Dict[str, List[Symbol]] = {kind: [] for kind in SYMBOL_KINDS}
+            self._symbols_by_name: Dict[str, List[Symbol]] = {}
+            self._index(ast_object)
+
+            self._scopes_by_name: Dict[str, SymbolScope] = {}
+            for scope in self._scopes:
+                self._scopes_by_name.setdefault(scope.qualified_name, scope)
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    @property
+    def scopes(self) -> Tuple[SymbolScope, ...]:
+        """The scopes in the code (in the order in which ast.walk finds them, so the module's scope comes first)."""
+        return tuple(self._scopes)
+
+    def scope(self, qualified_name: str) -> SymbolScope:
+        """Return the (first) scope with the given qualified name (a KeyError is raised if there is no such scope)."""
+        return self._scopes_by_name[qualified_name]
+
+    def symbols(self, kind: Optional[str] = None, *, name: Optional[str] = None) -> List[Symbol]:
+        """Return the symbols of the given kind and/or name in every scope (all symbols if neither is given)."""
+        if name is not None:
+            symbols = self._symbols_by_name.get(name, [])
+            return [symbol for symbol in symbols if symbol.kind == kind] if kind is not None else list(symbols)
+        elif kind is not None:
+            return list(self._symbols_by_kind[kind])
+        return list(self._symbols)
+
+    def _add(self, scope: SymbolScope, name: str, kind: str, node: object) -> None:
+        symbol = Symbol(name, kind, scope.qualified_name, node.lineno, node.col_offset)
+        scope._add(symbol)
+        self._symbols.append(symbol)
+        self._symbols_by_kind[kind].append(symbol)
+        self._symbols_by_name.setdefault(name, []).append(symbol)
+
+    def _new_scope(self, node: object, scope: SymbolScope) -> SymbolScope:
+        """Create the scope of the given function, class, or comprehension (which is in the given scope)."""
+        if isinstance(node, ast.ClassDef):
+            name, kind = node.name, 'class'
+        elif isinstance(node, _FUNCTION_TYPES):
+            name, kind = getattr(node, 'name', '<lambda>'), 'function'
+        else:
+            name, kind = _COMPREHENSION_NAMES[type(node)], 'comprehension'
+
+        if scope.kind == 'module':
+            qualified_name = name
+        elif scope.kind == 'class':
+            qualified_name = f'{scope.qualified_name}.{name}'
+        else:
+            qualified_name = f'{scope.qualified_name}.<locals>.{name}'
+        new_scope = SymbolScope(qualified_name, kind, node.lineno, scope)
+        scope.children.append(new_scope)
+        self._scopes.append(new_scope)
+        return new_scope
+
+    def _add_node(self, node: object, scope: SymbolScope) -> None:  # noqa: CCR001
+        """Add the symbols the given ast object (which is in the given scope) uses itself (not its children)."""
+        if isinstance(node, ast.arg):
+            self._add(scope, node.arg, 'argument', node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            self._add(scope, node.name, 'definition', node)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                name = alias.asname or alias.name.partition('.')[0]
+                # before python 3.10, aliases do not have a position
+                self._add(scope, name, 'imported', alias if hasattr(alias, 'lineno') else node)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            kind = 'global' if isinstance(node, ast.Global) else 'nonlocal'
+            for name in node.names:
+                self._add(scope, name, kind, node)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            self._add(scope, node.name, 'bound', node)
+        elif _MATCH_CAPTURE_TYPES and isinstance(node, _MATCH_CAPTURE_TYPES):
+            name = node.rest if isinstance(node, _MATCH_MAPPING_TYPE) else node.name
+            if name:
+                self._add(scope, name, 'bound', node)
+
+    def _index(self, ast_object: object) -> None:  # noqa: CCR001
+        """Walk the ast_object (in the order ast.walk walks it) adding the symbols in each scope."""
+        pending: Deque[Tuple[object, SymbolScope]] = collections.deque([(ast_object, self.module_scope)])
+        # the scopes of the functions whose arguments objects have not been walked yet (by the id of the arguments)
+        argument_scopes: Dict[int, SymbolScope] = {}
+        # the first iterable of a comprehension is evaluated in the scope enclosing the comprehension
+        outer_iterable_ids: Set[int] = set()
+        while pending:
+            node, scope = pending.popleft()
+            node_type = type(node)
+            if node_type is ast.Name:
+                self._add(scope, node.id, _NAME_CONTEXT_KINDS[type(node.ctx)], node)
+                continue
+            elif node_type in _SYMBOL_TYPES:
+                self._add_node(node, scope)
+
+            if node_type in _SCOPE_TYPES:
+                inner_scope = self._new_scope(node, scope)
+                if node_type in _COMPREHENSION_NAMES:
+                    outer_iterable_ids.add(id(node.generators[0].iter))
+                elif node_type is not ast.ClassDef:
+                    argument_scopes[id(node.args)] = inner_scope
+                for field, value in ast.iter_fields(node):
+                    _python_pending_extend(pending, value, inner_scope if field in _INNER_SCOPE_FIELDS else scope)
+            elif node_type is ast.arguments:
+                # the arguments are in the function's scope and their default values are in the enclosing scope
+                arguments_scope = argument_scopes.pop(id(node), scope)
+                for field, value in ast.iter_fields(node):
+                    _python_pending_extend(pending, value, scope if field in _DEFAULTS_FIELDS else arguments_scope)
+            elif node_type is ast.arg:
+                # the annotation of an argument is evaluated in the scope enclosing the function
+                _python_pending_extend(pending, node.annotation, scope.parent or scope)
+            elif node_type is ast.comprehension:
+                for _, value in ast.iter_fields(node):
+                    _python_pending_extend(pending, value, scope.parent if id(value) in outer_iterable_ids else scope)
+            elif node_type is ast.NamedExpr:
+                # an assignment expression in a comprehension binds its name in the enclosing function (or module)
+                target_scope = scope
+                while target_scope.kind == 'comprehension':
+                    target_scope = target_scope.parent
+                pending.append((node.target, target_scope))
+                pending.append((node.value, scope))
+            else:
+                pending.extend((child, scope) for child in ast.iter_child_nodes(node))
+
+
+def _python_pending_extend(pending: Deque[Tuple[object, SymbolScope]], value: object, scope: SymbolScope) -> None:
+    """Add the ast objects in the given field value (an ast object, a list, or neither) to the pending ast objects."""
+    if isinstance(value, list):
+        pending.extend((child, scope) for child in value if isinstance(child, ast.AST))
+    elif isinstance(value, ast.AST):
+        pending.append((value, scope))
+
+
+def python_symbol_index(code_text_or_ast_object: Union[CodeText, object]) -> SymbolIndex:
+    """Return an index of the scopes in the code_text_or_ast_object and of the names defined and used in them....
+
+    If a ParsedSource is given, its (cached) index is returned.
+    """
+    if isinstance(code_text_or_ast_object, ParsedSource):
+        return code_text_or_ast_object.symbol_index
+    elif _python_is_code_text(code_text_or_ast_object):
+        return python_parsed_source(code_text_or_ast_object).symbol_index
+    return SymbolIndex(code_text_or_ast_object)
@@ -0,0 +1,119 @@
+import functools
+import io
+import itertools
+import re
+import tokenize
+from typing import IO, Callable, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from .ast_data import CodeText, _python_code_text
+from .repository_data import python_file_paths
+
+__all__ = [
+    'DEFAULT_TODO_MARKERS',
+    'Todo',
+    'python_comments',
+    'python_todos_in_file_object',
+    'python_file_todos',
+    'python_files_todos',
+]
+
+DEFAULT_TODO_MARKERS = ('TODO', 'FIXME', 'HACK')
+
+
+class Todo(NamedTuple):
+    """A todo found in a comment."""
+
+    # the path of the file the todo is in (None if the todo was not found in a file)
+    file_path: Optional[str]
+    line_number: int
+    # the text matched by the marker (e.g. "FIXME")
+    marker: str
+    # the comment from the marker to the end of the comment (e.g. "FIXME: this is slow")
+    text: str
+
+
+@functools.lru_cache(maxsize=None)
+def _python_todo_regex(markers: Tuple[str, ...]) -> 're.Pattern[str]':
+    """Return a regex which matches any of the given markers (which are regexes) and the rest of the comment."""
+    return re.compile('(?P<marker>{}).*'.format('|'.join(f'(?:{marker})' for marker in markers)))
+
+
+def _python_readline(file_object: IO) -> Tuple[Callable[[], Union[str, bytes]], bool]:
+    """Return a readline function for the given file object and whether or not the file object is binary."""
+    first_line = file_object.readline()
+    lines = itertools.chain([first_line], iter(file_object.readline, first_line[:0]))
+    return functools.partial(next, lines, first_line[:0]), isinstance(first_line, bytes)
+
+
+def python_comments(file_object: IO) -> Iterator[Tuple[int, str]]:
+    """Yield the line number and text of every comment in the python code read from the file_object....
+
+    The code is read (and tokenized) one line at a time. Binary file objects are decoded using the encoding...
+    declared in the code (see PEP 263) or utf-8.
+    """
+    readline, is_binary = _python_readline(file_object)
+    tokens = tokenize.tokenize(readline) if is_binary else tokenize.generate_tokens(readline)
+    for token in tokens:
+        if token.type == tokenize.COMMENT:
+            yield token.start[0], token.string
+
+
+def python_todos_in_file_object(
+    file_object: IO, *, markers: Iterable[str] = DEFAULT_TODO_MARKERS, file_path: Optional[str] = None
+) -> Iterator[Todo]:
+    """Yield the todos (comments matching any of the markers, which are regexes) in the code read from the file_object.
+
+    Todos in strings are ignored. The file_path is only used to fill in the file_path of each Todo.
+    """
+    todo_regex = _python_todo_regex(tuple(markers))
+    for line_number, comment in python_comments(file_object):
+        match = todo_regex.search(comment)
+        if match:
+            yield Todo(file_path, line_number, match.group('marker'), match.group(0).rstrip())
+
+
+def python_file_todos(file_path: str, *, markers: Iterable[str] = DEFAULT_TODO_MARKERS) -> Iterator[Todo]:
+    """Yield the todos in the python file at the given file_path (the file is read one line at a time)....
+
+    The file is only tokenized if one of its lines matches one of the markers.
+    """
+    markers = tuple(markers)
+    todo_regex = _python_todo_regex(markers)
+    with open(file_path, 'rb') as f:
+        encoding, _ = tokenize.detect_encoding(f.readline)
+        f.seek(0)
+        text_file = io.TextIOWrapper(f, encoding=encoding, newline='')
+        if not any(todo_regex.search(line) for line in text_file):
+            return
+
+        text_file.seek(0)
+        yield from python_todos_in_file_object(text_file, markers=markers, file_path=file_path)
+
+
+def python_files_todos(
+    paths: Union[str, Iterable[str]], *, markers: Iterable[str] = DEFAULT_TODO_MARKERS, exclude_tests: bool = False
+) -> Iterator[Todo]:
+    """Yield the todos in every python file in the given paths (directories are searched recursively)....
+
+    Files are read one at a time (and one line at a time), so memory use does not grow with the size of the...
+    files or of the tree. A file which can not be read, decoded, or tokenized is skipped from the point of the error.
+    """
+    markers = tuple(markers)
+    for file_path in python_file_paths(paths, exclude_tests=exclude_tests):
+        try:
+            yield from python_file_todos(file_path, markers=markers)
+        except (OSError, SyntaxError, UnicodeDecodeError, tokenize.TokenError):
+            continue
+
+
+def _python_code_text_todos(code_text: CodeText, todo_regex: str) -> Iterator[str]:
+    """Yield the matches of the todo_regex in the comments of the code_text."""
+    code_text = _python_code_text(code_text)
+    try:
+        comments = [comment for _, comment in python_comments(io.StringIO(code_text))]
+    except (SyntaxError, tokenize.TokenError):
+        # the code_text is not python code, so all of it is searched
+        comments = [code_text]
+
+    for comment in comments:
+        yield from re.findall(todo_regex, comment)
@@ -21,9 +21,10 @@ setup(
     url='https://github.com/democritus-project/d8s-python',
     use_scm_version=True,
     setup_requires=['setuptools_scm'],
-    packages=find_packages(exclude=('tests')),
+    packages=find_packages(exclude=('tests', 'benchmarks')),
     include_package_data=True,
     install_requires=requirements,
+    python_requires='>=3.8',
     license="GNU Lesser General Public License v3",
     zip_safe=True,
     keywords="democritus,utility,python,python-asts,python-asts-utility,ast,python-ast,abstract-syntax-tree",
@@ -33,10 +34,6 @@ setup(
         'License :: OSI Approved :: GNU Lesser General Public License v3 or later (LGPLv3+)',
         'Natural Language :: English',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
     ],
@@ -0,0 +1,21 @@
+from typing import Callable, Dict
+
+import pytest
+
+
+@pytest.fixture
+def write_files(tmp_path) -> Callable[..., str]:
+    """Return a function which writes files (a dict of paths to contents) into a directory of the tmp_path....
+
+    The function returns the path of the directory (the tmp_path itself unless the name of a directory is given).
+    """
+
+    def write(file_contents: Dict[str, str], directory_name: str = '') -> str:
+        directory_path = tmp_path / directory_name
+        for file_name, contents in file_contents.items():
+            file_path = directory_path / file_name
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(contents)
+        return str(directory_path)
+
+    return write
@@ -1,13 +1,25 @@
 import ast
+import io
 
+import pytest
+
+import d8s_python.ast_data
 from d8s_python import (
+    AstNodeIndex,
+    ExceptionRecord,
+    ParsedSource,
+    ParseError,
     python_ast_exception_handler_exceptions_raised,
     python_ast_function_defs,
+    python_ast_node_index,
     python_ast_object_line_numbers,
     python_ast_objects_not_of_type,
     python_ast_objects_of_type,
     python_ast_parse,
+    python_ast_try_parse,
+    python_ast_traverse,
     python_constants,
+    python_exception_records,
     python_exceptions_handled,
     python_exceptions_raised,
     python_function_argument_annotations,
@@ -17,6 +29,7 @@ from d8s_python import (
     python_function_docstrings,
     python_function_names,
     python_functions_as_import_string,
+    python_parsed_source,
     python_variable_names,
 )
 from d8s_python.ast_data import _python_ast_clean
@@ -266,6 +279,99 @@ def test_python_ast_objects_not_of_type_docs_1():
     assert len(result) == 35
 
 
+def test_python_ast_objects_not_of_type__deeply_nested():
+    # the default recursion limit is reached when traversing this code recursively
+    code_text = ' + '.join(['1'] * 2000)
+    result = python_ast_objects_not_of_type(code_text, ast.FunctionDef)
+    assert len(result) == len(list(ast.walk(python_ast_parse(code_text))))
+
+
+def test_python_ast_traverse_1():
+    parsed_code = python_ast_parse('def f(a):\n    return a + 1\n')
+    result = [type(node).__name__ for node in python_ast_traverse(parsed_code)]
+    assert result == [
+        'Module',
+        'FunctionDef',
+        'arguments',
+        'arg',
+        'Return',
+        'BinOp',
+        'Name',
+        'Load',
+        'Add',
+        'Constant',
+    ]
+
+    result = [type(node).__name__ for node in python_ast_traverse(parsed_code, post_order=True)]
+    assert result == [
+        'arg',
+        'arguments',
+        'Load',
+        'Name',
+        'Add',
+        'Constant',
+        'BinOp',
+        'Return',
+        'FunctionDef',
+        'Module',
+    ]
+
+    result = [type(n).__name__ for n in python_ast_traverse(parsed_code, prune=lambda n: isinstance(n, ast.Return))]
+    assert result == ['Module', 'FunctionDef', 'arguments', 'arg', 'Return']
+
+
+def test_python_ast_traverse__hooks():
+    parsed_code = python_ast_parse('def f():\n    def g():\n        pass\n')
+    events = []
+    for node in python_ast_traverse(
+        parsed_code,
+        on_enter=lambda n: events.append(('enter', type(n).__name__)),
+        on_exit=lambda n: events.append(('exit', type(n).__name__)),
+        prune=lambda n: isinstance(n, ast.arguments),
+    ):
+        events.append(('yield', type(node).__name__))
+
+    assert [event for event in events if event[1] == 'arguments'] == [
+        ('enter', 'arguments'),
+        ('yield', 'arguments'),
+        ('exit', 'arguments'),
+        ('enter', 'arguments'),
+        ('yield', 'arguments'),
+        ('exit', 'arguments'),
+    ]
+    # a function is only exited after the functions nested in it
+    function_events = [event for event in events if event[1] == 'FunctionDef' and event[0] != 'yield']
+    assert [event[0] for event in function_events] == ['enter', 'enter', 'exit', 'exit']
+    assert events[-1] == ('exit', 'Module')
+
+    # nodes are yielded lazily
+    entered = []
+    traversal = python_ast_traverse(parsed_code, on_enter=entered.append)
+    next(traversal)
+    assert entered == [parsed_code]
+
+
+def test_python_ast_traverse__deeply_nested():
+    parsed_code = python_ast_parse(' + '.join(['1'] * 2000))
+    depth = 0
+    max_depth = 0
+
+    def enter(_):
+        nonlocal depth, max_depth
+        depth += 1
+        max_depth = max(max_depth, depth)
+
+    def exit_(_):
+        nonlocal depth
+        depth -= 1
+
+    nodes = list(python_ast_traverse(parsed_code, post_order=True, on_enter=enter, on_exit=exit_))
+    assert len(nodes) == len(list(ast.walk(parsed_code)))
+    assert nodes[-1] is parsed_code
+    assert depth == 0
+    assert max_depth == 2002
+
+
 def test_python_ast_objects_of_type_1():
     result = list(python_ast_objects_of_type(TEST_CODE_1, ast.FunctionDef))
     assert len(result) == 1
@@ -282,6 +388,84 @@ def test_python_ast_objects_of_type__only_first_level():
     assert isinstance(result[0], ast.FunctionDef)
 
 
+TEST_CODE_WITH_EXCEPTION_FLOW = '''import os
+
+
+class Foo:
+    def bar(self):
+        try:
+            os.remove('foo')
+        except (os.errors.FooError, OSError) as e:
+            try:
+                pass
+            except:
+                raise e
+            raise
+
+
+def baz():
+    try:
+        pass
+    except ValueError:
+
+        def qux():
+            raise
+
+        raise RuntimeError('baz') from None
+
+
+raise
+'''
+
+
+def test_python_exception_records_1():
+    result = list(python_exception_records(TEST_CODE_WITH_EXCEPTION_FLOW))
+    assert result == [
+        ExceptionRecord('os.errors.FooError', 'handled', 8, 16, 'Foo.bar'),
+        ExceptionRecord('OSError', 'handled', 8, 36, 'Foo.bar'),
+        ExceptionRecord(None, 'handled', 11, 12, 'Foo.bar'),
+        ExceptionRecord('os.errors.FooError', 'raised', 12, 16, 'Foo.bar', 8),
+        ExceptionRecord('OSError', 'raised', 12, 16, 'Foo.bar', 8),
+        ExceptionRecord('os.errors.FooError', 'raised', 13, 12, 'Foo.bar', 8),
+        ExceptionRecord('OSError', 'raised', 13, 12, 'Foo.bar', 8),
+        ExceptionRecord('ValueError', 'handled', 19, 11, 'baz'),
+        # a bare raise in a function defined in an exception handler does not re-raise the handler's exception
+        ExceptionRecord(None, 'raised', 22, 12, 'baz.<locals>.qux'),
+        ExceptionRecord('RuntimeError', 'raised', 24, 8, 'baz'),
+        ExceptionRecord(None, 'raised', 27, 0, None),
+    ]
+
+    assert list(python_exceptions_handled(TEST_CODE_WITH_EXCEPTION_FLOW)) == [
+        'os.errors.FooError',
+        'OSError',
+        'ValueError',
+    ]
+    assert list(python_exceptions_raised(TEST_CODE_WITH_EXCEPTION_FLOW)) == [
+        'os.errors.FooError',
+        'OSError',
+        'os.errors.FooError',
+        'OSError',
+        None,
+        'RuntimeError',
+        None,
+    ]
+
+    # records are yielded lazily
+    records = python_exception_records(ParsedSource(TEST_CODE_WITH_EXCEPTION_FLOW))
+    assert next(records).name == 'os.errors.FooError'
+
+
+def test_python_exception_records__reraise_in_bare_except():
+    code_text = 'try:\n    pass\nexcept:\n    raise\n'
+    assert list(python_exception_records(code_text)) == [
+        ExceptionRecord(None, 'handled', 3, 0, None),
+        ExceptionRecord(None, 'raised', 4, 4, None, 3),
+    ]
+    # the re-raise has no name, so no exception is listed as raised
+    assert list(python_exceptions_raised(code_text)) == []
+    assert list(python_ast_exception_handler_exceptions_raised(python_ast_parse(code_text).body[0].handlers[0])) == []
+
+
 def test_python_exceptions_handled_docs_1():
     for test in TEST_EXCEPTION_DATA:
         try:
@@ -442,3 +626,209 @@ def test_python_constants_1():
     assert python_constants('x = 7') == []
     assert python_constants('PI = 3.14') == ['PI']
     assert python_constants('1 + 0') == []
+
+
+def test_parsed_source_1():
+    parsed_source = ParsedSource(TEST_CODE_1)
+    assert parsed_source.code_text == TEST_CODE_1
+    assert isinstance(parsed_source.module, ast.Module)
+    assert parsed_source.lines == TEST_CODE_1.splitlines()
+    assert python_parsed_source(parsed_source) is parsed_source
+    assert python_parsed_source(TEST_CODE_1).code_text == TEST_CODE_1
+    assert python_ast_parse(parsed_source) is parsed_source.module
+    assert repr(ParsedSource('x = 1')) == "ParsedSource('x = 1')"
+
+
+def test_parsed_source_lines_text():
+    parsed_source = ParsedSource('a = 1\nb = 2\r\nc = 3\n\nd = 4')
+    assert parsed_source.line_offsets == [0, 6, 13, 19, 20]
+    assert parsed_source.lines_text(1, 1) == 'a = 1'
+    assert parsed_source.lines_text(2, 3) == 'b = 2\nc = 3'
+    assert parsed_source.lines_text(3, 4) == 'c = 3\n'
+    assert parsed_source.lines_text(4, 5) == '\nd = 4'
+
+    parsed_source = ParsedSource('a = "\x0c\u2028"\r\nb = 2\rc = 3')
+    assert parsed_source.lines_text(1, 3) == 'a = "\x0c\u2028"\nb = 2\nc = 3'
+
+
+AST_OBJECT_CODE = '''def f(x):
+    """Docstring."""
+    y = 1
+    Z = 2
+
+    async def g():
+        pass
+'''
+
+
+@pytest.mark.parametrize('nested', [False, True])
+def test_ast_objects_used_in_place_of_code_text(nested):
+    module = ast.parse(AST_OBJECT_CODE)
+    ast_object = module.body[0] if nested else module
+    assert [function_def.name for function_def in python_ast_function_defs(ast_object)] == ['f', 'g']
+    assert python_function_names(ast_object) == ['f', 'g']
+    assert python_function_docstrings(ast_object) == ['Docstring.', None]
+    assert python_variable_names(ast_object) == ['y', 'Z']
+    assert python_constants(ast_object) == ['Z']
+
+
+def test_parsed_source__used_in_place_of_code_text():
+    parsed_source = ParsedSource(TEST_CODE)
+    assert python_function_names(parsed_source) == python_function_names(TEST_CODE)
+    assert python_function_docstrings(parsed_source) == python_function_docstrings(TEST_CODE)
+    assert python_variable_names(parsed_source) == python_variable_names(TEST_CODE)
+    assert python_constants(parsed_source) == python_constants(TEST_CODE)
+    assert [function_def.name for function_def in python_ast_function_defs(parsed_source)] == [
+        function_def.name for function_def in python_ast_function_defs(TEST_CODE)
+    ]
+
+    for test in TEST_EXCEPTION_DATA:
+        parsed_source = ParsedSource(test['code'])
+        assert list(python_exceptions_handled(parsed_source)) == test['handled']
+        assert list(python_exceptions_raised(parsed_source)) == test['raised']
+
+    parsed_source = ParsedSource(TEST_FUNCTION_WITH_DEFAULT)
+    assert tuple(python_function_argument_names(parsed_source)) == ('a',)
+    assert list(python_function_argument_annotations(parsed_source)) == ['str']
+
+
+def test_parsed_source__code_is_parsed_once(monkeypatch):
+    parse_calls = []
+    original_parse = ast.parse
+
+    def counting_parse(*args, **kwargs):
+        parse_calls.append(args)
+        return original_parse(*args, **kwargs)
+
+    monkeypatch.setattr(ast, 'parse', counting_parse)
+    parsed_source = ParsedSource(TEST_CODE)
+    python_function_names(parsed_source)
+    python_function_docstrings(parsed_source)
+    python_exceptions_raised(parsed_source)
+    python_variable_names(parsed_source)
+    assert len(parse_calls) == 1
+
+
+def test_ast_node_index_1():
+    parsed_code = python_ast_parse(TEST_CODE_WITH_NESTED_FUNCTION)
+    index = AstNodeIndex(parsed_code)
+    assert len(index) == len(list(ast.walk(parsed_code)))
+
+    for ast_type in (ast.FunctionDef, ast.Name, ast.expr, ast.stmt, (ast.Return, ast.Constant)):
+        expected = tuple(node for node in ast.walk(parsed_code) if isinstance(node, ast_type))
+        assert index.objects_of_type(ast_type) == expected
+
+    result = index.objects_of_type(ast.FunctionDef, recursive_search=False)
+    assert [f.name for f in result] == ['f']
+    assert index.objects_of_type(ast.Module, recursive_search=False) == (parsed_code,)
+    assert index.objects_of_type(ast.ClassDef) == ()
+
+
+def test_python_ast_node_index_1():
+    parsed_source = ParsedSource(TEST_CODE_WITH_NESTED_FUNCTION)
+    assert python_ast_node_index(parsed_source) is parsed_source.node_index
+    assert len(python_ast_node_index(TEST_CODE_WITH_NESTED_FUNCTION)) == len(parsed_source.node_index)
+
+    function_def = parsed_source.node_index.objects_of_type(ast.FunctionDef)[1]
+    assert python_ast_node_index(function_def).objects_of_type(ast.FunctionDef) == (function_def,)
+
+
+def test_python_ast_objects_of_type__parsed_source():
+    parsed_source = ParsedSource(TEST_CODE_WITH_NESTED_FUNCTION)
+    assert len(tuple(python_ast_objects_of_type(parsed_source, ast.FunctionDef))) == 2
+    result = tuple(python_ast_objects_of_type(parsed_source, ast.FunctionDef, recursive_search=False))
+    assert len(result) == 1
+
+
+LATIN_1_CODE = '# -*- coding: latin-1 -*-\ndef caf\xe9(s=\'\xe9\'):\n    """Caf\xe9."""\n'.encode('latin-1')
+
+
+def test_parsed_source__bytes():
+    parsed_source = ParsedSource(LATIN_1_CODE)
+    assert python_function_names(parsed_source) == ['caf\xe9']
+    # the bytes are parsed without being decoded (they are only decoded when the code_text is needed)
+    assert 'code_text' not in vars(parsed_source)
+    assert parsed_source.lines_text(2, 3) == 'def caf\xe9(s=\'\xe9\'):\n    """Caf\xe9."""'
+    assert parsed_source.offset(2, 4) == parsed_source.code_text.index('caf')
+
+    assert python_function_docstrings(bytearray(LATIN_1_CODE)) == ['Caf\xe9.']
+    assert python_function_names(memoryview(LATIN_1_CODE)) == ['caf\xe9']
+
+    # a utf-8 byte order mark is removed
+    parsed_source = ParsedSource(b'\xef\xbb\xbfx = "\xc3\xbc"\r\n')
+    assert parsed_source.code_text == 'x = "\xfc"\r\n'
+    assert python_variable_names(parsed_source) == ['x']
+
+
+def test_parsed_source__paths_and_file_objects(tmp_path):
+    file_path = tmp_path / 'a.py'
+    file_path.write_bytes(LATIN_1_CODE)
+    assert python_function_names(file_path) == ['caf\xe9']
+    assert python_parsed_source(file_path).code_text == LATIN_1_CODE.decode('latin-1')
+    assert len(list(python_ast_objects_of_type(file_path, ast.FunctionDef))) == 1
+    assert len(python_ast_node_index(file_path).objects_of_type(ast.FunctionDef)) == 1
+
+    with open(file_path, 'rb') as f:
+        assert python_function_names(f) == ['caf\xe9']
+    assert python_function_names(io.BytesIO(LATIN_1_CODE)) == ['caf\xe9']
+    assert python_function_names(io.StringIO('def f(): pass')) == ['f']
+    assert list(python_exceptions_raised(io.BytesIO(b'raise ValueError'))) == ['ValueError']
+
+    # a str is always code (rather than a path)
+    with pytest.raises(SyntaxError):
+        python_ast_parse(str(file_path))
+    with pytest.raises(TypeError):
+        ParsedSource(1)
+
+
+def test_parsed_source__large_files_are_memory_mapped(tmp_path, monkeypatch):
+    import mmap
+
+    monkeypatch.setattr(d8s_python.ast_data, '_MMAP_THRESHOLD_BYTES', 100)
+    file_path = tmp_path / 'a.py'
+    file_path.write_bytes(b'\n'.join(b'x%d = %d' % (i, i) for i in range(100)))
+
+    parsed_source = ParsedSource(file_path)
+    assert isinstance(parsed_source.source_bytes, mmap.mmap)
+    assert len(python_variable_names(parsed_source)) == 100
+    assert parsed_source.lines[-1] == 'x99 = 99'
+
+    # small files, and files which are not read from their start, are read
+    monkeypatch.setattr(d8s_python.ast_data, '_MMAP_THRESHOLD_BYTES', 10_000)
+    assert isinstance(ParsedSource(file_path).source_bytes, bytes)
+    monkeypatch.setattr(d8s_python.ast_data, '_MMAP_THRESHOLD_BYTES', 100)
+    with open(file_path, 'rb') as f:
+        f.readline()
+        assert ParsedSource(f).lines[0] == 'x1 = 1'
+
+
+def test_python_ast_parse__strict():
+    code_text = "a = 'foo\nbar'"
+    assert isinstance(python_ast_parse(code_text), ast.Module)
+    with pytest.raises(SyntaxError):
+        python_ast_parse(code_text, strict=True)
+    with pytest.raises(SyntaxError):
+        ParsedSource(code_text, strict=True)
+
+
+def test_python_ast_try_parse_1():
+    assert isinstance(python_ast_try_parse('a = 1'), ast.Module)
+    parsed_source = ParsedSource('a = 1')
+    assert python_ast_try_parse(parsed_source) is parsed_source.module
+
+    result = python_ast_try_parse(b'x = 1\ndef (:')
+    assert result == ParseError('SyntaxError', 'invalid syntax', 2, 4)
+    # the errors of code which can not be parsed are remembered
+    assert python_ast_try_parse(b'x = 1\ndef (:') is result
+    assert python_ast_try_parse(b'x = 1\ndef (:', strict=True) == result
+    assert python_ast_try_parse(b'x = 1\ndef (:', strict=True) is not result
+
+    assert isinstance(python_ast_try_parse("a = 'foo\nbar'"), ast.Module)
+    assert python_ast_try_parse("a = 'foo\nbar'", strict=True).error_type == 'SyntaxError'
+    assert python_ast_try_parse(b'a = 1\0').error_type in ('SyntaxError', 'ValueError')
+
+
+def test_python_ast_parse__bytes_which_need_cleaning():
+    assert isinstance(python_ast_parse("a = '\xfc\nb'".encode('utf-8')), ast.Module)
+    with pytest.raises(SyntaxError):
+        python_ast_parse(b'def (')
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from d8s_python import (
+    FileAnalysis,
+    FunctionRecord,
+    python_file_names_async,
+    python_file_paths_async,
+    python_files_analyze_async,
+    python_files_using_function_async,
+    python_function_records,
+    python_object_source_code_async,
+)
+from d8s_python.async_data import _python_executor_map
+
+FILE_CONTENTS = {
+    'a.py': 'def a():\n    return foo(1)\n',
+    'a_test.py': 'foo()\n',
+    os.path.join('sub', 'b.py'): 'x = foo (1)\n',
+    os.path.join('sub', 'c.py'): 'x = foo(2)\n',
+    os.path.join('sub', 'deeper', 'd.py'): 'def d(:',
+    os.path.join('sub', 'notes.txt'): 'foo()\n',
+}
+
+
+@pytest.fixture
+def repository_path(write_files):
+    return write_files(FILE_CONTENTS)
+
+
+async def _collect(async_iterator):
+    return [item async for item in async_iterator]
+
+
+def test_python_file_names_async_1(repository_path):
+    assert sorted(asyncio.run(python_file_names_async(repository_path))) == ['a.py', 'a_test.py']
+    assert asyncio.run(python_file_names_async(repository_path, exclude_tests=True)) == ['a.py']
+
+
+def test_python_file_paths_async_1(repository_path):
+    result = asyncio.run(_collect(python_file_paths_async(repository_path)))
+    assert sorted(os.path.relpath(path, repository_path) for path in result) == [
+        'a.py',
+        'a_test.py',
+        os.path.join('sub', 'b.py'),
+        os.path.join('sub', 'c.py'),
+        os.path.join('sub', 'deeper', 'd.py'),
+    ]
+
+    file_path = os.path.join(repository_path, 'a.py')
+    sub_path = os.path.join(repository_path, 'sub')
+    result = asyncio.run(_collect(python_file_paths_async([file_path, sub_path], recursive=False, exclude_tests=True)))
+    assert result[0] == file_path
+    assert sorted(result[1:]) == [os.path.join(sub_path, 'b.py'), os.path.join(sub_path, 'c.py')]
+
+    # a directory whose name ends with ".py" is searched (rather than found as a python file)
+    os.makedirs(os.path.join(repository_path, 'package.py'))
+    with open(os.path.join(repository_path, 'package.py', 'e.py'), 'w') as f:
+        f.write('')
+    result = asyncio.run(_collect(python_file_paths_async(repository_path, exclude_tests=True)))
+    assert os.path.join(repository_path, 'package.py') not in result
+    assert os.path.join(repository_path, 'package.py', 'e.py') in result
+
+
+def test_python_files_using_function_async_1(repository_path):
+    result = asyncio.run(_collect(python_files_using_function_async('foo', repository_path)))
+    assert sorted(os.path.basename(path) for path in result) == ['a.py', 'a_test.py']
+
+    async def search():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            search_results = python_files_using_function_async(
+                'foo', repository_path, recursive=True, executor=executor, max_pending=1
+            )
+            return await _collect(search_results)
+
+    assert sorted(os.path.basename(path) for path in asyncio.run(search())) == ['a.py', 'a_test.py', 'c.py']
+
+
+def test_python_files_analyze_async_1(repository_path):
+    async def analyze():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return await _collect(
+                python_files_analyze_async(repository_path, ['python_function_names'], executor=executor)
+            )
+
+    result = sorted(asyncio.run(analyze()))
+    assert [os.path.basename(analysis.file_path) for analysis in result] == [
+        'a.py',
+        'a_test.py',
+        'b.py',
+        'c.py',
+        'd.py',
+    ]
+    assert result[0] == FileAnalysis(result[0].file_path, {'python_function_names': ['a']}, {})
+    assert list(result[-1].errors) == ['python_ast_parse']
+
+
+def test_python_files_analyze_async__process_pool(repository_path):
+    async def analyze():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            return await _collect(
+                python_files_analyze_async(repository_path, [python_function_records], executor=executor, max_pending=2)
+            )
+
+    result = sorted(asyncio.run(analyze()))
+    # the extractors (and their results) are pickled to and from the worker processes
+    assert [os.path.basename(analysis.file_path) for analysis in result] == [
+        'a.py',
+        'a_test.py',
+        'b.py',
+        'c.py',
+        'd.py',
+    ]
+    assert result[0].results == {'python_function_records': [FunctionRecord('a', None, 1, 2, False, 0, False, 0)]}
+    assert list(result[-1].errors) == ['python_ast_parse']
+
+
+def test_python_object_source_code_async_1():
+    result = asyncio.run(python_object_source_code_async(test_python_object_source_code_async_1))
+    assert result.startswith('def test_python_object_source_code_async_1():')
+
+
+def test_python_executor_map__backpressure_and_cancellation():
+    started = []
+    release = threading.Event()
+
+    def work(item):
+        started.append(item)
+        release.wait(5)
+        return item * 2
+
+    items_closed = []
+
+    async def items():
+        try:
+            for item in range(100):
+                yield item
+        finally:
+            items_closed.append(True)
+
+    async def consume():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = _python_executor_map(work, items(), executor=executor, max_pending=3)
+            first_result_task = asyncio.ensure_future(results.__anext__())
+            await asyncio.sleep(0.05)
+            # only max_pending items have been submitted (and only one of them can run at a time)
+            assert started == [0]
+            release.set()
+            first_result = await first_result_task
+            # stopping early cancels the items which have not started and closes the items
+            await results.aclose()
+            assert items_closed == [True]
+            return first_result
+
+    item, result = asyncio.run(consume())
+    assert result == item * 2
+    assert len(started) <= 3
+
+
+def test_python_executor_map__errors():
+    def work(item):
+        if item == 2:
+            raise ValueError(item)
+        return item
+
+    async def items():
+        for item in range(3):
+            yield item
+
+    async def consume():
+        return await _collect(_python_executor_map(work, items(), executor=None, max_pending=1))
+
+    with pytest.raises(ValueError):
+        asyncio.run(consume())
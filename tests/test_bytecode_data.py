@@ -0,0 +1,124 @@
+import dis
+
+import pytest
+
+from d8s_python import (
+    ParsedSource,
+    python_bytecode,
+    python_code_object,
+    python_files_bytecode,
+    python_instruction_counts,
+    python_metrics_disable,
+    python_metrics_enable,
+    python_metrics_reset,
+    python_metrics_snapshot,
+    python_opcode_histogram,
+)
+
+TEST_CODE = '''class A:
+    def f(self, x):
+        def g():
+            return [y for y in x]
+
+        return g
+
+total = sum(i * 2 for i in range(10))
+'''
+
+
+def test_python_code_object_1():
+    code_object = python_code_object(TEST_CODE)
+    assert code_object is python_code_object(TEST_CODE)
+    assert code_object is python_code_object(ParsedSource(TEST_CODE))
+    assert code_object is python_code_object(TEST_CODE.encode('utf-8'))
+    assert code_object.co_filename == '<disassembly>'
+    # like dis, an expression is compiled as an expression
+    assert eval(python_code_object('1 + 2')) == 3
+
+    with pytest.raises(SyntaxError):
+        python_code_object('def (:')
+
+
+def test_python_code_object__declared_encoding():
+    code_text = '# coding: latin-1\nx = "\xe9"\n'
+    # the declared encoding is used to decode bytes (so the utf-8 encoding of the code means something else), but...
+    # it is not used for a str
+    namespace = {}
+    exec(python_code_object(code_text.encode('utf-8')), namespace)
+    assert namespace['x'] == '\xc3\xa9'
+    exec(python_code_object(code_text), namespace)
+    assert namespace['x'] == '\xe9'
+
+
+def test_python_bytecode_1():
+    result = python_bytecode(TEST_CODE)
+    assert result is python_bytecode(TEST_CODE)
+    assert [instructions.qualified_name for instructions in result][:4] == ['<module>', 'A', 'A.f', 'A.f.<locals>.g']
+    assert [instructions.first_line_number for instructions in result][:4] == [1, 1, 2, 3]
+
+    module_instructions = result[0]
+    expected = list(dis.get_instructions(python_code_object(TEST_CODE)))
+    assert [dis.opname[opcode] for opcode in module_instructions.opcodes] == [i.opname for i in expected]
+    assert list(module_instructions.args) == [-1 if i.arg is None else i.arg for i in expected]
+    line_numbers = []
+    for instruction in expected:
+        previous_line_number = line_numbers[-1] if line_numbers else -1
+        line_numbers.append(previous_line_number if instruction.starts_line is None else instruction.starts_line)
+    assert list(module_instructions.line_numbers) == line_numbers
+    assert module_instructions.line_numbers[-3] == 8
+
+
+def test_python_bytecode__metrics():
+    python_metrics_reset()
+    python_metrics_enable()
+    try:
+        python_bytecode('x = 1\ny = 2\n')
+        python_bytecode('x = 1\ny = 2\n')
+        snapshot = python_metrics_snapshot()
+    finally:
+        python_metrics_disable()
+        python_metrics_reset()
+    assert snapshot['caches']['code_objects']['hits'] >= 1
+
+
+def test_python_opcode_histogram_1():
+    result = python_opcode_histogram(python_bytecode('x = 1\ny = x\nz = y'))
+    assert result['STORE_NAME'] == 3
+    assert list(result.values()) == sorted(result.values(), reverse=True)
+    assert python_opcode_histogram([]) == {}
+
+
+def test_python_instruction_counts_1():
+    code_instructions = python_bytecode('f = lambda: 1\ng = lambda: 2\n')
+    result = python_instruction_counts(code_instructions)
+    assert result['<lambda>'] == 2 * len(code_instructions[1].opcodes)
+
+
+def test_python_files_bytecode_1(tmp_path):
+    (tmp_path / 'a.py').write_text(TEST_CODE)
+    (tmp_path / 'b.py').write_bytes('# -*- coding: latin-1 -*-\nx = "\xe9"\n'.encode('latin-1'))
+    (tmp_path / 'broken.py').write_text('def (:')
+    result = dict(python_files_bytecode(str(tmp_path)))
+    assert sorted(result) == [str(tmp_path / 'a.py'), str(tmp_path / 'b.py')]
+    assert result[str(tmp_path / 'a.py')] is python_bytecode(TEST_CODE)
+
+
+def test_python_bytecode__instructions_without_lines(monkeypatch):
+    # in python 3.13+, dis.findlinestarts finds a line number of None for instructions which do not have a line
+    find_line_starts = dis.findlinestarts
+    monkeypatch.setattr(dis, 'findlinestarts', lambda code: [(offset, None) for offset, _ in find_line_starts(code)])
+    result = python_bytecode('x = "instructions without lines"')
+    assert set(result[0].line_numbers) == {-1}
+
+
+def test_python_code_object__cache_size(monkeypatch):
+    import d8s_python.bytecode_data
+
+    monkeypatch.setattr(d8s_python.bytecode_data._CODE_CACHE, 'max_size', 2)
+    a_code_object = python_code_object('a = 1')
+    b_code_object = python_code_object('b = 1')
+    assert python_code_object('a = 1') is a_code_object
+    python_code_object('c = 1')
+    # the least recently used code object is dropped
+    assert python_code_object('a = 1') is a_code_object
+    assert python_code_object('b = 1') is not b_code_object
@@ -0,0 +1,171 @@
+import os
+
+import pytest
+
+from d8s_python import AnalysisCache, python_file_content_hash
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with AnalysisCache(str(tmp_path / 'cache.sqlite')) as cache:
+        yield cache
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    file_path = tmp_path / 'a.py'
+    file_path.write_text('def a():\n    pass\n')
+    return str(file_path)
+
+
+def test_python_file_content_hash_1():
+    assert python_file_content_hash(b'a = 1') == python_file_content_hash(b'a = 1')
+    assert python_file_content_hash(b'a = 1') != python_file_content_hash(b'a = 2')
+
+
+def test_analysis_cache_1(cache, file_path):
+    assert cache.get(file_path, 'names') is None
+    cache.set(file_path, 'names', ['a'])
+    assert cache.get(file_path, 'names') == ['a']
+    assert cache.get(file_path, 'other', 'default') == 'default'
+    # uncounted lookups are not in the stats
+    assert cache.get(file_path, 'names', count=False) == ['a']
+    assert cache.get(file_path, 'other', count=False) is None
+    assert cache.stats() == {
+        'hits': 1,
+        'misses': 2,
+        'hit_rate': 1 / 3,
+        'evictions': 0,
+        'entries': 1,
+        'size_bytes': cache.stats()['size_bytes'],
+    }
+
+    # the result is invalid once the file changes...
+    with open(file_path, 'a') as f:
+        f.write('a()\n')
+    assert cache.get(file_path, 'names') is None
+
+    # but is valid again if the file's content goes back to what it was
+    with open(file_path, 'w') as f:
+        f.write('def a():\n    pass\n')
+    assert cache.get(file_path, 'names') == ['a']
+
+
+def test_analysis_cache__persistence(tmp_path, file_path):
+    cache_path = str(tmp_path / 'cache.sqlite')
+    with AnalysisCache(cache_path) as cache:
+        cache.set(file_path, 'names', ['a'])
+
+    with AnalysisCache(cache_path, trust_mtime=False) as cache:
+        assert cache.get(file_path, 'names') == ['a']
+
+
+def test_analysis_cache__version(tmp_path, file_path, monkeypatch):
+    import d8s_python.cache_data
+
+    cache_path = str(tmp_path / 'cache.sqlite')
+    with AnalysisCache(cache_path) as cache:
+        cache.set(file_path, 'names', ['a'])
+
+    monkeypatch.setattr(d8s_python.cache_data, '__version__', '100.0.0')
+    with AnalysisCache(cache_path) as cache:
+        assert cache.get(file_path, 'names') is None
+        assert cache.stats()['entries'] == 0
+
+
+def test_analysis_cache_get_or_compute(cache, file_path):
+    calls = []
+
+    def compute(path):
+        calls.append(path)
+        return os.path.getsize(path)
+
+    assert cache.get_or_compute(file_path, 'size', compute) == 18
+    assert cache.get_or_compute(file_path, 'size', compute) == 18
+    assert calls == [file_path]
+
+
+def test_analysis_cache_get_or_compute__file_changes(cache, file_path):
+    def compute(path):
+        # the file changes while it is analyzed
+        with open(path, 'a') as f:
+            f.write('a()\n')
+        return 'result of the original content'
+
+    assert cache.get_or_compute(file_path, 'result', compute) == 'result of the original content'
+    # the result is not cached for the changed file...
+    assert cache.get(file_path, 'result') is None
+
+    # but is cached for the content it was computed from
+    with open(file_path, 'w') as f:
+        f.write('def a():\n    pass\n')
+    assert cache.get(file_path, 'result') == 'result of the original content'
+
+
+def test_analysis_cache__content_hash(cache, file_path):
+    content_hash, _ = cache.file_content_hash(file_path)
+    cache.set(file_path, 'names', ['a'], content_hash=content_hash)
+    with open(file_path, 'a') as f:
+        f.write('def b():\n    pass\n')
+    assert cache.get(file_path, 'names') is None
+    assert cache.get(file_path, 'names', content_hash=content_hash) == ['a']
+
+
+def test_analysis_cache_invalidate(cache, file_path, tmp_path):
+    other_file_path = str(tmp_path / 'b.py')
+    with open(other_file_path, 'w') as f:
+        f.write('b = 1\n')
+
+    cache.set(file_path, 'names', ['a'])
+    cache.set(other_file_path, 'names', [])
+    cache.invalidate(file_path)
+    assert cache.get(file_path, 'names') is None
+    assert cache.get(other_file_path, 'names') == []
+
+    cache.invalidate()
+    assert cache.get(other_file_path, 'names') is None
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['size_bytes'] == 0
+
+
+def test_analysis_cache__eviction(tmp_path, file_path):
+    with AnalysisCache(str(tmp_path / 'cache.sqlite'), max_size_bytes=250) as cache:
+        cache.set(file_path, 'first', 'x' * 100)
+        cache.set(file_path, 'second', 'x' * 100)
+        cache.get(file_path, 'first')
+        cache.set(file_path, 'third', 'x' * 100)
+
+        # the least recently used result is evicted
+        assert cache.get(file_path, 'second') is None
+        assert cache.get(file_path, 'first') == 'x' * 100
+        assert cache.get(file_path, 'third') == 'x' * 100
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['size_bytes'] <= 250
+
+        cache.set(file_path, 'third', 'y' * 50)
+        assert cache.stats()['entries'] == 2
+
+
+def test_analysis_cache__access_times(tmp_path, file_path, monkeypatch):
+    import d8s_python.cache_data
+
+    def access_times(cache):
+        return cache._connection.execute('SELECT key, accessed FROM results ORDER BY key').fetchall()
+
+    with AnalysisCache(str(tmp_path / 'cache.sqlite')) as cache:
+        cache.set(file_path, 'names', ['a'])
+        before = access_times(cache)
+        cache.get(file_path, 'names')
+        # without eviction, the times results are used are not written
+        assert access_times(cache) == before
+
+    monkeypatch.setattr(d8s_python.cache_data, '_ACCESS_TIMES_BATCH_SIZE', 2)
+    with AnalysisCache(str(tmp_path / 'cache.sqlite'), max_size_bytes=10000) as cache:
+        cache.set(file_path, 'other', [])
+        before = access_times(cache)
+        cache.get(file_path, 'names')
+        # access times are written in batches
+        assert access_times(cache) == before
+        cache.get(file_path, 'other')
+        after = access_times(cache)
+        assert after[0][1] > before[0][1] and after[1][1] > before[1][1]
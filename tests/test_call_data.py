@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from d8s_python import CallSite, CallSiteIndex, python_call_sites, python_files_using_functions
+
+FILE_CONTENTS = {
+    'a.py': 'import os\nos.path.join("a", "b")\nfoo()\nprint("foo()")  # foo()\n',
+    'b.py': 'class A:\n    def f(self):\n        return self.foo (1), items[0].foo()\n',
+    os.path.join('sub', 'c.py'): 'bar()(foo)\n',
+    os.path.join('sub', 'broken.py'): 'foo(',
+    'notes.txt': 'foo()',
+}
+
+
+@pytest.fixture
+def source_root(write_files):
+    return write_files(FILE_CONTENTS, 'source')
+
+
+@pytest.fixture
+def index(tmp_path):
+    with CallSiteIndex(str(tmp_path / 'index.sqlite')) as index:
+        yield index
+
+
+def test_python_call_sites_1():
+    assert python_call_sites('os.path.join("a")\nf(g(1))\nx[0].h()\n(lambda: 1)()\n') == [
+        CallSite('os.path.join', 1, 0),
+        CallSite('f', 2, 0),
+        CallSite('h', 3, 0),
+        CallSite('g', 2, 2),
+    ]
+
+
+def test_call_site_index_1(source_root, index):
+    assert index.update(source_root, max_workers=1) == 4
+    assert len(index) == 4
+
+    a_path = os.path.join(source_root, 'a.py')
+    b_path = os.path.join(source_root, 'b.py')
+    # calls in strings and comments are not found, but calls of attributes and calls with spaces are
+    assert index.lookup('foo') == [
+        CallSite('foo', 3, 0, a_path),
+        CallSite('self.foo', 3, 15, b_path),
+        CallSite('foo', 3, 29, b_path),
+    ]
+    assert index.lookup('self.foo') == [CallSite('self.foo', 3, 15, b_path)]
+    assert index.lookup('join') == index.lookup('os.path.join') == [CallSite('os.path.join', 2, 0, a_path)]
+    assert index.lookup('path.join') == []
+    assert index.file_paths_calling('foo') == [a_path, b_path]
+    assert index.file_paths_calling('bar') == [os.path.join(source_root, 'sub', 'c.py')]
+
+    # nothing has changed
+    assert index.update(source_root, max_workers=1) == 0
+
+
+def test_call_site_index__incremental(source_root, index, tmp_path):
+    index.update(source_root, max_workers=1)
+    a_path = os.path.join(source_root, 'a.py')
+
+    # a changed file
+    with open(a_path, 'w') as f:
+        f.write('\n\nbaz()\n')
+    os.utime(a_path, ns=(0, 0))
+    index.update_file(a_path)
+    assert index.lookup('foo')[0].file_path == os.path.join(source_root, 'b.py')
+    assert index.lookup('baz') == [CallSite('baz', 3, 0, a_path)]
+
+    # added and removed files (files outside of the updated paths are kept)
+    os.remove(a_path)
+    with open(os.path.join(source_root, 'sub', 'd.py'), 'w') as f:
+        f.write('baz()\n')
+    assert index.update(os.path.join(source_root, 'sub'), max_workers=1) == 1
+    assert index.file_paths_calling('baz') == [a_path, os.path.join(source_root, 'sub', 'd.py')]
+    assert index.update(source_root, max_workers=1) == 0
+    assert index.file_paths_calling('baz') == [os.path.join(source_root, 'sub', 'd.py')]
+    assert len(index) == 4
+
+    # the index is kept on disk
+    index.close()
+    with CallSiteIndex(str(tmp_path / 'index.sqlite')) as reopened_index:
+        assert len(reopened_index) == 4
+        assert reopened_index.update(source_root, max_workers=1) == 0
+
+
+def test_python_files_using_functions__index(source_root, index):
+    results = python_files_using_functions(['foo', 'join', 'missing'], source_root, max_workers=1, index=index)
+    assert results == {
+        'foo': [os.path.join(source_root, 'a.py'), os.path.join(source_root, 'b.py')],
+        'join': [os.path.join(source_root, 'a.py')],
+        'missing': [],
+    }
+    # files in subdirectories are only searched (and indexed) if recursive is True
+    assert len(index) == 2
+    results = python_files_using_functions(['bar'], source_root, recursive=True, max_workers=1, index=index)
+    assert results == {'bar': [os.path.join(source_root, 'sub', 'c.py')]}
@@ -0,0 +1,79 @@
+import sys
+
+import pytest
+
+from d8s_python import FStringExpression, ParsedSource, python_fstring_expressions, python_fstrings
+
+TEST_CODE_WITH_FSTRINGS = '''def greet(name, width):
+    message = 'Hello, {not_a_field}'
+    return f'Hello, {name!r:>{width}} {{braces}} {width=}' + f"{message['key']}{'}'}"
+
+
+print(
+    f"{name}"  # a comment
+    "{not_a_field}" f\'\'\'{
+        len(name)
+    }\'\'\'
+)
+print(f'{f"{nested}"}', rf'\\{raw}', f'\\N{EN DASH}{a != b}', 'ü', f'{ü}')
+'''
+
+
+def test_python_fstring_expressions_1():
+    result = list(python_fstring_expressions(TEST_CODE_WITH_FSTRINGS))
+    assert result == [
+        FStringExpression('name!r:>{width}', 'name', 'r', '>{width}', 3, 21),
+        FStringExpression('width', 'width', None, None, 3, 30),
+        FStringExpression('width=', 'width', None, None, 3, 50),
+        FStringExpression("message['key']", "message['key']", None, None, 3, 64),
+        FStringExpression("'}'", "'}'", None, None, 3, 80),
+        FStringExpression('name', 'name', None, None, 7, 7),
+        FStringExpression('\n        len(name)\n    ', 'len(name)', None, None, 9, 8),
+        FStringExpression('f"{nested}"', 'f"{nested}"', None, None, 12, 9),
+        FStringExpression('nested', 'nested', None, None, 12, 12),
+        FStringExpression('raw', 'raw', None, None, 12, 29),
+        FStringExpression('a != b', 'a != b', None, None, 12, 50),
+        FStringExpression('ü', 'ü', None, None, 12, 69),
+    ]
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason='the positions of f-string expressions are wrong before 3.9')
+def test_python_fstring_expressions__positions_match_the_ast():
+    import ast
+
+    parsed_source = ParsedSource(TEST_CODE_WITH_FSTRINGS)
+    expected = sorted(
+        (node.value.lineno, node.value.col_offset)
+        for node in ast.walk(parsed_source.module)
+        if isinstance(node, ast.FormattedValue)
+    )
+    result = sorted((field.line_number, field.col_offset) for field in python_fstring_expressions(parsed_source))
+    assert result == expected
+
+
+def test_python_fstring_expressions__not_code():
+    result = list(python_fstring_expressions('Hello, {name}.\nYou are {age:d}. {}'))
+    assert result == [
+        FStringExpression('name', 'name', None, None, 1, 8),
+        FStringExpression('age:d', 'age', None, 'd', 2, 9),
+    ]
+
+
+def test_python_fstring_expressions__code_with_escaped_line_breaks():
+    # code which can only be parsed with its line breaks escaped is searched as text
+    assert list(python_fstrings("f'{a}\n{b}'")) == ['a', 'b']
+    assert [field.line_number for field in python_fstring_expressions(ParsedSource("f'{a}\n{b}'"))] == [1, 2]
+
+
+def test_python_fstrings__code():
+    assert list(python_fstrings(TEST_CODE_WITH_FSTRINGS))[:2] == ['name!r:>{width}', 'width']
+    assert list(python_fstrings('d = {"a": 1}\ns = "{a}"')) == []
+    assert list(python_fstrings("f'{a}{b:>3}'", include_braces=True)) == ['{a}', '{b:>3}']
+
+
+def test_python_fstring_expressions__escapes_and_whitespace():
+    result = list(python_fstring_expressions("f'\\t{tab}\\\\{a = !r}'"))
+    assert result == [
+        FStringExpression('tab', 'tab', None, None, 1, 5),
+        FStringExpression('a = !r', 'a', 'r', None, 1, 12),
+    ]
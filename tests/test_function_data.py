@@ -0,0 +1,163 @@
+import math
+
+import pytest
+
+from d8s_python import (
+    FunctionLengths,
+    FunctionLengthSummary,
+    FunctionRecord,
+    FunctionTable,
+    python_function_length_metrics,
+    python_function_length_summary,
+    python_function_lengths,
+    python_function_records,
+    python_function_table,
+)
+
+CODE_TEXT = '''def a(x, y=1, *args, z, **kwargs):
+    """Docstring."""
+    return x
+
+
+async def b():
+    def c():
+        pass
+
+    return c
+
+
+class D:
+    @property
+    def e(self):
+        """."""
+        return [
+            1,
+        ]
+'''
+
+
+@pytest.fixture
+def table():
+    table = FunctionTable()
+    table.add_code(CODE_TEXT, file_path='one.py')
+    table.add_code('def a():\n    pass\n', file_path='two.py')
+    return table
+
+
+def test_python_function_records_1():
+    assert python_function_records(CODE_TEXT) == [
+        FunctionRecord('a', None, 1, 3, False, 5, True, 10),
+        FunctionRecord('b', None, 6, 10, True, 0, False, 0),
+        FunctionRecord('c', None, 7, 8, False, 0, False, 0),
+        FunctionRecord('e', None, 15, 19, False, 1, True, 1),
+    ]
+
+
+def test_function_table_1(table):
+    assert len(table) == 5
+    assert table[0] == FunctionRecord('a', 'one.py', 1, 3, False, 5, True, 10)
+    assert table[4] == FunctionRecord('a', 'two.py', 1, 2, False, 0, False, 0)
+    assert list(table.rows([1])) == [FunctionRecord('b', 'one.py', 6, 10, True, 0, False, 0)]
+    assert len(list(table.rows())) == 5
+    assert list(table.lengths()) == [3, 5, 2, 5, 2]
+    assert list(table.column('argument_counts')) == [5, 0, 0, 1, 0]
+
+    table.extend([FunctionRecord('f', None, 1, 1, False, 0, False, 0)], file_path='three.py')
+    assert table[5].file_path == 'three.py'
+
+
+def test_function_table_select(table):
+    assert table.select() == [0, 1, 2, 3, 4]
+    assert table.select(name='a') == [0, 4]
+    assert table.select(name='a', file_path='two.py') == [4]
+    assert table.select(name='missing') == []
+    assert table.select(is_async=True) == [1]
+    assert table.select(has_docstring=True, is_async=False) == [0, 3]
+    assert table.select(has_docstring=False) == [1, 2, 4]
+    assert table.select(min_length=3) == [0, 1, 3]
+    assert table.select(min_length=3, max_length=4) == [0]
+    assert table.select(min_arguments=1, max_arguments=2) == [3]
+
+
+def test_function_table_aggregates(table):
+    assert table.longest(2) == [1, 3]
+    assert table.longest(1, table.select(file_path='two.py')) == [4]
+    assert table.length_percentiles() == {50: 3, 90: 5, 99: 5}
+    assert table.length_percentiles([0, 25, 100], [0, 3]) == {0: 3, 25: 3.5, 100: 5}
+    assert math.isnan(FunctionTable().length_percentiles([50])[50])
+    assert table.counts_by_file() == {'one.py': 4, 'two.py': 1}
+    assert table.counts_by_file(table.select(name='a')) == {'one.py': 1, 'two.py': 1}
+
+
+def test_function_table_save_and_load(table, tmp_path):
+    table.add_code('def caf\xe9():\n    pass\n')
+    file_path = str(tmp_path / 'functions.table')
+    table.save(file_path)
+
+    loaded_table = FunctionTable.load(file_path)
+    assert list(loaded_table.rows()) == list(table.rows())
+    assert loaded_table[5] == FunctionRecord('caf\xe9', None, 1, 2, False, 0, False, 0)
+    assert isinstance(loaded_table.column('start_lines'), memoryview)
+    assert loaded_table.select(name='a', file_path='two.py') == [4]
+    assert loaded_table.longest(1) == [1]
+    with pytest.raises(TypeError):
+        loaded_table.add_code('def f():\n    pass\n')
+
+    FunctionTable().save(file_path)
+    assert len(FunctionTable.load(file_path)) == 0
+
+    (tmp_path / 'other').write_bytes(b'not a table' * 10)
+    with pytest.raises(ValueError):
+        FunctionTable.load(str(tmp_path / 'other'))
+
+
+def test_python_function_table_1(tmp_path):
+    (tmp_path / 'a.py').write_text(CODE_TEXT)
+    (tmp_path / 'broken.py').write_text('def (:')
+    table = python_function_table(str(tmp_path), max_workers=1)
+    assert len(table) == 4
+    assert set(table.counts_by_file()) == {str(tmp_path / 'a.py')}
+
+
+LENGTHS_CODE = '''@decorator
+def a(x):
+    """Doc."""
+    # a comment
+
+    y = (1 +
+         2); z = 3
+    if y: return z
+
+
+async def b():
+    def c(): return """
+    """
+'''
+
+
+def test_python_function_length_metrics_1():
+    expected_lengths = [
+        FunctionLengths('a', 1, 8, 8, 7, 5),
+        FunctionLengths('c', 12, 13, 2, 2, 1),
+        FunctionLengths('b', 11, 13, 3, 3, 2),
+    ]
+    assert python_function_length_metrics(LENGTHS_CODE) == expected_lengths
+    assert python_function_length_metrics(LENGTHS_CODE.replace('\n', '\r\n')) == expected_lengths
+    assert python_function_lengths(LENGTHS_CODE) == [7, 2, 3]
+    assert python_function_length_metrics('x = 1') == []
+
+
+def test_python_function_length_summary_1(tmp_path):
+    (tmp_path / 'a.py').write_text(LENGTHS_CODE)
+    (tmp_path / 'b.py').write_text('def d():\n    pass')
+    (tmp_path / 'broken.py').write_text('def (:')
+    summaries = python_function_length_summary(str(tmp_path), percentiles=[0, 50, 100], max_workers=1)
+    assert summaries == {
+        'physical_lines': FunctionLengthSummary(4, 15, 3.75, 8, {0: 2, 50: 2.5, 100: 8}),
+        'non_blank_lines': FunctionLengthSummary(4, 14, 3.5, 7, {0: 2, 50: 2.5, 100: 7}),
+        'logical_lines': FunctionLengthSummary(4, 10, 2.5, 5, {0: 1, 50: 2, 100: 5}),
+    }
+
+    summary = python_function_length_summary(str(tmp_path / 'broken.py'), max_workers=1)['logical_lines']
+    assert summary[:2] == (0, 0) and summary.maximum == 0
+    assert math.isnan(summary.mean) and math.isnan(summary.percentiles[50])
@@ -0,0 +1,137 @@
+import os
+
+import pytest
+
+from d8s_python import ImportGraph, ImportStatement, python_import_graph, python_import_statements
+
+FILE_CONTENTS = {
+    os.path.join('app', '__init__.py'): 'from . import models\nfrom .views import *\n',
+    os.path.join('app', 'models.py'): 'import os\nimport app.db.engine\n',
+    os.path.join('app', 'views.py'): 'from .models import User\nfrom ..outside import x\n',
+    os.path.join('app', 'db', '__init__.py'): 'from .. import views\n',
+    os.path.join('app', 'db', 'engine.py'): 'from . import missing, session\n',
+    os.path.join('app', 'db', 'session.py'): 'import requests\n',
+    os.path.join('app', 'broken.py'): 'def (:',
+    'main.py': 'from app import db, views\nfrom .relative import y\n',
+    'test_main.py': 'import main\n',
+}
+
+
+@pytest.fixture
+def source_root(write_files):
+    return write_files(FILE_CONTENTS)
+
+
+def test_python_import_statements_1():
+    result = python_import_statements('import a.b as c, d\nfrom ..e import f, g\nfrom . import *\n')
+    assert result == [
+        ImportStatement('a.b', (), 0, 1),
+        ImportStatement('d', (), 0, 1),
+        ImportStatement('e', ('f', 'g'), 2, 2),
+        ImportStatement(None, ('*',), 1, 3),
+    ]
+
+
+def test_python_import_graph_1(source_root):
+    graph = python_import_graph(source_root, max_workers=1)
+    assert sorted(graph.modules) == [
+        'app',
+        'app.broken',
+        'app.db',
+        'app.db.engine',
+        'app.db.session',
+        'app.models',
+        'app.views',
+        'main',
+        'test_main',
+    ]
+    assert sorted(graph.dependencies('app')) == ['app.models', 'app.views']
+    assert sorted(graph.dependencies('app.models')) == ['app', 'app.db', 'app.db.engine']
+    # "from ..outside import x" goes above the top-level package
+    assert sorted(graph.dependencies('app.views')) == ['app', 'app.models']
+    assert sorted(graph.dependencies('app.db.engine')) == ['app', 'app.db', 'app.db.session']
+    assert graph.dependencies('app.db.session') == []
+    assert sorted(graph.dependencies('main')) == ['app', 'app.db', 'app.views']
+    assert graph.dependencies('app.broken') == []
+    assert graph.module_file_path('main') == os.path.join(source_root, 'main.py')
+    assert graph.module_name(graph.module_id('main')) == 'main'
+
+    assert sorted(graph.dependents('app.models')) == ['app', 'app.views']
+    assert sorted(graph.dependents('app.db.session', transitive=True)) == [
+        'app',
+        'app.db',
+        'app.db.engine',
+        'app.models',
+        'app.views',
+        'main',
+        'test_main',
+    ]
+    assert sorted(graph.dependencies('app.views', transitive=True)) == [
+        'app',
+        'app.db',
+        'app.db.engine',
+        'app.db.session',
+        'app.models',
+    ]
+    assert graph.dependencies('app.views', transitive=True)[:2] == ['app', 'app.models']
+
+    assert 'test_main' not in python_import_graph(source_root, exclude_tests=True, max_workers=1)
+    with pytest.raises(KeyError):
+        graph.dependencies('requests')
+
+
+def test_python_import_graph__parent_packages(write_files):
+    # importing a module (or names from it) runs the __init__.py of every package the module is in
+    source_root = write_files(
+        {
+            os.path.join('a', '__init__.py'): '',
+            os.path.join('a', 'b', '__init__.py'): '',
+            os.path.join('a', 'b', 'c.py'): '',
+            'x.py': 'import a.b.c\n',
+            'y.py': 'from a import b\n',
+        }
+    )
+    graph = python_import_graph(source_root, max_workers=1)
+    assert sorted(graph.dependencies('x')) == ['a', 'a.b', 'a.b.c']
+    assert sorted(graph.dependencies('y')) == ['a', 'a.b']
+    assert sorted(graph.dependents('a', transitive=True)) == ['x', 'y']
+
+
+def test_import_graph__cycles(source_root):
+    graph = python_import_graph([source_root], max_workers=1)
+    # app.views -> app.models -> app.db.engine -> app.db -> app.views (and each of them imports app)
+    assert graph.cycles() == [['app', 'app.db', 'app.db.engine', 'app.models', 'app.views']]
+
+    assert ImportGraph().cycles() == []
+
+
+def test_import_graph__update_file(source_root):
+    graph = python_import_graph(source_root, max_workers=1)
+
+    # a changed file
+    file_path = os.path.join(source_root, 'app', 'db', '__init__.py')
+    with open(file_path, 'w') as f:
+        f.write('')
+    graph.update_file(file_path)
+    assert graph.dependencies('app.db') == []
+    assert sorted(graph.dependents('app.views')) == ['app', 'main']
+    # app -> app.models -> app.db.engine -> app (app.db.engine imports app.db, which is in the package app)
+    assert graph.cycles() == [['app', 'app.db.engine', 'app.models', 'app.views']]
+
+    # an added module (the imports of other modules are resolved again)
+    file_path = os.path.join(source_root, 'app', 'db', 'missing.py')
+    with open(file_path, 'w') as f:
+        f.write('from app import models\n')
+    graph.update_file(file_path)
+    assert sorted(graph.dependencies('app.db.engine')) == ['app', 'app.db', 'app.db.missing', 'app.db.session']
+    assert graph.cycles() == [['app', 'app.db.engine', 'app.db.missing', 'app.models', 'app.views']]
+
+    # a removed module
+    os.remove(os.path.join(source_root, 'app', 'db', 'session.py'))
+    graph.update_file(os.path.join(source_root, 'app', 'db', 'session.py'))
+    assert 'app.db.session' not in graph
+    assert sorted(graph.dependencies('app.db.engine')) == ['app', 'app.db', 'app.db.missing']
+    assert len(graph) == 9
+
+    with pytest.raises(ValueError):
+        graph.update_file(os.path.join(os.path.dirname(source_root), 'elsewhere.py'))
@@ -0,0 +1,66 @@
+import importlib
+import pkgutil
+import subprocess
+import sys
+
+import pytest
+
+import d8s_python
+
+# the most time (in microseconds) importing d8s_python may take (as measured by "python -X importtime")
+IMPORT_TIME_BUDGET_MICROSECONDS = 10_000
+THIRD_PARTY_MODULES = ('more_itertools', 'd8s_algorithms', 'd8s_file_system', 'd8s_lists', 'd8s_strings', 'jinja2')
+
+
+def _run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True)
+
+
+def test_import_time_budget():
+    # the fastest of a few runs is used so that a single slow run does not fail the test
+    import_times = []
+    for _ in range(3):
+        import_time_lines = _run_python('import d8s_python').stderr.splitlines()
+        package_line = [line for line in import_time_lines if line.endswith('| d8s_python')][0]
+        import_times.append(int(package_line.split('|')[1]))
+    assert min(import_times) < IMPORT_TIME_BUDGET_MICROSECONDS
+
+
+def test_lazy_imports():
+    modules_checked = ', '.join(repr(module) for module in THIRD_PARTY_MODULES)
+    result = _run_python(f'''import sys
+import d8s_python
+assert not any(module.startswith('d8s_python.') for module in sys.modules)
+d8s_python.python_version()
+d8s_python.python_make_pythonic
+print([module for module in ({modules_checked}) if module in sys.modules])''')
+    assert result.stdout.strip() == '[]'
+
+
+def test_star_import():
+    namespace = {}
+    exec('from d8s_python import *', namespace)  # pylint: disable=W0122
+    assert set(d8s_python.__all__) <= set(namespace)
+    assert namespace['python_function_names']('def a(): pass') == ['a']
+
+
+@pytest.mark.parametrize('module_name', d8s_python._MODULE_EXPORTS)
+def test_module_exports(module_name):
+    module = importlib.import_module(f'd8s_python.{module_name}')
+    assert sorted(module.__all__) == sorted(d8s_python._MODULE_EXPORTS[module_name])
+    for name in module.__all__:
+        assert getattr(d8s_python, name) is getattr(module, name)
+
+
+def test_module_exports__every_module():
+    # every module of the package is in _MODULE_EXPORTS (and no name is exported by more than one module)
+    module_names = {module_info.name for module_info in pkgutil.iter_modules(d8s_python.__path__)}
+    assert set(d8s_python._MODULE_EXPORTS) == module_names
+    assert len(d8s_python._EXPORT_MODULES) == sum(len(names) for names in d8s_python._MODULE_EXPORTS.values())
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        d8s_python.foo  # pylint: disable=W0104
+
+    assert 'python_function_names' in dir(d8s_python)
@@ -0,0 +1,133 @@
+import pytest
+
+from d8s_python import (
+    AnalysisCache,
+    ParsedSource,
+    python_ast_parse,
+    python_exceptions_raised,
+    python_file_analyze,
+    python_function_names,
+    python_metrics_disable,
+    python_metrics_enable,
+    python_metrics_enabled,
+    python_metrics_prometheus,
+    python_metrics_recording,
+    python_metrics_reset,
+    python_metrics_snapshot,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    python_metrics_disable()
+    python_metrics_reset()
+    yield
+    python_metrics_disable()
+    python_metrics_reset()
+
+
+def test_python_metrics_disabled():
+    assert not python_metrics_enabled()
+    python_ast_parse('a = 1')
+    result = python_metrics_snapshot()
+    assert result == {
+        'enabled': False,
+        'functions': {},
+        'parsed_bytes': 0,
+        'parse_retries': 0,
+        'parse_failures': 0,
+        'caches': {},
+    }
+
+
+def test_python_metrics_snapshot_1():
+    python_metrics_enable()
+    assert python_metrics_enabled()
+
+    python_ast_parse('a = 1')
+    # the newline in the string is escaped when the parse is retried
+    python_ast_parse("a = 'ü\nb'")
+    with pytest.raises(SyntaxError):
+        python_ast_parse('def (')
+    code_text = 'try:\n    pass\nexcept ValueError:\n    raise\n'
+    parsed_source = ParsedSource(code_text)
+    assert list(python_exceptions_raised(parsed_source)) == ['ValueError']
+    python_function_names(parsed_source)
+    python_function_names(parsed_source)
+
+    result = python_metrics_snapshot()
+    assert result['enabled']
+    assert result['parsed_bytes'] == len('a = 1') + len("a = 'ü\nb'".encode()) + len('def (') + len(code_text)
+    assert result['parse_retries'] == 2
+    assert result['parse_failures'] == 1
+
+    parse_metrics = result['functions']['python_ast_parse']
+    # the parsed_source is passed through python_ast_parse by python_exceptions_raised
+    assert parse_metrics['calls'] == 5
+    assert parse_metrics['errors'] == 1
+    assert 0 < parse_metrics['p50_seconds'] <= parse_metrics['p99_seconds'] <= parse_metrics['max_seconds']
+    assert parse_metrics['total_seconds'] >= parse_metrics['max_seconds']
+    assert result['functions']['python_exception_records']['calls'] == 1
+    assert result['functions']['AstNodeIndex']['calls'] == 1
+    # python_function_names looks up the FunctionDefs and AsyncFunctionDefs in the index
+    assert result['caches']['ast_node_index'] == {'hits': 2, 'misses': 2, 'hit_rate': 0.5}
+
+    python_metrics_disable()
+    python_ast_parse('a = 1')
+    assert python_metrics_snapshot()['functions']['python_ast_parse']['calls'] == 5
+
+
+def test_python_metrics_recording_1(tmp_path):
+    file_path = str(tmp_path / 'a.py')
+    with open(file_path, 'w') as f:
+        f.write('def a():\n    pass\n')
+
+    python_ast_parse('a = 1')
+    with python_metrics_recording(), AnalysisCache(str(tmp_path / 'cache.sqlite')) as cache:
+        assert python_metrics_enabled()
+        python_file_analyze(file_path, ['python_function_names'], cache=cache)
+        python_file_analyze(file_path, ['python_function_names'], cache=cache)
+    assert not python_metrics_enabled()
+
+    result = python_metrics_snapshot()
+    assert result['functions']['_python_file_analyze']['calls'] == 1
+    assert result['functions']['extractor:python_function_names']['calls'] == 1
+    assert result['caches']['analysis_cache'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+    # the metrics recorded before the block are discarded
+    assert result['functions']['python_ast_parse']['calls'] == 1
+
+
+def test_python_metrics_prometheus_1():
+    with python_metrics_recording():
+        python_ast_parse('a = 1')
+        python_function_names(ParsedSource('def f(): pass'))
+        python_function_names(ParsedSource('def f(): pass'))
+
+    result = python_metrics_prometheus()
+    lines = result.splitlines()
+    assert '# TYPE d8s_python_function_seconds summary' in lines
+    assert 'd8s_python_function_seconds_count{function="python_ast_parse"} 3' in lines
+    assert any(
+        line.startswith('d8s_python_function_seconds{function="python_ast_parse",quantile="0.99"} ') for line in lines
+    )
+    assert 'd8s_python_function_errors_total{function="python_ast_parse"} 0' in lines
+    assert 'd8s_python_parsed_bytes_total 31' in lines
+    assert 'd8s_python_parse_retries_total 0' in lines
+    assert 'd8s_python_cache_misses_total{cache="ast_node_index"} 4' in lines
+    assert result.endswith('\n')
+
+    snapshot = python_metrics_snapshot()
+    snapshot['functions'] = {'a "b"\n': snapshot['functions']['python_ast_parse']}
+    result = python_metrics_prometheus(snapshot, prefix='workers')
+    assert 'workers_function_seconds_count{function="a \\"b\\"\\n"} 3' in result.splitlines()
+
+
+def test_python_metrics__latency_sample_is_bounded():
+    with python_metrics_recording():
+        for _ in range(3000):
+            python_ast_parse('a')
+
+    from d8s_python.metrics_data import _LATENCY_SAMPLE_SIZE, _METRICS
+
+    assert len(_METRICS.functions['python_ast_parse'].latencies) == _LATENCY_SAMPLE_SIZE
+    assert python_metrics_snapshot()['functions']['python_ast_parse']['calls'] == 3000
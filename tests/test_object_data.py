@@ -0,0 +1,86 @@
+import time
+
+from d8s_python import ObjectProperty, python_object_properties
+
+
+class Child:
+    __slots__ = ('name', 'parent')
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+
+
+class Example:
+    label = 'example'
+
+    def __init__(self):
+        self.child = Child('child', parent=self)
+
+    @property
+    def slow(self):
+        time.sleep(5)
+        return 'slow'
+
+    @property
+    def broken(self):
+        raise ValueError('broken')
+
+    def greet(self):
+        return 'hello'
+
+    def add(self, a, b):
+        return a + b
+
+
+def _properties_by_name(object_properties):
+    return {object_property.name: object_property for object_property in object_properties}
+
+
+def test_python_object_properties_1():
+    example = Example()
+    result = _properties_by_name(python_object_properties(example, internal_properties=False, timeout=0.2))
+    assert list(result) == ['add', 'broken', 'child', 'greet', 'label', 'slow']
+    assert result['label'] == ObjectProperty('label', 'attribute', 'example', 0)
+    assert result['greet'] == ObjectProperty('greet', 'method', example.greet, 0)
+    assert result['broken'].kind == 'error'
+    assert isinstance(result['broken'].value, ValueError)
+    assert result['slow'] == ObjectProperty('slow', 'timeout', None, 0)
+
+    result = _properties_by_name(python_object_properties('foo', run_methods=True))
+    assert result['upper'] == ObjectProperty('upper', 'method_result', 'FOO', 0)
+    assert result['split'] == ObjectProperty('split', 'method_result', ['foo'], 0)
+    assert result['count'].kind == 'method'
+    assert '__class__' in result
+
+
+def test_python_object_properties__static():
+    example = Example()
+    start = time.perf_counter()
+    result = _properties_by_name(python_object_properties(example, internal_properties=False, static=True))
+    # properties are not run
+    assert time.perf_counter() - start < 1
+    assert result['slow'].kind == 'attribute'
+    assert isinstance(result['slow'].value, property)
+    assert result['broken'].kind == 'attribute'
+    assert result['greet'] == ObjectProperty('greet', 'method', Example.greet, 0)
+
+
+def test_python_object_properties__max_depth():
+    example = Example()
+    object_properties = python_object_properties(example, internal_properties=False, timeout=0.1, max_depth=3)
+    result = _properties_by_name(object_properties)
+    assert result['child.name'] == ObjectProperty('child.name', 'attribute', 'child', 1)
+    # the child's parent is the example (which is already being enumerated)
+    assert result['child.parent'].value is example
+    assert not any(name.startswith('child.parent.') for name in result)
+
+    result = _properties_by_name(python_object_properties(example, internal_properties=False, static=True))
+    assert 'child.name' not in result
+
+
+def test_python_object_properties__lazy():
+    example = Example()
+    object_properties = python_object_properties(example, internal_properties=False)
+    # the slow property is not evaluated until it is reached
+    assert next(object_properties).name == 'add'
@@ -1,3 +1,4 @@
+import ast
 import inspect
 import os
 
@@ -5,12 +6,14 @@ import pytest
 from d8s_file_system import directory_create, directory_delete, file_read, file_write
 
 from d8s_python import (
+    ParsedSource,
     python_clean,
     python_code_details,
     python_copy_deep,
     python_disassemble,
     python_file_names,
     python_files_using_function,
+    python_files_using_functions,
     python_fstrings,
     python_function_blocks,
     python_function_lengths,
@@ -130,6 +133,14 @@ Filename:          <disassembly>
     )
 
 
+def test_python_code_details__objects():
+    # functions, methods, classes, and code objects are given to dis as they are (rather than being read as code)
+    assert python_code_details(python_line_count).startswith('Name:              python_line_count\n')
+    assert python_code_details(python_line_count.__code__) == python_code_details(python_line_count)
+    assert 'LOAD_FAST' in python_disassemble(python_line_count)
+    assert python_disassemble(python_line_count.__code__) == python_disassemble(python_line_count)
+
+
 def test_python_disassemble_docs_1():
     result = python_disassemble(SIMPLE_FUNCTION)
     print(f'result {result} ')
@@ -151,6 +162,49 @@ def test_python_copy_deep_docs_1():
     assert result == [2, 3, 5, 7, 11]
 
 
+def test_python_copy_deep__tree():
+    import ast
+    import datetime
+
+    parsed_code = ast.parse(TEST_CODE_WITH_NESTED_FUNCTION)
+    result = python_copy_deep(parsed_code, tree=True)
+    assert ast.dump(result, include_attributes=True) == ast.dump(parsed_code, include_attributes=True)
+    assert result.body is not parsed_code.body and result.body[0] is not parsed_code.body[0]
+    compile(result, '<copy>', 'exec')
+
+    result.body[0].name = 'g'
+    assert parsed_code.body[0].name == 'f'
+
+    # a tree with attributes which are not fields (like a parent) is copied with copy.deepcopy
+    parsed_code.body[0].parent = parsed_code
+    result = python_copy_deep(parsed_code, tree=True)
+    assert result.body[0].parent is result
+
+    data = {'a': [1, (2, [3])], 'b': 'c', 'd': datetime.date(2020, 1, 1), 'e': None}
+    result = python_copy_deep(data, tree=True)
+    assert result == data
+    assert result['a'][1][1] is not data['a'][1][1]
+
+
+def test_python_copy_deep__deep_tree():
+    import ast
+    import sys
+
+    depth = sys.getrecursionlimit() * 2
+    node = ast.Name('x', ast.Load())
+    for _ in range(depth):
+        node = ast.UnaryOp(ast.USub(), node)
+    data = (node, [node.operand])
+
+    result = python_copy_deep(data, tree=True)
+    assert type(result) is tuple and result[1][0] is not node.operand
+    copied_node = result[0]
+    for _ in range(depth):
+        assert copied_node is not node and type(copied_node.op) is ast.USub
+        copied_node, node = copied_node.operand, node.operand
+    assert copied_node.id == 'x' and copied_node is not node
+
+
 def test_python_object_properties_enumerate_docs_1(capsys):
     s = 'foo'
     python_object_properties_enumerate(s)
@@ -272,6 +326,47 @@ def test_python_functions_signatures__ignore_nested_functions():
     assert python_functions_signatures(TEST_CODE_WITH_NESTED_FUNCTION, ignore_nested_functions=True) == ['(n)']
 
 
+def test_python_functions_signatures__space_before_arguments():
+    s = 'def scaleb (self, a, b):\n    pass\n\ndef f\\\n(x): pass\n'
+    assert python_functions_signatures(s) == ['(self, a, b)', '(x)']
+    assert python_functions_signatures(s, keep_function_name=True) == ['scaleb (self, a, b)', 'f\\\n(x)']
+
+
+def test_python_functions_signatures__methods_with_the_same_name():
+    s = '''class A:
+    def run(self, a: int) -> int:
+        return a
+
+
+class B:
+    async def run(self, b=(1, 2), *, c: 'Dict[str, int]' = {}):  # a comment
+        return b'''
+    assert python_functions_signatures(s) == ['(self, a: int) -> int', "(self, b=(1, 2), *, c: 'Dict[str, int]' = {})"]
+    assert python_functions_signatures(s, keep_function_name=True) == [
+        'run(self, a: int) -> int',
+        "run(self, b=(1, 2), *, c: 'Dict[str, int]' = {})",
+    ]
+
+
+def test_python_functions_signatures__edge_cases():
+    s = '''def a(): pass
+def b(x, /, y, *args, **kwargs) -> (int): pass
+def c(
+    x,  # the first argument
+    y=\'ü\',
+): pass
+def d(ä=\'ö\') -> \'ß\': pass
+def _e(x=lambda y: y): pass'''
+    assert python_functions_signatures(s) == [
+        '()',
+        '(x, /, y, *args, **kwargs) -> (int)',
+        "(\n    x,  # the first argument\n    y='ü',\n)",
+        "(ä='ö') -> 'ß'",
+        '(x=lambda y: y)',
+    ]
+    assert python_functions_signatures(s, ignore_private_functions=True) == python_functions_signatures(s)[:-1]
+
+
 def test_python_traceback_prettify_docs_1():
     traceback = '''File "/app/.heroku/python/lib/python3.6/site-packages/django/core/handlers/exception.py", line 41, in inner response = get_response(request) File "/app/.heroku/python/lib/python3.6/site-packages/django/core/handlers/base.py", line 187, in _get_response response = self.process_exception_by_middleware(e, request) File "/app/.heroku/python/lib/python3.6/site-packages/django/core/handlers/base.py", line 185, in _get_response response = wrapped_callback(request, *callback_args, **callback_kwargs)'''
     pretty_traceback = python_traceback_prettify(traceback)
@@ -364,6 +459,71 @@ def test_python_files_using_function_docs_1():
     assert results == [LOCAL_DOCKER_PATH] or [GITHUB_ACTIONS_PATH]
 
 
+def test_python_files_using_functions_1():
+    file_write(os.path.join(TEST_DIRECTORY_PATH, 'b.py'), 'x = a()\ny = foo.bar(a)\nprint (x)')
+    file_write(os.path.join(TEST_DIRECTORY_PATH, 'c.txt'), 'a()')
+    results = python_files_using_functions(['a', 'bar', 'print', 'baz'], TEST_DIRECTORY_PATH)
+    assert sorted(results['a']) == [
+        EXISTING_FILE_PATH_1,
+        EXISTING_FILE_PATH_2,
+        os.path.join(TEST_DIRECTORY_PATH, 'b.py'),
+    ]
+    assert results['bar'] == [os.path.join(TEST_DIRECTORY_PATH, 'b.py')]
+    assert results['print'] == []
+    assert results['baz'] == []
+    assert python_files_using_functions(['foo.bar'], TEST_DIRECTORY_PATH, max_workers=1) == {
+        'foo.bar': [os.path.join(TEST_DIRECTORY_PATH, 'b.py')]
+    }
+
+
+@pytest.mark.parametrize('find_max', [0, 100])
+def test_python_files_using_functions__overlapping_names(monkeypatch, find_max):
+    import d8s_python.python_data
+
+    # the names are found one by one or with a single regex
+    monkeypatch.setattr(d8s_python.python_data, '_CALL_PATTERNS_FIND_MAX', find_max)
+    file_path = os.path.join(TEST_DIRECTORY_PATH, 'b.py')
+    file_write(file_path, 'y = foo.bar(a)\nbaz (1)')
+    results = python_files_using_functions(['foo.bar', 'bar', 'r', 'o.bar', 'ba', 'baz', 'oo.bar'], TEST_DIRECTORY_PATH)
+    assert {name: file_path in file_paths for name, file_paths in results.items()} == {
+        'foo.bar': True,
+        'bar': True,
+        'r': True,
+        'o.bar': True,
+        'ba': False,
+        'baz': False,
+        'oo.bar': True,
+    }
+
+
+def test_python_files_using_functions__recursive_and_memory_mapped(monkeypatch):
+    import d8s_python.python_data
+
+    directory_create(os.path.join(TEST_DIRECTORY_PATH, 'sub'))
+    file_write(os.path.join(TEST_DIRECTORY_PATH, 'sub', 'd.py'), 'x = 1\n' * 1000 + 'run()')
+    file_write(os.path.join(TEST_DIRECTORY_PATH, 'sub', 'e.py'), '')
+    monkeypatch.setattr(d8s_python.python_data, '_MMAP_THRESHOLD_BYTES', 100)
+
+    assert python_files_using_functions(['run'], TEST_DIRECTORY_PATH) == {'run': []}
+    assert python_files_using_functions(['run'], TEST_DIRECTORY_PATH, recursive=True) == {
+        'run': [os.path.join(TEST_DIRECTORY_PATH, 'sub', 'd.py')]
+    }
+
+
+def test_python_files_using_functions__cache(tmp_path):
+    from d8s_python import AnalysisCache
+
+    with AnalysisCache(str(tmp_path / 'cache.sqlite')) as cache:
+        results = python_files_using_functions(['a', 'b'], TEST_DIRECTORY_PATH, cache=cache)
+        assert python_files_using_functions(['a', 'b'], TEST_DIRECTORY_PATH, cache=cache) == results
+        assert cache.stats()['hits'] == 2
+
+        file_write(EXISTING_FILE_PATH_2, 'b()')
+        results = python_files_using_functions(['b', 'a'], TEST_DIRECTORY_PATH, cache=cache)
+        assert results == {'a': [EXISTING_FILE_PATH_1], 'b': [EXISTING_FILE_PATH_2]}
+        assert cache.stats()['hits'] == 3
+
+
 def test_python_is_version_2_docs_1():
     assert not python_is_version_2()
 
@@ -478,6 +638,24 @@ def test_python_function_blocks_edge_cases_1():
     assert python_function_blocks(s) == ['def a():\n    return "foo" +    "bar"']
 
 
+def test_python_function_blocks__multiline_ends():
+    s = '''def a():
+    return """foo
+bar"""
+
+
+def b(): return [
+    1,
+]
+x = 1'''
+    assert python_function_blocks(s) == ['def a():\n    return """foo\nbar"""', 'def b(): return [\n    1,\n]']
+
+
+def test_python_function_blocks__windows_line_endings():
+    s = 'def a():\r\n    return (\r\n        1\r\n    )\r\n'
+    assert python_function_blocks(s) == ['def a():\n    return (\n        1\n    )']
+
+
 def test_python_function_blocks__async_functions():
     assert python_function_blocks(TEST_CODE_WITH_ASYNC_FUNCTION) == [
         'def foo(n):\n    """Foo."""\n    return n',
@@ -514,3 +692,25 @@ from ..foo.bar import *
     '''
 
     assert python_package_imports(s) == {'.': ['everything'], 'foo.bar': ['*']}
+
+
+def test_python_package_imports__ast_objects():
+    module = ast.parse('import os\n\n\ndef f():\n    from math import sqrt\n')
+    assert python_package_imports(module) == {'os': [], 'math': ['sqrt']}
+    assert python_package_imports(module.body[1]) == {'math': ['sqrt']}
+
+
+def test_parsed_source__used_in_place_of_code_text():
+    parsed_source = ParsedSource(TEST_CODE_WITH_NESTED_FUNCTION)
+    assert python_function_blocks(parsed_source) == python_function_blocks(TEST_CODE_WITH_NESTED_FUNCTION)
+    assert python_function_lengths(parsed_source) == python_function_lengths(TEST_CODE_WITH_NESTED_FUNCTION)
+    assert python_functions_signatures(parsed_source) == ['(n)', '(i)']
+    assert python_line_count(parsed_source) == python_line_count(TEST_CODE_WITH_NESTED_FUNCTION)
+    assert python_todos(ParsedSource('# TODO: hi!')) == ['TODO: hi!']
+    assert python_clean(ParsedSource('x = 1')) == 'x = 1'
+    assert python_code_details(ParsedSource(SIMPLE_FUNCTION)).startswith('Name:              <module>')
+    assert python_disassemble(ParsedSource(SIMPLE_FUNCTION)).split()[:3] == python_disassemble(SIMPLE_FUNCTION).split()[:3]
+    assert tuple(python_fstrings(ParsedSource("f'{name}'"))) == ('name',)
+
+    parsed_source = ParsedSource('from math import sqrt\nimport requests')
+    assert python_package_imports(parsed_source) == {'math': ['sqrt'], 'requests': []}
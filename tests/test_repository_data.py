@@ -0,0 +1,182 @@
+import functools
+import os
+
+import pytest
+
+from d8s_python import (
+    AnalysisCache,
+    FileAnalysis,
+    python_exceptions_raised,
+    python_file_analyze,
+    python_file_paths,
+    python_files_analyze,
+    python_function_names,
+)
+
+FILE_CONTENTS = {
+    'a.py': 'def a():\n    raise ValueError()\n',
+    'a_test.py': 'def test_a():\n    pass\n',
+    os.path.join('sub', 'b.py'): 'def b():\n    def c():\n        pass\n' + '\n' * 100,
+    os.path.join('sub', 'broken.py'): 'def (:',
+    os.path.join('sub', 'notes.txt'): 'def d():\n    pass\n',
+}
+
+
+@pytest.fixture
+def repository_path(write_files):
+    return write_files(FILE_CONTENTS)
+
+
+def test_python_file_paths_1(repository_path):
+    assert sorted(python_file_paths(repository_path)) == [
+        os.path.join(repository_path, 'a.py'),
+        os.path.join(repository_path, 'a_test.py'),
+        os.path.join(repository_path, 'sub', 'b.py'),
+        os.path.join(repository_path, 'sub', 'broken.py'),
+    ]
+    assert sorted(python_file_paths([repository_path], exclude_tests=True)) == [
+        os.path.join(repository_path, 'a.py'),
+        os.path.join(repository_path, 'sub', 'b.py'),
+        os.path.join(repository_path, 'sub', 'broken.py'),
+    ]
+
+    file_path = os.path.join(repository_path, 'a.py')
+    assert list(python_file_paths(file_path)) == [file_path]
+
+
+def test_python_file_analyze_1(repository_path):
+    file_path = os.path.join(repository_path, 'a.py')
+    result = python_file_analyze(file_path, ['python_function_names', python_exceptions_raised])
+    assert result == FileAnalysis(
+        file_path, {'python_function_names': ['a'], 'python_exceptions_raised': ['ValueError']}, {}
+    )
+
+    result = python_file_analyze(file_path, [functools.partial(python_function_names, ignore_private_functions=True)])
+    assert result.results == {'python_function_names': ['a']}
+
+    result = python_file_analyze(file_path, [lambda code_text: 1 / 0])
+    assert result.results == {}
+    assert result.errors == {'<lambda>': 'ZeroDivisionError: division by zero'}
+
+    file_path = os.path.join(repository_path, 'sub', 'broken.py')
+    result = python_file_analyze(file_path, ['python_function_names'])
+    assert result.results == {}
+    assert result.errors['python_ast_parse'].startswith('SyntaxError: ')
+
+
+def test_python_file_analyze__declared_encoding(tmp_path):
+    file_path = tmp_path / 'latin_1.py'
+    file_path.write_bytes('# -*- coding: latin-1 -*-\ndef caf\xe9():\n    pass\n'.encode('latin-1'))
+    result = python_file_analyze(str(file_path), ['python_function_names', 'python_function_blocks'])
+    assert result.results == {
+        'python_function_names': ['caf\xe9'],
+        'python_function_blocks': ['def caf\xe9():\n    pass'],
+    }
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_python_files_analyze_1(repository_path, max_workers):
+    results = list(
+        python_files_analyze(
+            repository_path, ['python_function_names'], max_workers=max_workers, chunk_size=2, exclude_tests=True
+        )
+    )
+    assert {result.file_path: result.results for result in results} == {
+        os.path.join(repository_path, 'a.py'): {'python_function_names': ['a']},
+        os.path.join(repository_path, 'sub', 'b.py'): {'python_function_names': ['b', 'c']},
+        os.path.join(repository_path, 'sub', 'broken.py'): {},
+    }
+
+    if max_workers == 1:
+        # the largest file is analyzed first
+        assert results[0].file_path == os.path.join(repository_path, 'sub', 'b.py')
+
+
+def test_python_files_analyze__stop_early(repository_path):
+    results = python_files_analyze(repository_path, ['python_function_names'], max_workers=2)
+    assert isinstance(next(results), FileAnalysis)
+    results.close()
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_python_files_analyze__cache(repository_path, tmp_path, max_workers):
+    file_path = os.path.join(repository_path, 'a.py')
+    with AnalysisCache(str(tmp_path / 'cache.sqlite')) as cache:
+        results = list(python_files_analyze(file_path, ['python_function_names'], max_workers=max_workers, cache=cache))
+        assert cache.stats()['misses'] == 1
+        assert results == [FileAnalysis(file_path, {'python_function_names': ['a']}, {})]
+
+        results = list(
+            python_files_analyze(
+                file_path, ['python_exceptions_raised', 'python_function_names'], max_workers=max_workers, cache=cache
+            )
+        )
+        assert cache.stats()['hits'] == 1
+        assert results == [
+            FileAnalysis(file_path, {'python_exceptions_raised': ['ValueError'], 'python_function_names': ['a']}, {})
+        ]
+
+        results = list(python_files_analyze(file_path, ['python_function_names'], max_workers=max_workers, cache=cache))
+        assert cache.stats()['hits'] == 2
+        assert results == [FileAnalysis(file_path, {'python_function_names': ['a']}, {})]
+
+
+def test_python_file_analyze__cache(repository_path, tmp_path):
+    file_path = os.path.join(repository_path, 'a.py')
+    partial = functools.partial(python_function_names, ignore_private_functions=True)
+    with AnalysisCache(str(tmp_path / 'cache.sqlite')) as cache:
+        assert python_file_analyze(file_path, [partial], cache=cache).results == {'python_function_names': ['a']}
+        assert python_file_analyze(file_path, [partial], cache=cache).results == {'python_function_names': ['a']}
+        assert cache.stats()['hits'] == 1
+
+        # parse errors are cached, but are not counted in the cache's stats
+        file_path = os.path.join(repository_path, 'sub', 'broken.py')
+        assert python_file_analyze(file_path, [partial], cache=cache).errors
+        assert python_file_analyze(file_path, [partial], cache=cache).errors
+        assert cache.stats()['hits'] == 1
+
+
+class _FunctionNames:
+    def __call__(self, code_text):
+        return python_function_names(code_text)
+
+
+def test_python_file_analyze__cache_callable_instance(repository_path, tmp_path):
+    file_path = os.path.join(repository_path, 'a.py')
+    with AnalysisCache(str(tmp_path / 'cache.sqlite')) as cache:
+        assert list(python_file_analyze(file_path, [_FunctionNames()], cache=cache).results.values()) == [['a']]
+        assert list(python_file_analyze(file_path, [_FunctionNames()], cache=cache).results.values()) == [['a']]
+        assert cache.stats()['hits'] == 1
+
+
+@pytest.mark.parametrize('strict_parse', [False, True])
+def test_python_files_analyze__cached_parse_errors(repository_path, tmp_path, monkeypatch, strict_parse):
+    import d8s_python.repository_data
+
+    file_path = os.path.join(repository_path, 'sub', 'broken.py')
+    with AnalysisCache(str(tmp_path / 'cache.sqlite')) as cache:
+
+        def analyze(path):
+            return list(
+                python_files_analyze(
+                    path, ['python_function_names'], max_workers=1, cache=cache, strict_parse=strict_parse
+                )
+            )
+
+        [analysis] = analyze(file_path)
+        assert analysis.errors['python_ast_parse'].startswith('SyntaxError: ')
+
+        # the file is known not to parse so it is not parsed again
+        with monkeypatch.context() as patch:
+            patch.setattr(d8s_python.repository_data, '_python_file_analyze', None)
+            assert list(analyze(file_path)) == [analysis]
+            assert (
+                python_file_analyze(file_path, ['python_function_names'], cache=cache, strict_parse=strict_parse)
+                == analysis
+            )
+        # the cached errors of strict and non-strict parses are kept apart
+        assert python_file_analyze(file_path, ['python_function_names'], cache=cache, strict_parse=not strict_parse)
+
+        with open(file_path, 'w') as f:
+            f.write('def d():\n    pass\n')
+        assert list(analyze(file_path)) == [FileAnalysis(file_path, {'python_function_names': ['d']}, {})]
@@ -0,0 +1,111 @@
+import ast
+import sys
+
+import pytest
+
+from d8s_python import ParsedSource, Symbol, SymbolIndex, python_symbol_index
+
+SCOPED_CODE = '''import os.path, sys as system
+from x import y as z
+G = 1
+
+class A(Base):
+    attr: int = G
+
+    def f(self, a: T = D, *args, k=K, **kw):
+        global G
+        def g():
+            nonlocal a
+            a = [i for i in range(a) if (n := i)]
+            return lambda q: q + n
+        del kw
+
+try:
+    pass
+except E as e:
+    print(e)
+'''
+
+
+def test_python_symbol_index_1():
+    index = python_symbol_index(SCOPED_CODE)
+    assert [scope.qualified_name for scope in index.scopes] == [
+        '<module>',
+        'A',
+        'A.f',
+        'A.f.<locals>.g',
+        'A.f.<locals>.g.<locals>.<listcomp>',
+        'A.f.<locals>.g.<locals>.<lambda>',
+    ]
+
+    module_scope = index.module_scope
+    assert module_scope.names('imported') == ['os', 'system', 'z']
+    assert module_scope.names('assigned') == ['G']
+    assert module_scope.names('definition') == ['A']
+    assert module_scope.names('bound') == ['e']
+    assert module_scope.names('loaded') == ['Base', 'E', 'print', 'e']
+    assert [scope.qualified_name for scope in module_scope.children] == ['A']
+
+    # the annotations and default values of a function's arguments are evaluated in the enclosing scope
+    class_scope = index.scope('A')
+    assert class_scope.kind == 'class'
+    assert sorted(class_scope.names('loaded')) == ['D', 'G', 'K', 'T', 'int']
+    assert class_scope.names('definition') == ['f']
+
+    function_scope = index.scope('A.f')
+    assert function_scope.kind == 'function'
+    assert function_scope.parent is class_scope
+    assert function_scope.names('argument') == ['self', 'a', 'args', 'k', 'kw']
+    assert function_scope.names('global') == ['G']
+    assert function_scope.names('deleted') == ['kw']
+    assert not function_scope.is_local('G')
+    assert function_scope.is_local('a')
+
+    # the first iterable of a comprehension is evaluated in the enclosing scope and an assignment expression in a...
+    # comprehension binds its name in the enclosing scope
+    inner_scope = index.scope('A.f.<locals>.g')
+    assert inner_scope.names('nonlocal') == ['a']
+    assert inner_scope.names('assigned') == ['a', 'n']
+    assert inner_scope.names('loaded') == ['range', 'a']
+    assert not inner_scope.is_local('a')
+    assert inner_scope.is_local('n')
+    comprehension_scope = index.scope('A.f.<locals>.g.<locals>.<listcomp>')
+    assert comprehension_scope.kind == 'comprehension'
+    assert comprehension_scope.names('assigned') == ['i']
+    assert 'n' not in comprehension_scope
+    assert index.scope('A.f.<locals>.g.<locals>.<lambda>').names('loaded') == ['q', 'n']
+
+    with pytest.raises(KeyError):
+        index.scope('A.g')
+
+
+def test_symbol_index_symbols():
+    index = python_symbol_index(SCOPED_CODE)
+    assert index.symbols(name='a') == [
+        Symbol('a', 'argument', 'A.f', 8, 16),
+        Symbol('a', 'nonlocal', 'A.f.<locals>.g', 11, 12),
+        Symbol('a', 'assigned', 'A.f.<locals>.g', 12, 12),
+        Symbol('a', 'loaded', 'A.f.<locals>.g', 12, 34),
+    ]
+    assert index.symbols('loaded', name='a') == [Symbol('a', 'loaded', 'A.f.<locals>.g', 12, 34)]
+    assert index.symbols(name='missing') == []
+    assert [symbol.name for symbol in index.symbols('assigned')] == ['G', 'attr', 'a', 'i', 'n']
+    assert len(index.symbols()) == len(index)
+    assert index.scope('A.f.<locals>.g').symbols('a', 'assigned') == [Symbol('a', 'assigned', 'A.f.<locals>.g', 12, 12)]
+    assert [symbol.kind for symbol in index.scope('A.f.<locals>.g').symbols('a')] == ['nonlocal', 'assigned', 'loaded']
+
+
+def test_python_symbol_index__cached():
+    parsed_source = ParsedSource(SCOPED_CODE)
+    assert python_symbol_index(parsed_source) is parsed_source.symbol_index
+    assert python_symbol_index(parsed_source) is python_symbol_index(parsed_source)
+
+    index = python_symbol_index(ast.parse('x = 1'))
+    assert isinstance(index, SymbolIndex)
+    assert index.module_scope.names('assigned') == ['x']
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason='the match statement requires python 3.10+')
+def test_python_symbol_index__match():
+    index = python_symbol_index('match v:\n    case {"k": P, **rest}: pass\n    case [*others] as whole: pass\n')
+    assert sorted(index.module_scope.names('bound')) == ['P', 'others', 'rest', 'whole']
@@ -0,0 +1,98 @@
+import io
+import os
+
+import pytest
+
+from d8s_python import (
+    Todo,
+    python_comments,
+    python_file_todos,
+    python_files_todos,
+    python_todos,
+    python_todos_in_file_object,
+)
+
+TEST_CODE_WITH_TODOS = '''# TODO: first
+def a():
+    """TODO: not a comment"""
+    s = '# FIXME: not a comment either'
+    return s  # FIXME: second
+
+
+# HACK
+# todo: not a marker
+x = 1  # XXX
+'''
+
+
+@pytest.fixture
+def repository_path(tmp_path):
+    (tmp_path / 'package').mkdir()
+    (tmp_path / 'package' / 'a.py').write_text(TEST_CODE_WITH_TODOS)
+    (tmp_path / 'package' / 'b.py').write_bytes('# -*- coding: latin-1 -*-\n# TODO: caf\xe9\n'.encode('latin-1'))
+    (tmp_path / 'package' / 'c.py').write_text('x = 1\n')
+    (tmp_path / 'package' / 'd.py').write_text('# TODO: before the error\nx = (\n')
+    (tmp_path / 'package' / 'test_e.py').write_text('# TODO: test\n')
+    return str(tmp_path)
+
+
+def test_python_comments_1():
+    result = list(python_comments(io.StringIO(TEST_CODE_WITH_TODOS)))
+    assert result == [
+        (1, '# TODO: first'),
+        (5, '# FIXME: second'),
+        (8, '# HACK'),
+        (9, '# todo: not a marker'),
+        (10, '# XXX'),
+    ]
+    assert list(python_comments(io.BytesIO(TEST_CODE_WITH_TODOS.encode()))) == result
+
+
+def test_python_todos_in_file_object_1():
+    result = list(python_todos_in_file_object(io.StringIO(TEST_CODE_WITH_TODOS)))
+    assert result == [
+        Todo(None, 1, 'TODO', 'TODO: first'),
+        Todo(None, 5, 'FIXME', 'FIXME: second'),
+        Todo(None, 8, 'HACK', 'HACK'),
+    ]
+
+    result = list(python_todos_in_file_object(io.StringIO(TEST_CODE_WITH_TODOS), markers=['XXX', '(?i:todo:)']))
+    assert [(todo.line_number, todo.marker) for todo in result] == [(1, 'TODO:'), (9, 'todo:'), (10, 'XXX')]
+
+
+def test_python_file_todos_1(repository_path):
+    file_path = os.path.join(repository_path, 'package', 'a.py')
+    assert [todo.line_number for todo in python_file_todos(file_path)] == [1, 5, 8]
+    assert next(python_file_todos(file_path)).file_path == file_path
+
+    file_path = os.path.join(repository_path, 'package', 'b.py')
+    assert list(python_file_todos(file_path)) == [Todo(file_path, 2, 'TODO', 'TODO: caf\xe9')]
+
+    file_path = os.path.join(repository_path, 'package', 'c.py')
+    assert list(python_file_todos(file_path)) == []
+
+
+def test_python_files_todos_1(repository_path):
+    result = sorted(
+        (os.path.basename(todo.file_path), todo.line_number, todo.marker)
+        for todo in python_files_todos(repository_path)
+    )
+    assert result == [
+        ('a.py', 1, 'TODO'),
+        ('a.py', 5, 'FIXME'),
+        ('a.py', 8, 'HACK'),
+        ('b.py', 2, 'TODO'),
+        # the todos found before a tokenize error are kept
+        ('d.py', 1, 'TODO'),
+        ('test_e.py', 1, 'TODO'),
+    ]
+
+    result = list(python_files_todos(repository_path, markers=['HACK'], exclude_tests=True))
+    assert [todo.text for todo in result] == ['HACK']
+
+
+def test_python_todos__comments_only():
+    assert python_todos(TEST_CODE_WITH_TODOS) == ['TODO: first']
+    assert python_todos(TEST_CODE_WITH_TODOS, 'FIXME:.*') == ['FIXME: second']
+    # text which is not python code is searched entirely
+    assert python_todos('TODO: (unbalanced') == ['TODO: (unbalanced']